@@ -11,6 +11,7 @@ import tempfile
 from utils.resume_analyzer import ResumeAnalyzer
 from utils.ai_resume_analyzer import AIResumeAnalyzer
 from utils.resume_builder import ResumeBuilder
+from utils.role_index import get_role_index
 
 # Load environment variables
 load_dotenv()
@@ -47,20 +48,16 @@ def analyze_resume():
         return jsonify({"error": "No selected file"}), 400
     
     try:
-        # Save file temporarily
+        # Read the upload in memory; nothing is written to disk
         filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        data = file.read()
         
         # Extract Text
         text = ""
         if filename.lower().endswith('.pdf'):
-            # Re-open file for extraction or pass path
-            with open(filepath, 'rb') as f:
-                text = ai_analyzer.extract_text_from_pdf(f)
+            text = ai_analyzer.extract_text_from_pdf(data)
         elif filename.lower().endswith('.docx'):
-             with open(filepath, 'rb') as f:
-                text = ai_analyzer.extract_text_from_docx(f)
+            text = ai_analyzer.extract_text_from_docx(data)
         else:
             return jsonify({"error": "Unsupported file format"}), 400
 
@@ -81,9 +78,6 @@ def analyze_resume():
         print(f"Running AI Analysis with Ollama for role: {job_role}")
         ai_analysis = ai_analyzer.analyze_resume_with_ollama(text, job_role=job_role)
         
-        # Cleanup
-        os.remove(filepath)
-        
         return jsonify({
             "success": True,
             "text": text,
@@ -96,6 +90,37 @@ def analyze_resume():
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
+@app.route('/match-roles', methods=['POST'])
+def match_roles():
+    """Best-fit roles and scraped jobs for a resume: a 'file' upload or a 'text' field"""
+    payload = request.get_json(silent=True) or {}
+    text = request.form.get('text') or payload.get('text', '')
+    if 'file' in request.files and request.files['file'].filename:
+        filename = secure_filename(request.files['file'].filename)
+        data = request.files['file'].read()
+        if filename.lower().endswith('.pdf'):
+            text = ai_analyzer.extract_text_from_pdf(data)
+        elif filename.lower().endswith('.docx'):
+            text = ai_analyzer.extract_text_from_docx(data)
+        else:
+            return jsonify({"error": "Unsupported file format"}), 400
+    if not text:
+        return jsonify({"error": "No resume text or file provided"}), 400
+
+    try:
+        k = min(max(int(request.args.get('k', 5)), 1), 50)
+    except ValueError:
+        return jsonify({"error": "k must be an integer"}), 400
+    kind = request.args.get('kind')  # 'role', 'job' or omitted for both
+
+    try:
+        matches = get_role_index().search(text, k=k, kind=kind)
+        return jsonify({"success": True, "matches": matches})
+    except Exception as e:
+        print(f"Error matching roles: {e}")
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/generate-resume', methods=['POST'])
 def generate_resume():
     try:
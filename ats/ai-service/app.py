@@ -30,6 +30,8 @@ from config.database import (
 from utils.ai_resume_analyzer import AIResumeAnalyzer
 from utils.resume_builder import ResumeBuilder
 from utils.resume_analyzer import ResumeAnalyzer
+from utils.keyword_matcher import precompile_role_skills
+from utils.role_index import get_role_index
 import traceback
 import plotly.express as px
 import pandas as pd
@@ -95,6 +97,8 @@ class ResumeApp:
         self.ai_analyzer = AIResumeAnalyzer()
         self.builder = ResumeBuilder()
         self.job_roles = JOB_ROLES
+        precompile_role_skills(JOB_ROLES)
+        self.role_index = get_role_index()
 
         # Initialize session state
         if 'user_id' not in st.session_state:
@@ -1496,6 +1500,20 @@ class ResumeApp:
 
                         st.markdown("</div>", unsafe_allow_html=True)
 
+                        # Best-fit roles from the role/JD index
+                        best_fit = [match for match in self.role_index.search(text, k=4)
+                                    if match['id'] != f"role:{selected_category}/{selected_role}"][:3]
+                        if best_fit:
+                            st.markdown("""
+                            <div class="feature-card">
+                                <h2>Best-Fit Roles</h2>
+                            """, unsafe_allow_html=True)
+                            for match in best_fit:
+                                where = match['meta'].get('category') or match['meta'].get('company', '')
+                                st.markdown(f"- **{match['title']}** ({where}): "
+                                            f"{', '.join(match['matched_terms'][:6])}")
+                            st.markdown("</div>", unsafe_allow_html=True)
+
                     with col2:
                         # Format Score Card
                         st.markdown("""
@@ -12,6 +12,7 @@ warnings.filterwarnings('ignore')
 
 # Import our custom webdriver utility
 from .webdriver_utils import setup_webdriver
+from utils.role_index import get_role_index
 
 class LinkedInScraper:
     """Class for scraping job listings from LinkedIn"""
@@ -422,6 +423,12 @@ class LinkedInScraper:
         df = df.dropna()
         df = df.reset_index(drop=True)
         
+        # Make the new descriptions searchable for role/JD matching right away
+        try:
+            get_role_index().add_job_descriptions(df)
+        except Exception as e:
+            print(f"Warning: Could not index scraped job descriptions: {e}")
+        
         return df
 
     @staticmethod
@@ -1,5 +1,21 @@
 import re
 
+from .keyword_matcher import KeywordMatcher, skill_matcher
+
+# Keywords that show each essential section is present (scored by check_resume_sections)
+ESSENTIAL_SECTIONS = {
+    'contact': ['email', 'phone', 'address', 'linkedin'],
+    'education': ['education', 'university', 'college', 'degree', 'academic'],
+    'experience': ['experience', 'work', 'employment', 'job', 'internship'],
+    'skills': ['skills', 'technologies', 'tools', 'proficiencies', 'expertise']
+}
+# Plain substring matching, as before ("work" also counts in "working")
+_ESSENTIAL_SECTIONS_MATCHER = KeywordMatcher(
+    {(section, keyword): [keyword] for section, keywords in ESSENTIAL_SECTIONS.items() for keyword in keywords},
+    word_boundary=False,
+)
+
+
 class ResumeAnalyzer:
     def __init__(self):
         # Document type indicators
@@ -21,16 +37,21 @@ class ResumeAnalyzer:
                 'date of issue', 'identification'
             ]
         }
+        self._document_type_matcher = KeywordMatcher(
+            {(doc_type, keyword): [keyword] for doc_type, keywords in self.document_types.items() for keyword in keywords},
+            word_boundary=False,
+        )
         
     def detect_document_type(self, text):
-        text = text.lower()
+        found = self._document_type_matcher.labels(text)
+        word_count = len(text.split())
         scores = {}
         
         # Calculate score for each document type
         for doc_type, keywords in self.document_types.items():
-            matches = sum(1 for keyword in keywords if keyword in text)
+            matches = sum(1 for keyword in keywords if (doc_type, keyword) in found)
             density = matches / len(keywords)
-            frequency = matches / (len(text.split()) + 1)  # Add 1 to avoid division by zero
+            frequency = matches / (word_count + 1)  # Add 1 to avoid division by zero
             scores[doc_type] = (density * 0.7) + (frequency * 0.3)
         
         # Get the highest scoring document type
@@ -40,20 +61,11 @@ class ResumeAnalyzer:
         return best_match[0] if best_match[1] > 0.15 else 'unknown'
         
     def calculate_keyword_match(self, resume_text, required_skills):
-        resume_text = resume_text.lower()
-        found_skills = []
-        missing_skills = []
-        
-        for skill in required_skills:
-            skill_lower = skill.lower()
-            # Check for exact match
-            if skill_lower in resume_text:
-                found_skills.append(skill)
-            # Check for partial matches (e.g., "Python" in "Python programming")
-            elif any(skill_lower in phrase for phrase in resume_text.split('.')):
-                found_skills.append(skill)
-            else:
-                missing_skills.append(skill)
+        # All skills are matched on one lowercased copy of the resume; whole words only, with common aliases
+        # (e.g. "NodeJS" counts for "Node.js", but "JavaScript" does not count for "Java")
+        found = skill_matcher(tuple(required_skills)).labels(resume_text)
+        found_skills = [skill for skill in required_skills if skill in found]
+        missing_skills = [skill for skill in required_skills if skill not in found]
                 
         match_score = (len(found_skills) / len(required_skills)) * 100 if required_skills else 0
         
@@ -64,18 +76,12 @@ class ResumeAnalyzer:
         }
         
     def check_resume_sections(self, text):
-        text = text.lower()
-        essential_sections = {
-            'contact': ['email', 'phone', 'address', 'linkedin'],
-            'education': ['education', 'university', 'college', 'degree', 'academic'],
-            'experience': ['experience', 'work', 'employment', 'job', 'internship'],
-            'skills': ['skills', 'technologies', 'tools', 'proficiencies', 'expertise']
-        }
+        found = _ESSENTIAL_SECTIONS_MATCHER.labels(text)
         
         section_scores = {}
-        for section, keywords in essential_sections.items():
-            found = sum(1 for keyword in keywords if keyword in text)
-            section_scores[section] = min(25, (found / len(keywords)) * 25)
+        for section, keywords in ESSENTIAL_SECTIONS.items():
+            found_count = sum(1 for keyword in keywords if (section, keyword) in found)
+            section_scores[section] = min(25, (found_count / len(keywords)) * 25)
             
         return sum(section_scores.values())
         
@@ -3,6 +3,14 @@ import docx
 import re
 from io import BytesIO
 
+from .keyword_matcher import KeywordMatcher, skill_terms
+
+# Common programming languages and tools
+SKILL_KEYWORDS = ['python', 'java', 'javascript', 'html', 'css', 'sql', 'react', 'angular', 'vue', 
+                  'node', 'express', 'django', 'flask', 'spring', 'docker', 'kubernetes', 'aws', 
+                  'azure', 'git', 'jenkins', 'jira']
+_SKILL_MATCHER = KeywordMatcher({skill: skill_terms(skill) for skill in SKILL_KEYWORDS})
+
 class ResumeParser:
     def __init__(self):
         pass
@@ -58,20 +66,12 @@ class ResumeParser:
         text = self.extract_text(file)
         
         # Simple keyword-based parsing
-        skills = []
         experience = []
         education = []
         
-        # Common programming languages and tools
-        skill_keywords = ['python', 'java', 'javascript', 'html', 'css', 'sql', 'react', 'angular', 'vue', 
-                         'node', 'express', 'django', 'flask', 'spring', 'docker', 'kubernetes', 'aws', 
-                         'azure', 'git', 'jenkins', 'jira']
-                         
-        # Look for skills
-        text_lower = text.lower()
-        for skill in skill_keywords:
-            if skill in text_lower:
-                skills.append(skill)
+        # Look for skills in one pass (whole words, with aliases such as "node.js")
+        found = _SKILL_MATCHER.labels(text)
+        skills = [skill for skill in SKILL_KEYWORDS if skill in found]
                 
         return {
             "skills": skills,
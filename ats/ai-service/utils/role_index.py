@@ -0,0 +1,271 @@
+"""
+Inverted index for matching a resume against job roles and scraped job descriptions.
+
+Every configured role (its required skills, recommended technical skills and
+description) and every scraped JD is a document. Postings map each term to
+the documents containing it along with a precomputed BM25 weight, so a query
+only touches the postings of the resume's own terms. Top-k comes from a heap
+over the accumulated scores instead of scoring every role in a loop.
+
+Weights depend on corpus-wide statistics (document count, average length),
+so they are recomputed lazily on the first search after documents are added.
+Scraped JDs can be persisted to SQLite and are reloaded on startup; roles are
+always rebuilt from config.
+"""
+import heapq
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from .keyword_matcher import SKILL_ALIASES
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Skill lists are repeated this many times in a role document so they outweigh the prose
+SKILL_WEIGHT = 2
+
+ROLE = 'role'
+JOB = 'job'
+
+# Keeps skill spellings such as c++, c#, .net and node.js intact as one token
+_TOKEN_RE = re.compile(r"\.?[a-z0-9](?:[a-z0-9+#.]*[a-z0-9+#])?")
+
+_STOPWORDS = frozenset("""
+a an and are as at be been but by can for from has have in into is it its of on or our
+that the their this to was we were will with you your who what which they them he she his her
+experience years year work working strong ability using use etc including such also well
+""".split())
+
+
+# SKILL_ALIASES entries whose aliases are distinct products rather than other
+# spellings: a MySQL resume has SQL for keyword matching, but a role asking for
+# PostgreSQL should not fully match it, so these groups are not folded here
+_BROADER_SKILLS = frozenset({'sql'})
+
+
+def _single_token_aliases():
+    """
+    spelling -> representative for every skill spelling in SKILL_ALIASES that tokenize() can produce.
+
+    Spellings linked by any entry, directly or through other entries, form one
+    group that folds to a single term: "node", "nodejs" and "node.js" all become
+    "node.js", and "postgres" becomes "postgresql". Spellings the token pattern
+    splits ("ci/cd", "t-sql") are left out, as are _BROADER_SKILLS. The
+    representative is the group's spelling that comes first in SKILL_ALIASES.
+    """
+    parent = {}
+    first_seen = {}
+
+    def find(spelling):
+        if spelling not in parent:
+            parent[spelling] = spelling
+            first_seen[spelling] = len(first_seen)
+        while parent[spelling] != spelling:
+            parent[spelling] = parent[parent[spelling]]
+            spelling = parent[spelling]
+        return spelling
+
+    for canonical, alternatives in SKILL_ALIASES.items():
+        if canonical in _BROADER_SKILLS or not _TOKEN_RE.fullmatch(canonical):
+            continue
+        for alias in alternatives:
+            if _TOKEN_RE.fullmatch(alias):
+                root, other = find(canonical), find(alias)
+                if root != other:
+                    if first_seen[other] < first_seen[root]:
+                        root, other = other, root
+                    parent[other] = root
+    representatives = {spelling: find(spelling) for spelling in parent}
+    return {spelling: root for spelling, root in representatives.items() if spelling != root}
+
+
+_ALIASES = _single_token_aliases()
+
+
+def tokenize(text):
+    """Lowercased terms of the text, without stopwords and with skill aliases folded together"""
+    return [_ALIASES.get(token, token) for token in _TOKEN_RE.findall(text.lower())
+            if token not in _STOPWORDS]
+
+
+class RoleIndex:
+    """
+    BM25 inverted index over role and job description documents.
+
+    Documents are identified by a string id ("role:<category>/<role>",
+    "job:<url>") and carry a kind (ROLE or JOB), a title and free-form meta.
+    With db_path set, documents added with persist=True are written to
+    SQLite and reloaded when the index is created.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path
+        self._docs = {}  # doc_id -> {'kind', 'title', 'meta', 'terms': Counter, 'length'}
+        self._postings = {}  # term -> [(doc_id, weight)], rebuilt when stale
+        self._stale = False
+        self._lock = threading.Lock()
+        self._db = None
+
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS role_index_documents ("
+                "doc_id TEXT PRIMARY KEY, kind TEXT NOT NULL, title TEXT NOT NULL, "
+                "meta TEXT NOT NULL, terms TEXT NOT NULL, added_at REAL NOT NULL)"
+            )
+            self._db.commit()
+            for doc_id, kind, title, meta, terms in self._db.execute(
+                    "SELECT doc_id, kind, title, meta, terms FROM role_index_documents"):
+                # Fold again in case the rows were written under an older alias table
+                folded = Counter()
+                for term, count in json.loads(terms).items():
+                    folded[_ALIASES.get(term, term)] += count
+                self._put(doc_id, kind, title, json.loads(meta), folded)
+
+    @classmethod
+    def from_env(cls, job_roles=None):
+        """Build the index from ROLE_INDEX_DB (empty keeps it in memory) and index the given roles table"""
+        db_path = os.getenv("ROLE_INDEX_DB", "database/role_index.sqlite3")
+        index = cls(db_path=db_path or None)
+        if job_roles:
+            index.add_roles(job_roles)
+        return index
+
+    def _put(self, doc_id, kind, title, meta, terms):
+        self._docs[doc_id] = {
+            'kind': kind, 'title': title, 'meta': meta,
+            'terms': terms, 'length': sum(terms.values()),
+        }
+        self._stale = True
+
+    def add_document(self, doc_id, kind, title, text, meta=None, persist=False):
+        """Index (or re-index) one document; returns False if it has no indexable terms"""
+        terms = Counter(tokenize(text))
+        if not terms:
+            return False
+        meta = meta or {}
+        with self._lock:
+            self._put(doc_id, kind, title, meta, terms)
+            if persist and self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO role_index_documents "
+                    "(doc_id, kind, title, meta, terms, added_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (doc_id, kind, title, json.dumps(meta), json.dumps(terms), time.time()),
+                )
+                self._db.commit()
+        return True
+
+    def add_roles(self, job_roles):
+        """Index every role of a {category: {role: info}} table such as config.job_roles.JOB_ROLES"""
+        for category, roles in job_roles.items():
+            for role, info in roles.items():
+                skills = list(info.get('required_skills', []))
+                skills += info.get('recommended_skills', {}).get('technical', [])
+                text = ' '.join([' '.join(skills)] * SKILL_WEIGHT + [role, info.get('description', '')])
+                self.add_document(f"{ROLE}:{category}/{role}", ROLE, role, text,
+                                  meta={'category': category})
+
+    def add_job_descriptions(self, df):
+        """
+        Index scraped jobs from a LinkedInScraper DataFrame ('Job Title',
+        'Company Name', 'Location', 'Website URL', 'Job Description') and
+        persist them. Returns the number of jobs indexed.
+        """
+        added = 0
+        for _, row in df.iterrows():
+            url = row.get('Website URL')
+            description = row.get('Job Description')
+            if not isinstance(url, str) or not isinstance(description, str):
+                continue
+            title = row.get('Job Title') or ''
+            meta = {'company': row.get('Company Name') or '', 'location': row.get('Location') or '', 'url': url}
+            if self.add_document(f"{JOB}:{url}", JOB, title, f"{title}\n{description}", meta=meta, persist=True):
+                added += 1
+        return added
+
+    def remove_document(self, doc_id):
+        with self._lock:
+            if self._docs.pop(doc_id, None) is not None:
+                self._stale = True
+            if self._db is not None:
+                self._db.execute("DELETE FROM role_index_documents WHERE doc_id = ?", (doc_id,))
+                self._db.commit()
+
+    def _rebuild(self):
+        """Recompute BM25 weights for all postings (called with the lock held)"""
+        n = len(self._docs)
+        average_length = sum(doc['length'] for doc in self._docs.values()) / n if n else 0.0
+        document_frequency = Counter()
+        for doc in self._docs.values():
+            document_frequency.update(doc['terms'].keys())
+
+        postings = {}
+        for doc_id, doc in self._docs.items():
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * doc['length'] / average_length)
+            for term, tf in doc['terms'].items():
+                df = document_frequency[term]
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                postings.setdefault(term, []).append((doc_id, idf * tf * (BM25_K1 + 1) / (tf + norm)))
+        self._postings = postings
+        self._stale = False
+
+    def search(self, text, k=5, kind=None):
+        """
+        Top-k documents for a resume text (or an iterable of pre-tokenized
+        terms), best first, optionally restricted to one kind. Each result is
+        a dict with id, kind, title, score, matched_terms and meta.
+        """
+        terms = set(tokenize(text) if isinstance(text, str) else text)
+        with self._lock:
+            if self._stale:
+                self._rebuild()
+            postings = self._postings
+            docs = self._docs
+
+            scores = {}
+            for term in terms:
+                for doc_id, weight in postings.get(term, ()):
+                    scores[doc_id] = scores.get(doc_id, 0.0) + weight
+            if kind is not None:
+                scores = {doc_id: score for doc_id, score in scores.items() if docs[doc_id]['kind'] == kind}
+            best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+            results = []
+            for doc_id, score in best:
+                doc = docs[doc_id]
+                matched = sorted(terms & doc['terms'].keys(), key=lambda term: -doc['terms'][term])
+                results.append({
+                    'id': doc_id,
+                    'kind': doc['kind'],
+                    'title': doc['title'],
+                    'score': round(score, 3),
+                    'matched_terms': matched,
+                    'meta': dict(doc['meta']),
+                })
+            return results
+
+    def get_stats(self):
+        with self._lock:
+            kinds = Counter(doc['kind'] for doc in self._docs.values())
+            return {"documents": len(self._docs), "roles": kinds[ROLE], "jobs": kinds[JOB],
+                    "terms": len(self._postings), "stale": self._stale}
+
+
+_role_index = None
+_role_index_lock = threading.Lock()
+
+
+def get_role_index():
+    """Process-wide index over config.job_roles.JOB_ROLES plus the persisted scraped jobs"""
+    global _role_index
+    with _role_index_lock:
+        if _role_index is None:
+            from config.job_roles import JOB_ROLES
+            _role_index = RoleIndex.from_env(JOB_ROLES)
+        return _role_index
@@ -0,0 +1,143 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+# Lower number = served first
+PRIORITY_INTERACTIVE = 0  # chat, streamed answers
+PRIORITY_STANDARD = 1     # one-off generations (skills, roadmaps, interview feedback)
+PRIORITY_BULK = 2         # assessment scoring
+
+
+class OverloadedError(Exception):
+    """Raised when a request cannot be admitted; carries the HTTP status and Retry-After seconds"""
+
+    def __init__(self, message, status_code=429, retry_after=1):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Concurrency limiter with a bounded priority wait queue.
+
+    At most max_concurrent requests hold a slot at a time. Others wait in a
+    queue ordered by priority, then arrival. A request is rejected immediately
+    (429) when the queue already holds max_queue waiters, and gives up (503)
+    if it waited longer than queue_timeout seconds. Both carry a Retry-After
+    estimate derived from recent service times.
+    """
+
+    def __init__(self, max_concurrent=2, max_queue=32, queue_timeout=30.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._queued = 0
+        self._waiters = []  # heap of (priority, seq, future)
+        self._seq = itertools.count()
+        self._wait_times = deque(maxlen=1000)
+        self._service_times = deque(maxlen=100)
+        self.stats = {
+            "admitted": 0,
+            "rejected": 0,
+            "timed_out": 0,
+            "max_queue_depth": 0,
+        }
+
+    async def acquire(self, priority=PRIORITY_STANDARD):
+        """Wait for a slot; raises OverloadedError if the queue is full or the wait times out"""
+        if self._active < self.max_concurrent and self._queued == 0:
+            self._active += 1
+            self._admitted(0.0)
+            return
+
+        if self._queued >= self.max_queue:
+            self.stats["rejected"] += 1
+            raise OverloadedError(
+                "Too many AI requests are waiting. Please try again shortly.",
+                status_code=429,
+                retry_after=self.retry_after(),
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._queued += 1
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self._queued)
+        started = time.monotonic()
+
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._queued -= 1
+            self.stats["timed_out"] += 1
+            raise OverloadedError(
+                "The AI service is busy. Please try again shortly.",
+                status_code=503,
+                retry_after=self.retry_after(),
+            )
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we were cancelled; pass it on
+                self.release()
+            else:
+                self._queued -= 1
+            raise
+
+        self._admitted(time.monotonic() - started)
+
+    def release(self, service_time=None):
+        """Free a slot, handing it straight to the highest-priority waiter if there is one"""
+        if service_time is not None:
+            self._service_times.append(service_time)
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self._queued -= 1
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority=PRIORITY_STANDARD):
+        await self.acquire(priority)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def _admitted(self, wait_time):
+        self.stats["admitted"] += 1
+        self._wait_times.append(wait_time)
+
+    def retry_after(self):
+        """Seconds until a slot is likely to free up, based on recent service times"""
+        if not self._service_times:
+            return 1
+        avg_service = sum(self._service_times) / len(self._service_times)
+        batches = (self._queued + 1) / max(1, self.max_concurrent)
+        return max(1, math.ceil(avg_service * batches))
+
+    def get_stats(self):
+        waits = sorted(self._wait_times)
+
+        def percentile(p):
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))], 4)
+
+        return {
+            **self.stats,
+            "active": self._active,
+            "queue_depth": self._queued,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "wait_p50": percentile(0.50),
+            "wait_p95": percentile(0.95),
+            "wait_max": round(waits[-1], 4) if waits else 0.0,
+        }
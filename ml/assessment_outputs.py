@@ -0,0 +1,137 @@
+"""
+AI outputs for prompt-engineering assessments.
+
+The output a student's prompt produces depends only on the model and the
+prompt, so it is cached per (model, prompt) in its own table: students who
+submit the same prompt, and retries of one submission, reuse one generation.
+The cache is kept longer than the general response cache since assessment
+prompts repeat across whole cohorts.
+
+In deferred mode the prompt is scored right away and the output is generated
+in the background; PendingOutputs tracks those generations until the client
+fetches the completed assessment.
+"""
+import asyncio
+import os
+import time
+import uuid
+
+from admission import OverloadedError, PRIORITY_BULK
+from llm_cache import LLMResponseCache, make_cache_key
+from ollama_client import DEFAULT_OPTIONS, MODEL_NAME, generate_ollama, ollama_error_message
+from single_flight import SingleFlight
+
+# ASSESSMENT_OUTPUT_DB enables the SQLite tier that survives restarts; ASSESSMENT_OUTPUT_CACHE_SIZE=0 disables caching
+ASSESSMENT_OUTPUT_CACHE_SIZE = int(os.getenv("ASSESSMENT_OUTPUT_CACHE_SIZE", "4096"))
+ASSESSMENT_OUTPUT_TTL = float(os.getenv("ASSESSMENT_OUTPUT_TTL", str(7 * 24 * 3600)))
+ASSESSMENT_OUTPUT_DB = os.getenv("ASSESSMENT_OUTPUT_DB", "")
+# Deferred outputs can be fetched for this long after the assessment was submitted
+ASSESSMENT_PENDING_TTL = float(os.getenv("ASSESSMENT_PENDING_TTL", "3600"))
+
+output_cache = LLMResponseCache(
+    ASSESSMENT_OUTPUT_CACHE_SIZE, ASSESSMENT_OUTPUT_TTL, ASSESSMENT_OUTPUT_DB or None, table="assessment_outputs"
+) if ASSESSMENT_OUTPUT_CACHE_SIZE > 0 else None
+# Students submitting the same prompt at the same moment share one generation
+inflight = SingleFlight()
+
+
+def output_key(prompt):
+    return make_cache_key(MODEL_NAME, prompt, DEFAULT_OPTIONS)
+
+
+def cached_output(prompt):
+    """The cached output for the prompt, or None"""
+    return output_cache.get(output_key(prompt)) if output_cache is not None else None
+
+
+async def assessment_output(prompt, priority=PRIORITY_BULK):
+    """
+    The model's output for an assessment prompt, from the cache when possible.
+
+    Raises:
+        OverloadedError: if the admission queue is full or the wait timed out
+        httpx.HTTPError: if generation fails (failures are never cached)
+    """
+    key = output_key(prompt)
+    cached = output_cache.get(key) if output_cache is not None else None
+    if cached is not None:
+        return cached
+
+    async def generate():
+        result = await generate_ollama(prompt, priority=priority)
+        if output_cache is not None and result:
+            output_cache.set(key, result)
+        return result
+
+    return await inflight.do(key, generate)
+
+
+class PendingOutputs:
+    """
+    In-process registry of assessments scored before their AI output was ready.
+
+    start() launches the generation and returns an id; get() reports it as
+    pending, overloaded (with the admission status code and Retry-After),
+    failed (with a user-facing error) or ready (with the output).
+    Entries are dropped ttl_seconds after they were started.
+    """
+
+    def __init__(self, ttl_seconds=ASSESSMENT_PENDING_TTL):
+        self.ttl_seconds = ttl_seconds
+        self._entries = {}  # id -> (expires_at, question, prompt, task)
+
+    def start(self, question, prompt, priority=PRIORITY_BULK):
+        self.cleanup()
+        assessment_id = uuid.uuid4().hex
+        task = asyncio.ensure_future(assessment_output(prompt, priority))
+        # Failures are reported through get(); retrieve them so unpolled tasks do not log
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._entries[assessment_id] = (time.time() + self.ttl_seconds, question, prompt, task)
+        return assessment_id
+
+    def get(self, assessment_id):
+        """{"status", "question", "userPrompt", "aiOutput" | "error"[, "statusCode", "retryAfter"]}, or None if unknown/expired"""
+        entry = self._entries.get(assessment_id)
+        if entry is None or entry[0] < time.time():
+            return None
+        _, question, prompt, task = entry
+        job = {"status": "pending", "question": question, "userPrompt": prompt}
+        if not task.done():
+            return job
+        if task.cancelled():
+            return {**job, "status": "failed", "error": "Output generation was cancelled"}
+        error = task.exception()
+        if isinstance(error, OverloadedError):
+            return {**job, "status": "overloaded", "error": str(error),
+                    "statusCode": error.status_code, "retryAfter": error.retry_after}
+        if error is not None:
+            return {**job, "status": "failed", "error": ollama_error_message(error)}
+        return {**job, "status": "ready", "aiOutput": task.result()}
+
+    def cleanup(self):
+        """Drop expired entries; returns how many were removed"""
+        now = time.time()
+        expired = [assessment_id for assessment_id, entry in self._entries.items() if entry[0] < now]
+        for assessment_id in expired:
+            self._entries.pop(assessment_id)[3].cancel()
+        return len(expired)
+
+    async def stop(self):
+        tasks = [entry[3] for entry in self._entries.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._entries.clear()
+
+    def get_stats(self):
+        return {
+            "pending": sum(not entry[3].done() for entry in self._entries.values()),
+            "tracked": len(self._entries),
+        }
+
+
+def get_assessment_output_stats():
+    return {
+        "cache": output_cache.get_stats() if output_cache is not None else None,
+        "coalescing": inflight.get_stats(),
+    }
@@ -0,0 +1,107 @@
+"""
+Benchmark: does /analyze-resume keep the event loop free?
+
+Runs several /analyze-resume requests whose extraction is slowed down to mimic
+OCR, and meanwhile polls the cheap GET /llm_stats endpoint. With extraction on
+the analysis executor and the async Gemini client, the polls keep answering in
+milliseconds; with blocking calls they would stall for the whole analysis.
+Fails if a probe waited as long as one extraction or if the analyses ran one
+after another. Also checks that the sync and async Ollama analyzers send the
+same request and parse the answer the same way, against benchmarks/fake_ollama.py.
+
+Usage (from ml/):
+    python benchmarks/bench_analyze_resume_concurrency.py --analyses 4 --extract-seconds 1.5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import main
+import ollama_client
+from benchmarks.fake_ollama import start_fake_ollama
+from ollama_client import close_client
+
+RESUME_TEXT = "Jane Doe\nSoftware Engineer\nExperience\nBuilt Python services with FastAPI and PostgreSQL. " * 20
+
+
+async def check_ollama_parity():
+    """The sync and async Ollama analyzers must send the same request and return the same result"""
+    fake, url, server = start_fake_ollama(latency=0.01)
+    analyzer = main.ai_analyzer
+    analyzer.ollama_base_url = url[:-len("/api/generate")]
+    ollama_client.OLLAMA_API_URL = url
+    try:
+        sync_result = await asyncio.get_running_loop().run_in_executor(
+            None, analyzer.analyze_resume_with_ollama, RESUME_TEXT, "Python backend role", "Software Engineer")
+        async_result = await analyzer.analyze_resume_with_ollama_async(
+            RESUME_TEXT, "Python backend role", "Software Engineer")
+    finally:
+        await close_client()
+        server.should_exit = True
+    assert "error" not in sync_result, sync_result
+    assert sync_result == async_result, (sync_result, async_result)
+    assert fake.calls == 2
+    assert fake.requests[0] == fake.requests[1], fake.requests
+    print("sync and async Ollama analyzers agree")
+
+
+async def run(args):
+    await check_ollama_parity()
+
+    def slow_extract(_content):
+        time.sleep(args.extract_seconds)  # blocking, like pdfplumber/Tesseract
+        return RESUME_TEXT
+
+    async def fake_gemini(text, job_description=None, job_role=None):
+        await asyncio.sleep(args.llm_seconds)
+        return {"analysis": "ok", "resume_score": 70, "ats_score": 65, "model_used": "fake"}
+
+    main.ai_analyzer.extract_text_from_pdf = slow_extract
+    main.ai_analyzer.analyze_resume_with_gemini_async = fake_gemini
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        probe_latencies = []
+        done = asyncio.Event()
+
+        async def analyze(i):
+            files = {"file": (f"resume{i}.pdf", b"%PDF-1.4 fake", "application/pdf")}
+            response = await client.post("/analyze-resume", files=files, data={"job_role": "Software Engineer"})
+            response.raise_for_status()
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                (await client.get("/llm_stats")).raise_for_status()
+                probe_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.05)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(analyze(i) for i in range(args.analyses)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    lat = np.array(probe_latencies) * 1000
+    print(f"{args.analyses} analyses finished in {elapsed:.2f}s "
+          f"(serial blocking would take >= {args.analyses * args.extract_seconds:.2f}s)")
+    print(f"concurrent probe requests: {len(lat)}  p50={np.percentile(lat, 50):.2f}ms  max={lat.max():.2f}ms")
+    assert lat.max() < args.extract_seconds * 1000, "a probe waited for a whole extraction: the event loop was blocked"
+    if args.analyses > 1 and main.ANALYSIS_WORKERS > 1:
+        assert elapsed < args.analyses * args.extract_seconds, "analyses did not overlap"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--analyses", type=int, default=4)
+    parser.add_argument("--extract-seconds", type=float, default=1.5)
+    parser.add_argument("--llm-seconds", type=float, default=1.0)
+    asyncio.run(run(parser.parse_args()))
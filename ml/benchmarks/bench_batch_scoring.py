@@ -0,0 +1,112 @@
+"""
+Benchmark: resumes/sec for batch scoring vs. one /score_resume/ call per file.
+
+Builds N synthetic resumes (DOCX by default, or TXT to leave document parsing
+out), then scores them against one job description twice through the ASGI
+app: a single /score_resume/batch request with all of them in a zip, then one
+/score_resume/ request per resume. The batch runs first so both see the same
+BM25 corpus statistics, and the scores are checked to be identical.
+
+Usage (from ml/):
+    python benchmarks/bench_batch_scoring.py --resumes 200 --format docx
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import sys
+import time
+import zipfile
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+# Keep the benchmark's documents out of the persistent BM25 corpus
+os.environ.setdefault("RELEVANCE_DB", "")
+
+import main
+
+JOB_DESCRIPTION = (
+    "We are hiring a backend engineer with strong Python, SQL and cloud experience. "
+    "You will design APIs, build data pipelines, deploy services on AWS with Docker and "
+    "Kubernetes, and mentor engineers. Machine learning and big data exposure is a plus."
+)
+VOCABULARY = (
+    "python sql cloud aws docker kubernetes api pipelines data machine learning java react "
+    "design deploy mentor engineers services backend frontend analytics spark kafka testing "
+    "led built improved reduced latency customers team migration reporting platform"
+).split()
+
+
+def make_resume(rng, index, fmt):
+    lines = [f"Candidate {index}", "Experience"]
+    lines += [" ".join(rng.choice(VOCABULARY) for _ in range(14)) + "." for _ in range(25)]
+    lines += ["Skills", ", ".join(rng.sample(VOCABULARY, 10))]
+    if fmt == "txt":
+        return f"resume_{index}.txt", "\n".join(lines).encode()
+
+    import docx
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return f"resume_{index}.docx", buffer.getvalue()
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    resumes = [make_resume(rng, i, args.format) for i in range(args.resumes)]
+    jd = ("job.txt", JOB_DESCRIPTION.encode())
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        # One batch request with a zip of all resumes
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+            for filename, data in resumes:
+                zf.writestr(f"resumes/{filename}", data)
+
+        started = time.perf_counter()
+        batch_scores, summary = {}, None
+        async with client.stream("POST", "/score_resume/batch",
+                                 files={"archive": ("resumes.zip", archive.getvalue()), "job_desc": jd}) as response:
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                event = json.loads(line[len("data: "):])
+                if "rank" in event:
+                    batch_scores[os.path.basename(event["filename"])] = event["score"]
+                elif event.get("done"):
+                    summary = event
+        batch_seconds = time.perf_counter() - started
+
+        # One request per resume, as a client would do today
+        started = time.perf_counter()
+        single_scores = {}
+        for filename, data in resumes:
+            response = await client.post("/score_resume/", files={"resume": (filename, data), "job_desc": jd})
+            single_scores[filename] = response.json()["score"]
+        single_seconds = time.perf_counter() - started
+
+    assert batch_scores == single_scores, "batch and single scores differ"
+    n = len(resumes)
+    print(f"{n} {args.format.upper()} resumes, analysis workers={main.ANALYSIS_WORKERS}")
+    print(f"  one request per resume: {single_seconds:7.2f}s  {n / single_seconds:8.1f} resumes/sec")
+    print(f"  one batch request:      {batch_seconds:7.2f}s  {n / batch_seconds:8.1f} resumes/sec"
+          f"  (server-reported {summary['resumes_per_sec']})")
+    print(f"  speedup: {single_seconds / batch_seconds:.1f}x")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--format", choices=["docx", "txt"], default="docx")
+    parser.add_argument("--seed", type=int, default=3)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,72 @@
+"""
+Benchmark: users/sec for cohort burnout analysis.
+
+Builds a synthetic cohort (10k students by default, each with a few weeks of
+activity) and analyzes it twice: one detect_burnout() call per student, as
+one /detect_burnout request per student does today, and one
+detect_burnout_batch() call over the whole cohort. Checks that both give
+identical results.
+
+Usage (from ml/):
+    python benchmarks/bench_burnout_batch.py --users 10000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+# The benchmark does not touch the per-user incremental state
+os.environ.setdefault("BURNOUT_STATE_DB", "")
+
+from burnout_detector import TIME_OF_DAY, detect_burnout, detect_burnout_batch
+
+
+def make_log(rng, start):
+    """A student's activity over 2-6 weeks: most days active, some late nights"""
+    log = []
+    for day in range(rng.randint(14, 42)):
+        if rng.random() < 0.2:
+            continue
+        for _ in range(rng.randint(1, 3)):
+            timestamp = start + timedelta(days=day, hours=rng.uniform(6, 24))
+            log.append({
+                "timestamp": timestamp.isoformat() + "Z",
+                "action": "study",
+                "duration": rng.choice([0, 30, 45, 60, 90, 120, 240, 420]),
+                "timeOfDay": rng.choice(TIME_OF_DAY),
+            })
+    return log
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    start = datetime(2026, 1, 5)
+    logs = [make_log(rng, start) for _ in range(args.users)]
+    activities = sum(len(log) for log in logs)
+
+    started = time.perf_counter()
+    single = [detect_burnout(log) for log in logs]
+    single_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batch = detect_burnout_batch(logs)
+    batch_seconds = time.perf_counter() - started
+
+    assert single == batch, "batch and per-user results differ"
+    n = len(logs)
+    print(f"{n} users, {activities} activities")
+    print(f"  one detect_burnout per user: {single_seconds:7.2f}s  {n / single_seconds:10.0f} users/sec")
+    print(f"  one columnar batch:          {batch_seconds:7.2f}s  {n / batch_seconds:10.0f} users/sec")
+    print(f"  speedup: {single_seconds / batch_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark: CareerSimulator.run_simulation cost vs. number of simulations.
+
+Compares the vectorized engine (one (simulations x years) draw from a seeded
+Generator, one np.percentile call over axis 0) with the previous engine,
+reproduced below as the reference: one np.random.normal scalar per
+simulation and year in a Python loop, plus a second independent sample for
+the success rate. Also checks that both agree on the final-year average
+salary within sampling error.
+
+Then times both models (independent draws and compounding paths with jumps)
+at 100k simulations over 5- to 30-year horizons, and a full scenario sweep
+(every career x DEFAULT_SCENARIOS) as one simulate_scenarios() call vs. one
+CareerSimulator per cell.
+
+Usage (from ml/):
+    python benchmarks/bench_career_simulator.py --repeat 3
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from career_simulator import (CAREER_DATA, DEFAULT_SCENARIOS, MODEL_INDEPENDENT, MODEL_PATH, CareerSimulator,
+                              simulate_scenarios)
+
+
+def reference_simulation(career_info, num_simulations):
+    """The per-scalar loop run_simulation used before vectorizing"""
+    base_salary = career_info["base_salary"]
+    growth_rate = career_info["salary_growth_rate"]
+    volatility = career_info["volatility"]
+    yearly = []
+    for year in range(1, 6):
+        year_salaries = []
+        for _ in range(num_simulations):
+            random_factor = np.random.normal(1.0, volatility)
+            year_salaries.append(base_salary * ((1 + growth_rate) ** year) * random_factor)
+        salaries_array = np.array(year_salaries)
+        yearly.append((np.percentile(salaries_array, 10), np.percentile(salaries_array, 90),
+                       np.mean(salaries_array)))
+    final_year_salaries = [base_salary * ((1 + growth_rate) ** 5) * np.random.normal(1.0, volatility)
+                           for _ in range(num_simulations)]
+    median_salary = np.median(final_year_salaries)
+    sum(1 for s in final_year_salaries if s >= median_salary)
+    return yearly
+
+
+def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - started) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--career", default="Software Engineering", choices=sorted(CAREER_DATA))
+    args = parser.parse_args()
+    career_info = CAREER_DATA[args.career]
+
+    print(f"{'simulations':>11} {'reference ms':>13} {'vectorized ms':>14} {'speedup':>8}")
+    for count in (1_000, 10_000, 100_000):
+        before, reference = timed(lambda: reference_simulation(career_info, count), args.repeat)
+        after, results = timed(lambda: CareerSimulator(args.career, None, count, seed=42).run_simulation(),
+                               args.repeat)
+        last = results["yearlyProjections"][-1]
+        tolerance = 0.05 * career_info["base_salary"] * (1 + career_info["salary_growth_rate"]) ** 5
+        assert abs(last["salaryAvg"] - reference[-1][2]) < tolerance, "vectorized mean is off"
+        print(f"{count:>11} {before * 1000:>13.1f} {after * 1000:>14.1f} {before / after:>7.0f}x")
+
+    profile = {"experience": 2, "education": "Bachelor"}
+    print(f"\n{'years':>5} {'independent ms':>15} {'path ms':>8} {'path downside %':>16}")
+    for years in (5, 10, 20, 30):
+        independent, _ = timed(lambda: CareerSimulator(args.career, profile, 100_000, years=years, seed=42,
+                                                       model=MODEL_INDEPENDENT).run_simulation(), args.repeat)
+        path, results = timed(lambda: CareerSimulator(args.career, profile, 100_000, years=years, seed=42,
+                                                      model=MODEL_PATH).run_simulation(), args.repeat)
+        print(f"{years:>5} {independent * 1000:>15.1f} {path * 1000:>8.1f} {results['downsideRate']:>16.2f}")
+
+    def per_cell():
+        for career in CAREER_DATA:
+            for scenario in DEFAULT_SCENARIOS:
+                CareerSimulator(career, profile, 10_000, years=10, seed=42, model=MODEL_PATH).run_simulation()
+
+    cells = len(CAREER_DATA) * len(DEFAULT_SCENARIOS)
+    before, _ = timed(per_cell, args.repeat)
+    after, _ = timed(lambda: simulate_scenarios(list(CAREER_DATA), None, profile, 10, MODEL_PATH, 10_000, 42),
+                     args.repeat)
+    print(f"\nsweep of {cells} cells x 10k paths x 10 years: one simulator per cell {before * 1000:.1f} ms, "
+          f"one batched sweep {after * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: skill matching cost vs. number of skills and resume length.
+
+Compares the per-skill substring scan calculate_keyword_match used to do
+(`skill in text`, then `skill in phrase` for every '.'-separated phrase) with
+KeywordMatcher.labels() on the same text, which lowercases the text once and
+stops at the first whole-word occurrence of each skill or alias. Both scan the
+text once per term. The matcher also checks aliases and word boundaries, so with
+a short skill list on long text it is somewhat slower than the bare scan; it
+gains from skipping the per-phrase rescans of missing skills.
+
+Usage (from ml/):
+    python benchmarks/bench_keyword_matcher.py --repeat 20
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.keyword_matcher import SKILL_ALIASES, KeywordMatcher, skill_terms
+
+
+def substring_scan(text, skills):
+    text = text.lower()
+    found = []
+    for skill in skills:
+        skill_lower = skill.lower()
+        if skill_lower in text:
+            found.append(skill)
+        elif any(skill_lower in phrase for phrase in text.split('.')):
+            found.append(skill)
+    return found
+
+
+def make_skills(rng, count):
+    base = sorted(SKILL_ALIASES)
+    syllables = ["ka", "zo", "tri", "mex", "qua", "lon", "vor", "pix", "dra", "sul"]
+    skills = list(base)
+    while len(skills) < count:
+        skills.append("".join(rng.choice(syllables) for _ in range(3)))
+    return skills[:count]
+
+
+def make_text(rng, skills, words):
+    vocab = ("built scalable services with a team of engineers improving latency and "
+             "reliability for customers across regions using").split()
+    out = []
+    for i in range(words):
+        out.append(rng.choice(skills) if rng.random() < 0.03 else rng.choice(vocab))
+        if i % 15 == 14:
+            out[-1] += "."
+    return " ".join(out)
+
+
+def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    print(f"{'skills':>6} {'words':>6} {'substring ms':>13} {'matcher ms':>11} {'speedup':>8}")
+    for skill_count in (20, 100, 400):
+        skills = make_skills(rng, skill_count)
+        matcher = KeywordMatcher({skill: skill_terms(skill) for skill in skills})
+        for words in (300, 1500, 6000):
+            text = make_text(rng, skills, words)
+            before = timed(lambda: substring_scan(text, skills), args.repeat)
+            after = timed(lambda: matcher.labels(text), args.repeat)
+            print(f"{skill_count:>6} {words:>6} {before * 1000:>13.2f} {after * 1000:>11.2f} "
+                  f"{before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
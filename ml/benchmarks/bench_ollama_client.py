@@ -0,0 +1,74 @@
+"""
+Benchmark: per-call httpx.AsyncClient (old query_ollama) vs the shared pooled client.
+
+Usage (from ml/):
+    python benchmarks/bench_ollama_client.py --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from admission import AdmissionController
+from benchmarks.fake_ollama import start_fake_ollama
+
+
+async def per_call_client(url, prompt):
+    # Mirrors the original query_ollama: a fresh client (and TCP connection) per call
+    async with httpx.AsyncClient(timeout=120.0) as client:
+        response = await client.post(url, json={"model": "bench", "prompt": prompt, "stream": False})
+        response.raise_for_status()
+        return response.json().get("response", "")
+
+
+async def run(label, call, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await call(f"prompt {i}")
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+
+    lat = np.array(latencies) * 1000
+    print(f"{label:<18} p50={np.percentile(lat, 50):7.2f}ms  p99={np.percentile(lat, 99):7.2f}ms  "
+          f"{total / elapsed:8.1f} req/s")
+
+
+async def main(args):
+    _, url, server = start_fake_ollama(latency=args.latency)
+    os.environ["OLLAMA_API_URL"] = url
+
+    import ollama_client
+    ollama_client.OLLAMA_API_URL = url
+    # Admit the whole benchmark load so it measures connections, not the admission queue
+    ollama_client.admission = AdmissionController(args.concurrency, args.requests)
+
+    await run("per-call client", lambda p: per_call_client(url, p), args.requests, args.concurrency)
+
+    await ollama_client.start_client()
+    # Bypass the response cache and single-flight so every call reaches the server
+    await run("pooled client", lambda p: ollama_client.query_ollama(p, use_cache=False),
+              args.requests, args.concurrency)
+    await ollama_client.close_client()
+
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.002, help="fake generation time in seconds")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,89 @@
+"""
+Benchmark: grading a skill-assessment cohort with the prompt evaluator.
+
+Scores N synthetic (question, prompt, AI output) submissions three ways: one
+evaluator per submission that builds its own indicator matcher (what
+assess_prompt_engineering() did before the matcher moved to module level),
+one assess_prompt_engineering() call per submission on the shared evaluator,
+and one assess_prompt_engineering_batch() call. Checks that all three agree.
+Building the matcher only lowercases the indicator list, so the three differ
+little; the cost per submission is the per-indicator scans of the prompt and
+the AI output.
+
+Usage (from ml/):
+    python benchmarks/bench_prompt_evaluator.py --submissions 5000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from prompt_evaluator import (INDICATOR_FAMILIES, PromptEvaluator, assess_prompt_engineering,
+                              assess_prompt_engineering_batch)
+from utils.keyword_matcher import KeywordMatcher
+
+QUESTIONS = [
+    "Write a prompt that summarizes a research paper",
+    "Ask the model to debug a failing SQL query",
+    "Get a step-by-step study plan for data structures",
+]
+FILLER = ("please write the answer for my project about students in the class using python and a short "
+          "report with the key points and next steps").split()
+
+
+def make_submission(rng):
+    question = rng.choice(QUESTIONS)
+    indicators = [word for words in INDICATOR_FAMILIES.values() for word in words]
+    words = [rng.choice(indicators) if rng.random() < 0.15 else rng.choice(FILLER)
+             for _ in range(rng.randint(4, 60))]
+    prompt = (question + ". " if rng.random() < 0.3 else "") + " ".join(words)
+    output = " ".join(rng.choice(indicators) if rng.random() < 0.05 else rng.choice(FILLER)
+                      for _ in range(rng.randint(40, 200)))
+    return question, prompt, output
+
+
+def fresh_evaluator():
+    """An evaluator that builds its matcher per instance, as the constructor used to"""
+    evaluator = PromptEvaluator()
+    evaluator._indicator_matcher = KeywordMatcher(
+        {(family, indicator): [indicator] for family, indicators in INDICATOR_FAMILIES.items()
+         for indicator in indicators},
+        word_boundary=False,
+    )
+    return evaluator
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--submissions", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=17)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    submissions = [make_submission(rng) for _ in range(args.submissions)]
+
+    started = time.perf_counter()
+    fresh = [fresh_evaluator().evaluate_prompt(*submission) for submission in submissions]
+    fresh_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    shared = [assess_prompt_engineering(*submission) for submission in submissions]
+    shared_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batch = assess_prompt_engineering_batch(submissions)
+    batch_seconds = time.perf_counter() - started
+
+    assert fresh == shared == batch, "evaluator results differ"
+    n = len(submissions)
+    print(f"{n} submissions")
+    for label, seconds in (("evaluator per call", fresh_seconds), ("shared evaluator", shared_seconds),
+                           ("batch", batch_seconds)):
+        print(f"  {label:<23} {seconds * 1000:8.1f} ms  {seconds / n * 1e6:7.1f} us/submission")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark: section extraction in ResumeAnalyzer.
+
+Compares the single segmentation pass shared by extract_education /
+extract_experience / extract_projects / extract_skills / extract_summary
+with the previous approach, where each extractor re-scanned every line with
+its own `any(keyword in line.lower() ...)` loops (reproduced below as the
+reference). Also checks that both produce identical sections.
+
+Usage (from ml/):
+    python benchmarks/bench_resume_sections.py --repeat 20
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.resume_analyzer import ResumeAnalyzer, SECTION_KEYWORDS
+
+SEPARATORS = [',', '•', '|', '/', '\\', '·', '>', '-', '–', '―']
+
+
+def reference_entries(lines, keywords, resume_keywords):
+    """The per-extractor scan the section extractors used before segmentation"""
+    entries = []
+    in_section = False
+    current_entry = []
+    for line in lines:
+        line = line.strip()
+        if any(keyword.lower() in line.lower() for keyword in keywords):
+            if not any(keyword.lower() == line.lower() for keyword in keywords):
+                current_entry.append(line)
+            in_section = True
+            continue
+        if in_section:
+            if line and any(keyword.lower() in line.lower() for keyword in resume_keywords):
+                if not any(key.lower() in line.lower() for key in keywords):
+                    in_section = False
+                    if current_entry:
+                        entries.append(current_entry)
+                        current_entry = []
+                    continue
+            if line:
+                current_entry.append(line)
+            elif current_entry:
+                entries.append(current_entry)
+                current_entry = []
+    if current_entry:
+        entries.append(current_entry)
+    return entries
+
+
+def reference_sections(analyzer, text):
+    lines = text.split('\n')
+    resume_keywords = analyzer.document_types['resume']
+    sections = {}
+    for section in ('education', 'experience', 'projects'):
+        entries = reference_entries(lines, SECTION_KEYWORDS[section], resume_keywords)
+        sections[section] = [' '.join(entry) for entry in entries]
+
+    skills = set()
+    for entry in reference_entries(lines, SECTION_KEYWORDS['skills'], resume_keywords):
+        joined = ' '.join(entry)
+        for separator in SEPARATORS:
+            if separator in joined:
+                skills.update(skill.strip() for skill in joined.split(separator) if skill.strip())
+    sections['skills'] = sorted(skills)
+
+    summary = []
+    first_lines = [line.strip() for line in lines if line.strip()][:5]
+    if first_lines and not any(keyword in first_lines[0].lower() for keyword in SECTION_KEYWORDS['summary']):
+        potential_summary = ' '.join(first_lines)
+        if len(potential_summary.split()) > 10:
+            if not re.search(r'\b(?:email|phone|address|tel|mobile|linkedin)\b', potential_summary.lower()):
+                summary.append(potential_summary)
+    summary.extend(' '.join(entry) for entry in
+                   reference_entries(lines, SECTION_KEYWORDS['summary'], resume_keywords))
+    sections['summary'] = ' '.join(summary)
+    return sections
+
+
+def segmented_sections(analyzer, text):
+    segments = analyzer.segment_lines(text)
+    return {
+        'education': analyzer.extract_education(text, segments),
+        'experience': analyzer.extract_experience(text, segments),
+        'projects': analyzer.extract_projects(text, segments),
+        'skills': sorted(analyzer.extract_skills(text, segments)),
+        'summary': analyzer.extract_summary(text, segments),
+    }
+
+
+def make_resume(rng, blocks):
+    """A synthetic resume with `blocks` repetitions of the usual sections"""
+    words = ("python sql docker kubernetes react aws led built designed improved pipeline "
+             "latency customers platform team migration reporting api tests").split()
+    lines = ["Jane Doe", "jane@example.com | 555-123-4567 | linkedin.com/in/janedoe", ""]
+    for i in range(blocks):
+        lines += ["PROFESSIONAL SUMMARY",
+                  "Engineer with " + " ".join(rng.choice(words) for _ in range(25)), ""]
+        lines += ["Work Experience"]
+        for _ in range(4):
+            lines += [f"Senior Engineer, Company {rng.randint(1, 99)} (20{rng.randint(10, 23)} - Present)"]
+            lines += ["• " + " ".join(rng.choice(words) for _ in range(12)) for _ in range(3)]
+            lines += [""]
+        lines += ["Projects", f"Project {i}: " + " ".join(rng.choice(words) for _ in range(15)), ""]
+        lines += ["Education", f"B.Tech in Computer Science, University {i} 2016 - 2020", "CGPA 8.7", ""]
+        lines += ["Technical Skills", ", ".join(rng.sample(words, 8)), ""]
+    return "\n".join(lines)
+
+
+def bench(fn, analyzer, text, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(analyzer, text)
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    analyzer = ResumeAnalyzer()
+
+    print(f"{'blocks':>6} {'lines':>6} {'reference ms':>13} {'segmented ms':>13} {'speedup':>8}")
+    for blocks in (1, 5, 25, 100):
+        text = make_resume(rng, blocks)
+        assert reference_sections(analyzer, text) == segmented_sections(analyzer, text), "section mismatch"
+        before = bench(reference_sections, analyzer, text, args.repeat)
+        after = bench(segmented_sections, analyzer, text, args.repeat)
+        print(f"{blocks:>6} {text.count(chr(10)) + 1:>6} {before * 1000:>13.2f} {after * 1000:>13.2f} "
+              f"{before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Minimal stand-in for the Ollama /api/generate endpoint, used by the benchmarks.
+
+Non-streaming requests get a single JSON body; streaming requests get NDJSON
+chunks, one word per line, like the real server.
+"""
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import uvicorn
+
+
+class FakeOllama:
+    def __init__(self, latency=0.005, words=20):
+        self.latency = latency
+        self.words = words
+        self.calls = 0
+        self.requests = []  # request bodies, in arrival order
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+
+        body = b""
+        more = True
+        while more:
+            message = await receive()
+            body += message.get("body", b"")
+            more = message.get("more_body", False)
+        payload = json.loads(body or b"{}")
+        self.calls += 1
+        self.requests.append(payload)
+
+        await asyncio.sleep(self.latency)
+        text = " ".join(f"word{i}" for i in range(self.words))
+
+        if payload.get("stream"):
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"application/x-ndjson")]})
+            for i in range(self.words):
+                chunk = {"model": payload.get("model"), "response": f"word{i} ", "done": False}
+                await send({"type": "http.response.body", "body": (json.dumps(chunk) + "\n").encode(), "more_body": True})
+                await asyncio.sleep(self.latency / self.words)
+            done = {"model": payload.get("model"), "response": "", "done": True}
+            await send({"type": "http.response.body", "body": (json.dumps(done) + "\n").encode()})
+            return
+
+        data = json.dumps({"model": payload.get("model"), "response": text, "done": True}).encode()
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": data})
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_fake_ollama(latency=0.005, words=20):
+    """Run a FakeOllama server in a background thread; returns (app, url, server)"""
+    app = FakeOllama(latency=latency, words=words)
+    port = _free_port()
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096)
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return app, f"http://127.0.0.1:{port}/api/generate", server
@@ -1,6 +1,96 @@
 from datetime import datetime, timedelta
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
 import numpy as np
 
+# Time-of-day buckets in the order ties for the peak are broken
+TIME_OF_DAY = ("morning", "afternoon", "evening", "night", "late-night")
+LATE_NIGHT = "late-night"
+# Fewer activities than this are not enough to assess
+MIN_ACTIVITIES = 5
+
+
+def parse_timestamp(value):
+    """datetime for an activity timestamp given as a datetime or an ISO string (a trailing Z means UTC)"""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return value
+
+
+def activity_day(activity):
+    """Calendar day of an activity as a proleptic ordinal (consecutive days differ by 1)"""
+    return parse_timestamp(activity.get("timestamp", datetime.now())).date().toordinal()
+
+
+def insufficient_data_result():
+    return {
+        "burnoutRisk": 0,
+        "stressLevel": 5,
+        "activityPattern": {
+            "lateNightSessions": 0,
+            "consecutiveDays": 0,
+            "averageSessionLength": 0,
+            "peakProductivityTime": "unknown",
+        },
+    }
+
+
+def score_burnout(late_night_count, consecutive_days, avg_session_length, peak_time):
+    """Burnout risk, stress level and activity pattern from the aggregate metrics"""
+    # Calculate burnout risk (0-100)
+    burnout_risk = 0
+    
+    # Late night sessions increase risk
+    if late_night_count > 5:
+        burnout_risk += 30
+    elif late_night_count > 3:
+        burnout_risk += 20
+    elif late_night_count > 1:
+        burnout_risk += 10
+    
+    # Consecutive days without break
+    if consecutive_days > 10:
+        burnout_risk += 40
+    elif consecutive_days > 7:
+        burnout_risk += 25
+    elif consecutive_days > 5:
+        burnout_risk += 15
+    
+    # Long session lengths
+    if avg_session_length > 6:
+        burnout_risk += 20
+    elif avg_session_length > 4:
+        burnout_risk += 10
+    
+    # Cap at 100
+    burnout_risk = min(100, burnout_risk)
+    
+    # Stress level (1-10) correlates with burnout risk
+    stress_level = min(10, max(1, int(burnout_risk / 10)))
+    
+    return {
+        "burnoutRisk": burnout_risk,
+        "stressLevel": stress_level,
+        "activityPattern": {
+            "lateNightSessions": late_night_count,
+            "consecutiveDays": consecutive_days,
+            "averageSessionLength": round(avg_session_length, 2),
+            "peakProductivityTime": peak_time,
+        },
+    }
+
+
+def peak_time_of_day(counts):
+    """Bucket with the most activity given counts in TIME_OF_DAY order, or 'unknown' if there is none"""
+    if sum(counts) == 0:
+        return "unknown"
+    return TIME_OF_DAY[max(range(len(TIME_OF_DAY)), key=lambda i: (counts[i], -i))]
+
+
 class BurnoutDetector:
     """Analyze user activity patterns to detect burnout risk"""
     
@@ -9,64 +99,15 @@ class BurnoutDetector:
     
     def analyze(self):
         """Main analysis function"""
-        if len(self.activity_log) < 5:
-            return {
-                "burnoutRisk": 0,
-                "stressLevel": 5,
-                "activityPattern": {
-                    "lateNightSessions": 0,
-                    "consecutiveDays": 0,
-                    "averageSessionLength": 0,
-                    "peakProductivityTime": "unknown",
-                },
-            }
+        if len(self.activity_log) < MIN_ACTIVITIES:
+            return insufficient_data_result()
         
         late_night_count = self._count_late_night_sessions()
         consecutive_days = self._count_consecutive_days()
         avg_session_length = self._calculate_avg_session_length()
         peak_time = self._find_peak_productivity_time()
         
-        # Calculate burnout risk (0-100)
-        burnout_risk = 0
-        
-        # Late night sessions increase risk
-        if late_night_count > 5:
-            burnout_risk += 30
-        elif late_night_count > 3:
-            burnout_risk += 20
-        elif late_night_count > 1:
-            burnout_risk += 10
-        
-        # Consecutive days without break
-        if consecutive_days > 10:
-            burnout_risk += 40
-        elif consecutive_days > 7:
-            burnout_risk += 25
-        elif consecutive_days > 5:
-            burnout_risk += 15
-        
-        # Long session lengths
-        if avg_session_length > 6:
-            burnout_risk += 20
-        elif avg_session_length > 4:
-            burnout_risk += 10
-        
-        # Cap at 100
-        burnout_risk = min(100, burnout_risk)
-        
-        # Stress level (1-10) correlates with burnout risk
-        stress_level = min(10, max(1, int(burnout_risk / 10)))
-        
-        return {
-            "burnoutRisk": burnout_risk,
-            "stressLevel": stress_level,
-            "activityPattern": {
-                "lateNightSessions": late_night_count,
-                "consecutiveDays": consecutive_days,
-                "averageSessionLength": round(avg_session_length, 2),
-                "peakProductivityTime": peak_time,
-            },
-        }
+        return score_burnout(late_night_count, consecutive_days, avg_session_length, peak_time)
     
     def _count_late_night_sessions(self):
         """Count sessions after 11 PM"""
@@ -148,3 +189,367 @@ def detect_burnout(activity_log):
     """Main function to detect burnout from activity log"""
     detector = BurnoutDetector(activity_log)
     return detector.analyze()
+
+
+class BurnoutState:
+    """
+    Rolling burnout aggregates for one user, updated one activity at a time.
+
+    Keeps counts, the session-length sum, a time-of-day histogram and the
+    active days as runs of consecutive days: each run's first and last day map
+    to each other, so a new day joins or bridges its neighbouring runs in O(1)
+    even when activities arrive out of order. analyze() gives the same result
+    as BurnoutDetector over every activity added so far.
+    """
+    
+    def __init__(self):
+        self.activities = 0
+        self.late_night = 0
+        self.duration_total = 0
+        self.duration_count = 0
+        self.time_of_day = [0] * len(TIME_OF_DAY)
+        self.days = set()
+        self.run_ends = {}  # first day of a run <-> last day of that run
+        self.last_day = None
+        self.longest_streak = 0
+    
+    def add(self, activity):
+        self.activities += 1
+        time_of_day = activity.get("timeOfDay", "unknown")
+        if time_of_day in TIME_OF_DAY:
+            self.time_of_day[TIME_OF_DAY.index(time_of_day)] += 1
+        if time_of_day == LATE_NIGHT:
+            self.late_night += 1
+        duration = activity.get("duration", 0) or 0  # in minutes
+        if duration > 0:
+            self.duration_total += duration
+            self.duration_count += 1
+        self._add_day(activity_day(activity))
+    
+    def _add_day(self, day):
+        if self.last_day is None or day > self.last_day:
+            self.last_day = day
+        if day in self.days:
+            return
+        self.days.add(day)
+        # A day next to a run is that run's end, since the day itself was not in it
+        first = self.run_ends.pop(day - 1, day) if day - 1 in self.days else day
+        last = self.run_ends.pop(day + 1, day) if day + 1 in self.days else day
+        self.run_ends[first] = last
+        self.run_ends[last] = first
+        self.longest_streak = max(self.longest_streak, last - first + 1)
+    
+    def current_streak(self):
+        """Length of the run of consecutive active days ending on the latest active day"""
+        if self.last_day is None:
+            return 0
+        return self.last_day - self.run_ends[self.last_day] + 1
+    
+    def analyze(self):
+        if self.activities < MIN_ACTIVITIES:
+            return insufficient_data_result()
+        avg_session_length = self.duration_total / self.duration_count / 60 if self.duration_count else 0
+        return score_burnout(self.late_night, self.longest_streak, avg_session_length,
+                             peak_time_of_day(self.time_of_day))
+    
+    def to_dict(self):
+        """JSON-serializable state; days are stored as [first, last] runs"""
+        runs = sorted([first, last] for first, last in self.run_ends.items() if first <= last)
+        return {
+            "activities": self.activities,
+            "lateNight": self.late_night,
+            "durationTotal": self.duration_total,
+            "durationCount": self.duration_count,
+            "timeOfDay": self.time_of_day,
+            "runs": runs,
+            "lastDay": self.last_day,
+            "longestStreak": self.longest_streak,
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        state = cls()
+        state.activities = data["activities"]
+        state.late_night = data["lateNight"]
+        state.duration_total = data["durationTotal"]
+        state.duration_count = data["durationCount"]
+        state.time_of_day = list(data["timeOfDay"])
+        for first, last in data["runs"]:
+            state.days.update(range(first, last + 1))
+            state.run_ends[first] = last
+            state.run_ends[last] = first
+        state.last_day = data["lastDay"]
+        state.longest_streak = data["longestStreak"]
+        return state
+
+
+class BurnoutStateStore:
+    """
+    Per-user BurnoutState kept in memory, with an optional SQLite copy so
+    users' aggregates survive restarts. Clients send only new activities.
+    At most max_users states stay in memory, least recently used first out;
+    without the SQLite copy an evicted user starts over.
+    """
+    
+    def __init__(self, db_path=None, max_users=10000):
+        self.db_path = db_path
+        self.max_users = max_users
+        self._states = OrderedDict()  # user_id -> BurnoutState, least recently used first
+        self._lock = threading.Lock()
+        self._db = None
+        self.stats = {"evictions": 0}
+        
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS burnout_state ("
+                "user_id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._db.commit()
+    
+    def _load(self, user_id):
+        state = self._states.get(user_id)
+        if state is None and self._db is not None:
+            row = self._db.execute("SELECT state FROM burnout_state WHERE user_id = ?", (user_id,)).fetchone()
+            if row is not None:
+                state = BurnoutState.from_dict(json.loads(row[0]))
+        if state is None:
+            state = BurnoutState()
+        return state
+    
+    def _remember(self, user_id, state):
+        self._states[user_id] = state
+        self._states.move_to_end(user_id)
+        while len(self._states) > self.max_users:
+            self._states.popitem(last=False)
+            self.stats["evictions"] += 1
+    
+    def ingest(self, user_id, activities, reset=False):
+        """Add a user's new activities (reset=True starts over) and return their current analysis"""
+        with self._lock:
+            state = BurnoutState() if reset else self._load(user_id)
+            self._remember(user_id, state)
+            for activity in activities:
+                state.add(activity)
+            if self._db is not None and (activities or reset):
+                self._db.execute(
+                    "INSERT OR REPLACE INTO burnout_state (user_id, state, updated_at) VALUES (?, ?, ?)",
+                    (user_id, json.dumps(state.to_dict()), time.time()),
+                )
+                self._db.commit()
+            result = state.analyze()
+            result["currentStreak"] = state.current_streak()
+            result["activitiesSeen"] = state.activities
+            return result
+    
+    def get_stats(self):
+        with self._lock:
+            return {"users": len(self._states), "max_users": self.max_users, "evictions": self.stats["evictions"],
+                    "persistent": self._db is not None}
+
+
+# BURNOUT_STATE_DB enables the SQLite copy that survives restarts
+BURNOUT_STATE_DB = os.getenv("BURNOUT_STATE_DB", "")
+BURNOUT_STATE_MAX_USERS = int(os.getenv("BURNOUT_STATE_MAX_USERS", "10000"))
+burnout_states = BurnoutStateStore(BURNOUT_STATE_DB or None, BURNOUT_STATE_MAX_USERS)
+
+
+def detect_burnout_incremental(user_id, activities, reset=False):
+    """Fold new activities into the user's rolling state and return the updated analysis"""
+    return burnout_states.ingest(user_id, activities, reset)
+
+
+# Time-of-day codes for columnar processing: TIME_OF_DAY indexes, then "unknown"
+UNKNOWN_TIME_CODE = len(TIME_OF_DAY)
+_TIME_CODES = {name: code for code, name in enumerate(TIME_OF_DAY)}
+
+
+def activity_columns(activity_logs):
+    """
+    Flatten several users' activity logs into NumPy columns: user index,
+    calendar day (int64 days since 1970-01-01), duration in minutes and
+    time-of-day code.
+    """
+    lengths = [len(log) for log in activity_logs]
+    activities = [activity for log in activity_logs for activity in log]
+    users = np.repeat(np.arange(len(activity_logs), dtype=np.int64), lengths)
+    durations = np.array([activity.get("duration", 0) or 0 for activity in activities], dtype=np.float64)
+    time_codes = np.array([_TIME_CODES.get(activity.get("timeOfDay"), UNKNOWN_TIME_CODE) for activity in activities],
+                          dtype=np.int64)
+    
+    # An ISO timestamp's calendar day (in its own offset, as datetime.date() gives) is its date prefix
+    today = datetime.now().date().isoformat()
+    try:
+        dates = [
+            timestamp[:10] if isinstance(timestamp, str) else timestamp.date().isoformat() if timestamp else today
+            for timestamp in [activity.get("timestamp") for activity in activities]
+        ]
+        days = np.array(dates, dtype="datetime64[D]").astype(np.int64)
+    except (ValueError, AttributeError):
+        epoch = datetime(1970, 1, 1).toordinal()
+        days = np.array([activity_day(activity) - epoch for activity in activities], dtype=np.int64)
+    return users, days, durations, time_codes
+
+
+def _score_arrays(late_night, consecutive_days, avg_session_length):
+    """score_burnout()'s thresholds applied to arrays of users"""
+    burnout_risk = (
+        np.select([late_night > 5, late_night > 3, late_night > 1], [30, 20, 10], 0)
+        + np.select([consecutive_days > 10, consecutive_days > 7, consecutive_days > 5], [40, 25, 15], 0)
+        + np.select([avg_session_length > 6, avg_session_length > 4], [20, 10], 0)
+    )
+    burnout_risk = np.minimum(100, burnout_risk)
+    stress_level = np.clip(burnout_risk // 10, 1, 10)
+    return burnout_risk, stress_level
+
+
+def detect_burnout_batch(activity_logs):
+    """
+    Burnout analysis for many users at once; returns one result per log, in
+    order, identical to detect_burnout() on each log.
+
+    All activities are flattened into columns and every metric is a group-by
+    over the user index: bincount for counts, sums and the time-of-day
+    histogram, and a lexsort by (user, day) for streaks, where a run of
+    consecutive days starts wherever the user changes or the day jumps by
+    more than one.
+    """
+    num_users = len(activity_logs)
+    if num_users == 0:
+        return []
+    users, days, durations, time_codes = activity_columns(activity_logs)
+    
+    activity_counts = np.bincount(users, minlength=num_users)
+    histogram = np.bincount(users * (UNKNOWN_TIME_CODE + 1) + time_codes,
+                            minlength=num_users * (UNKNOWN_TIME_CODE + 1)).reshape(num_users, -1)[:, :UNKNOWN_TIME_CODE]
+    late_night = histogram[:, _TIME_CODES[LATE_NIGHT]]
+    
+    positive = durations > 0
+    duration_totals = np.bincount(users[positive], weights=durations[positive], minlength=num_users)
+    duration_counts = np.bincount(users[positive], minlength=num_users)
+    avg_session_length = np.divide(duration_totals, duration_counts, out=np.zeros(num_users),
+                                   where=duration_counts > 0) / 60
+    
+    # Longest run of consecutive active days per user
+    longest_streak = np.zeros(num_users, dtype=np.int64)
+    if len(users):
+        order = np.lexsort((days, users))
+        sorted_users, sorted_days = users[order], days[order]
+        distinct = np.ones(len(order), dtype=bool)
+        distinct[1:] = (sorted_users[1:] != sorted_users[:-1]) | (sorted_days[1:] != sorted_days[:-1])
+        sorted_users, sorted_days = sorted_users[distinct], sorted_days[distinct]
+        run_starts = np.ones(len(sorted_days), dtype=bool)
+        run_starts[1:] = (sorted_users[1:] != sorted_users[:-1]) | (sorted_days[1:] - sorted_days[:-1] != 1)
+        run_ids = np.cumsum(run_starts) - 1
+        run_lengths = np.bincount(run_ids)
+        np.maximum.at(longest_streak, sorted_users[run_starts], run_lengths)
+    
+    burnout_risk, stress_level = _score_arrays(late_night, longest_streak, avg_session_length)
+    peaks = histogram.argmax(axis=1)
+    has_time_of_day = histogram.sum(axis=1) > 0
+    
+    results = []
+    for user in range(num_users):
+        if activity_counts[user] < MIN_ACTIVITIES:
+            results.append(insufficient_data_result())
+            continue
+        results.append({
+            "burnoutRisk": int(burnout_risk[user]),
+            "stressLevel": int(stress_level[user]),
+            "activityPattern": {
+                "lateNightSessions": int(late_night[user]),
+                "consecutiveDays": int(longest_streak[user]),
+                "averageSessionLength": round(float(avg_session_length[user]), 2),
+                "peakProductivityTime": TIME_OF_DAY[peaks[user]] if has_time_of_day[user] else "unknown",
+            },
+        })
+    return results
+
+
+TREND_WINDOWS = (7, 14, 30)
+MAX_TREND_WINDOW = 365
+
+
+def _window_sums(prefix, window):
+    """Sums over the `window` days ending at each day, from a prefix sum with a leading 0 (clipped at day 0)"""
+    ends = np.arange(1, prefix.shape[-1])
+    return prefix[..., ends] - prefix[..., np.maximum(ends - window, 0)]
+
+
+def burnout_trend(activity_log, windows=TREND_WINDOWS, step=1):
+    """
+    Burnout risk over rolling windows, as a compact time series.
+
+    For every `step`-th day from the first to the last active day and every
+    window length, the point equals detect_burnout() over the activities of
+    the window ending that day (windows are clipped at the first active day).
+    Activity is bucketed by day once; counts, session sums and time-of-day
+    histograms for all windows come from prefix sums over those buckets, and
+    streaks from the run of active days ending at each day.
+    """
+    windows = sorted({min(max(int(window), 1), MAX_TREND_WINDOW) for window in windows})
+    if not activity_log:
+        return {"dates": [], "windows": {str(window): {} for window in windows}}
+    
+    _, days, durations, time_codes = activity_columns([activity_log])
+    first_day = days.min()
+    offsets = days - first_day
+    span = int(offsets.max()) + 1
+    
+    # Per-day buckets, each with a leading 0 so window sums are prefix differences
+    def prefix(weights=None, mask=None):
+        selected = offsets if mask is None else offsets[mask]
+        counts = np.bincount(selected, weights=None if weights is None else weights[mask], minlength=span)
+        return np.concatenate(([0], np.cumsum(counts)))
+    
+    positive = durations > 0
+    activity_prefix = prefix()
+    duration_total_prefix = prefix(durations, positive)
+    duration_count_prefix = prefix(mask=positive)
+    time_of_day_prefix = np.stack([prefix(mask=time_codes == code) for code in range(UNKNOWN_TIME_CODE)])
+    
+    # Run of consecutive active days ending at each day (0 on inactive days)
+    active = np.bincount(offsets, minlength=span) > 0
+    index = np.arange(span)
+    runs = index - np.maximum.accumulate(np.where(active, -1, index))
+    
+    points = index[::max(int(step), 1)]
+    if points[-1] != span - 1:
+        points = np.append(points, span - 1)
+    
+    series = {}
+    for window in windows:
+        activity_counts = _window_sums(activity_prefix, window)[points]
+        histogram = _window_sums(time_of_day_prefix, window)[:, points]
+        late_night = histogram[_TIME_CODES[LATE_NIGHT]]
+        duration_counts = _window_sums(duration_count_prefix, window)[points]
+        avg_session_length = np.divide(_window_sums(duration_total_prefix, window)[points], duration_counts,
+                                       out=np.zeros(len(points)), where=duration_counts > 0) / 60
+        
+        # Longest streak inside the window ending at day t: runs ending at days in the
+        # window, each clipped to the part that lies inside it
+        padded = np.concatenate((np.zeros(window - 1, dtype=runs.dtype), runs))
+        in_window = np.lib.stride_tricks.sliding_window_view(padded, window)[points]
+        streaks = np.minimum(in_window, np.arange(1, window + 1)).max(axis=1)
+        
+        burnout_risk, stress_level = _score_arrays(late_night, streaks, avg_session_length)
+        enough = activity_counts >= MIN_ACTIVITIES
+        peaks = histogram.argmax(axis=0)
+        has_time_of_day = histogram.sum(axis=0) > 0
+        series[str(window)] = {
+            "burnoutRisk": np.where(enough, burnout_risk, 0).tolist(),
+            "stressLevel": np.where(enough, stress_level, 5).tolist(),
+            "lateNightSessions": np.where(enough, late_night, 0).astype(int).tolist(),
+            "consecutiveDays": np.where(enough, streaks, 0).tolist(),
+            "averageSessionLength": [round(length, 2) if ok else 0
+                                     for length, ok in zip(avg_session_length.tolist(), enough.tolist())],
+            "peakProductivityTime": [
+                TIME_OF_DAY[peak] if ok and has else "unknown"
+                for peak, ok, has in zip(peaks.tolist(), enough.tolist(), has_time_of_day.tolist())
+            ],
+            "activities": activity_counts.astype(int).tolist(),
+        }
+    
+    dates = (first_day + points).astype("datetime64[D]").astype(str).tolist()
+    return {"dates": dates, "windows": series}
@@ -1,124 +1,342 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
 import numpy as np
 from scipy import stats
 import random
 
+from llm_cache import LLMResponseCache
+
+# Paths per request; the whole (simulations x years) sample is drawn in one call,
+# so 100k paths cost a few MB and a few milliseconds
+CAREER_SIMULATIONS = int(os.getenv("CAREER_SIMULATIONS", "10000"))
+PROJECTION_YEARS = 5
+MAX_PROJECTION_YEARS = 30
+
+# "independent": each year is a draw around base_salary * (1 + growth)^year.
+# "path": salaries compound along each path (geometric Brownian motion) with
+# job-loss and promotion jumps.
+MODEL_INDEPENDENT = "independent"
+MODEL_PATH = "path"
+CAREER_MODEL = os.getenv("CAREER_MODEL", MODEL_INDEPENDENT)
+
+# Jump events in the path model. Yearly job-loss probability is the share of
+# instability (100 - job_stability) scaled by JOB_LOSS_RATE; the salary cut on a
+# loss shrinks as market_demand rises. Yearly promotion probability scales with
+# market_demand.
+JOB_LOSS_RATE = 0.5
+JOB_LOSS_SEVERITY = 0.3
+PROMOTION_RATE = 0.15
+PROMOTION_RAISE = 0.12
+
+# User profile modifiers: starting salary by education and years of experience;
+# experience also makes job loss less likely
+EDUCATION_PREMIUM = {
+    "high school": 0.85,
+    "diploma": 0.9,
+    "associate": 0.92,
+    "bachelor": 1.0,
+    "master": 1.08,
+    "phd": 1.15,
+}
+EXPERIENCE_PREMIUM = 0.03
+EXPERIENCE_JOB_LOSS_REDUCTION = 0.05
+MAX_EXPERIENCE_YEARS = 10
+
+# Scenario sweeps: growth and volatility shift every career's rates, inflation
+# deflates salaries to today's money. Cells (career path x scenario) are simulated
+# together in chunks of at most SWEEP_CHUNK_VALUES salaries, on SWEEP_WORKERS
+# processes when set (0 runs them inline).
+DEFAULT_INFLATION = 0.03
+DEFAULT_SCENARIOS = [
+    {"name": "Baseline", "growth": 0.0, "volatility": 0.0, "inflation": DEFAULT_INFLATION},
+    {"name": "Recession", "growth": -0.03, "volatility": 0.05, "inflation": 0.02},
+    {"name": "Boom", "growth": 0.02, "volatility": 0.0, "inflation": 0.04},
+    {"name": "High inflation", "growth": 0.0, "volatility": 0.03, "inflation": 0.07},
+]
+SWEEP_WORKERS = int(os.getenv("SWEEP_WORKERS", "0"))
+SWEEP_CHUNK_VALUES = int(os.getenv("SWEEP_CHUNK_VALUES", str(4_000_000)))
+MIN_VOLATILITY = 0.01
+MIN_GROWTH = -0.5
+
+# Bump whenever a change to the engine or its constants changes results, so cached
+# results from the previous model are not served
+SIMULATION_MODEL_VERSION = "3"
+# Without an explicit seed, requests are seeded from a hash of their inputs so the
+# same request always gives the same numbers (CAREER_DETERMINISTIC=0 draws fresh ones)
+CAREER_DETERMINISTIC = os.getenv("CAREER_DETERMINISTIC", "1") != "0"
+# Result cache for deterministic requests. SIMULATION_CACHE_DB enables the SQLite tier
+# that survives restarts; SIMULATION_CACHE_SIZE=0 disables caching.
+SIMULATION_CACHE_SIZE = int(os.getenv("SIMULATION_CACHE_SIZE", "512"))
+SIMULATION_CACHE_TTL = float(os.getenv("SIMULATION_CACHE_TTL", str(7 * 24 * 3600)))
+SIMULATION_CACHE_DB = os.getenv("SIMULATION_CACHE_DB", "")
+
+simulation_cache = LLMResponseCache(SIMULATION_CACHE_SIZE, SIMULATION_CACHE_TTL, SIMULATION_CACHE_DB or None,
+                                    table="simulation_cache") if SIMULATION_CACHE_SIZE > 0 else None
+
+_pool = None
+# Sweeps run on several analysis threads; only one of them may create the pool
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            return _pool
+        # Created lazily on an analysis thread, where a plain fork could inherit locks held
+        # by other threads; forkserver (spawn on Windows) starts workers from a clean process
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _pool = ProcessPoolExecutor(max_workers=SWEEP_WORKERS, mp_context=multiprocessing.get_context(method))
+        return _pool
+
+
+def _discard_pool(pool):
+    """Shut down a broken pool; the next _get_pool() starts a fresh one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+# Career data (in production, fetch from external APIs or database)
+CAREER_DATA = {
+    "Data Science": {
+        "base_salary": 95000,
+        "salary_growth_rate": 0.08,
+        "volatility": 0.15,
+        "job_stability": 85,
+        "market_demand": 90,
+    },
+    "Cybersecurity": {
+        "base_salary": 98000,
+        "salary_growth_rate": 0.10,
+        "volatility": 0.12,
+        "job_stability": 88,
+        "market_demand": 92,
+    },
+    "Software Engineering": {
+        "base_salary": 105000,
+        "salary_growth_rate": 0.07,
+        "volatility": 0.18,
+        "job_stability": 80,
+        "market_demand": 88,
+    },
+    "Product Management": {
+        "base_salary": 115000,
+        "salary_growth_rate": 0.09,
+        "volatility": 0.20,
+        "job_stability": 75,
+        "market_demand": 85,
+    },
+}
+
+
+def resolve_years(years):
+    """Projection horizon with the default applied, clamped to 1..MAX_PROJECTION_YEARS"""
+    return min(max(int(years or PROJECTION_YEARS), 1), MAX_PROJECTION_YEARS)
+
+
+def resolve_model(model):
+    """Simulation model with the default applied; raises ValueError for unknown models"""
+    model = model or CAREER_MODEL
+    if model not in (MODEL_INDEPENDENT, MODEL_PATH):
+        raise ValueError(f"Unknown simulation model: {model}")
+    return model
+
+
+def career_info_for(career_path):
+    """Career data for a path, falling back to Software Engineering for unknown paths"""
+    return CAREER_DATA.get(career_path, CAREER_DATA["Software Engineering"])
+
+
+def profile_modifiers(user_profile):
+    """(starting salary multiplier, job-loss probability multiplier) from a user profile"""
+    user_profile = user_profile or {}
+    education = str(user_profile.get("education") or "bachelor").lower()
+    salary_multiplier = next(
+        (premium for level, premium in EDUCATION_PREMIUM.items() if level in education), 1.0)
+    try:
+        experience = min(max(float(user_profile.get("experience") or 0), 0), MAX_EXPERIENCE_YEARS)
+    except (TypeError, ValueError):
+        experience = 0
+    salary_multiplier *= 1 + EXPERIENCE_PREMIUM * experience
+    return salary_multiplier, 1 - EXPERIENCE_JOB_LOSS_REDUCTION * experience
+
+
+def simulate_batch(rng, params, years, num_simulations, model):
+    """
+    Salaries for K parameter sets at once, as a (years x K x num_simulations)
+    array. params maps base_salary, salary_growth_rate, volatility,
+    job_stability, market_demand, salary_multiplier and job_loss_multiplier to
+    length-K arrays.
+    """
+    column = {name: np.asarray(values, dtype=float)[:, np.newaxis] for name, values in params.items()}
+    shape = (years, len(column["base_salary"]), num_simulations)
+    growth = column["salary_growth_rate"]
+    volatility = column["volatility"]
+    
+    if model == MODEL_INDEPENDENT:
+        # Each year is an independent draw around base_salary * (1 + growth)^year
+        trend = column["base_salary"] * (1 + growth) ** np.arange(1, years + 1)[:, np.newaxis, np.newaxis]
+        salaries = rng.standard_normal(shape)
+        salaries *= volatility
+        salaries += 1.0
+        salaries *= trend
+        return salaries
+    
+    # Path model: each year's log-return (drift set so the mean grows at
+    # salary_growth_rate, plus volatility noise and any job-loss or promotion
+    # jump) is accumulated along the path, so shocks persist
+    demand = column["market_demand"] / 100
+    job_loss_probability = (100 - column["job_stability"]) / 100 * JOB_LOSS_RATE * column["job_loss_multiplier"]
+    promotion_probability = PROMOTION_RATE * demand
+    job_loss_cut = JOB_LOSS_SEVERITY * (1.5 - demand)
+    
+    log_returns = rng.standard_normal(shape)
+    log_returns *= volatility
+    log_returns += np.log1p(growth) - 0.5 * volatility ** 2
+    
+    # One uniform per path and year decides the jump: a loss in the lowest
+    # band, a promotion in the highest, never both in the same year
+    events = rng.random(shape)
+    np.add(log_returns, np.broadcast_to(np.log1p(-job_loss_cut), shape), out=log_returns,
+           where=events < job_loss_probability)
+    np.add(log_returns, np.log1p(PROMOTION_RAISE), out=log_returns, where=events >= 1 - promotion_probability)
+    
+    np.cumsum(log_returns, axis=0, out=log_returns)
+    np.exp(log_returns, out=log_returns)
+    log_returns *= column["base_salary"] * column["salary_multiplier"]
+    return log_returns
+
+
+def projection_stats(salaries):
+    """
+    Per-year statistics of a (years x ... x simulations) salary array:
+    10th/50th/90th percentiles, means, success rate (share ending at or above
+    the final-year median) and downside rate (share ending below the first
+    year's median). The percentile call partitions each row in place; the mean
+    and counts do not depend on order.
+    """
+    p10, p50, p90 = np.percentile(salaries, [10, 50, 90], axis=-1, overwrite_input=True)
+    averages = salaries.mean(axis=-1)
+    num_simulations = salaries.shape[-1]
+    success_rate = np.count_nonzero(salaries[-1] >= p50[-1][..., np.newaxis], axis=-1) / num_simulations * 100
+    downside_rate = np.count_nonzero(salaries[-1] < p50[0][..., np.newaxis], axis=-1) / num_simulations * 100
+    return {"p10": p10, "p50": p50, "p90": p90, "average": averages,
+            "successRate": success_rate, "downsideRate": downside_rate}
+
+
+def risk_analysis(career_path, career_info):
+    """Risk vs. reward scores and a recommendation from a career's parameters"""
+    # Risk score based on volatility and job stability
+    risk_score = (career_info["volatility"] * 100) + (100 - career_info["job_stability"])
+    risk_score = min(100, max(0, risk_score))
+    
+    # Reward score based on salary growth and market demand
+    reward_score = (career_info["salary_growth_rate"] * 500) + (career_info["market_demand"] * 0.5)
+    reward_score = min(100, max(0, reward_score))
+    
+    # Generate recommendation
+    if reward_score > risk_score + 20:
+        recommendation = f"{career_path} offers excellent growth potential with manageable risk"
+    elif risk_score > reward_score + 20:
+        recommendation = f"{career_path} has high volatility; consider risk mitigation strategies"
+    else:
+        recommendation = f"{career_path} presents a balanced risk-reward profile"
+    
+    return {
+        "riskScore": round(risk_score, 2),
+        "rewardScore": round(reward_score, 2),
+        "volatility": career_info["volatility"],
+        "recommendation": recommendation,
+    }
+
+
 class CareerSimulator:
     """Monte Carlo simulation for career path analysis"""
     
-    def __init__(self, career_path, user_profile, num_simulations=1000):
+    def __init__(self, career_path, user_profile, num_simulations=CAREER_SIMULATIONS, years=PROJECTION_YEARS,
+                 seed=None, model=None):
         self.career_path = career_path
-        self.user_profile = user_profile
+        self.user_profile = user_profile or {}
         self.num_simulations = num_simulations
-        
-        # Career data (in production, fetch from external APIs or database)
-        self.career_data = {
-            "Data Science": {
-                "base_salary": 95000,
-                "salary_growth_rate": 0.08,
-                "volatility": 0.15,
-                "job_stability": 85,
-                "market_demand": 90,
-            },
-            "Cybersecurity": {
-                "base_salary": 98000,
-                "salary_growth_rate": 0.10,
-                "volatility": 0.12,
-                "job_stability": 88,
-                "market_demand": 92,
-            },
-            "Software Engineering": {
-                "base_salary": 105000,
-                "salary_growth_rate": 0.07,
-                "volatility": 0.18,
-                "job_stability": 80,
-                "market_demand": 88,
-            },
-            "Product Management": {
-                "base_salary": 115000,
-                "salary_growth_rate": 0.09,
-                "volatility": 0.20,
-                "job_stability": 75,
-                "market_demand": 85,
-            },
-        }
+        self.years = resolve_years(years)
+        self.model = resolve_model(model)
+        self.rng = np.random.default_rng(seed)
+        self.career_data = CAREER_DATA
+    
+    def profile_modifiers(self):
+        """(starting salary multiplier, job-loss probability multiplier) from the user profile"""
+        return profile_modifiers(self.user_profile)
+    
+    def simulation_params(self, career_info):
+        """simulate_batch() parameters for this career path and user profile"""
+        salary_multiplier, job_loss_multiplier = self.profile_modifiers()
+        if self.model == MODEL_INDEPENDENT:
+            # The independent model projects the career's market salary as-is
+            salary_multiplier, job_loss_multiplier = 1.0, 1.0
+        params = {name: [career_info[name]] for name in
+                  ("base_salary", "salary_growth_rate", "volatility", "job_stability", "market_demand")}
+        params["salary_multiplier"] = [salary_multiplier]
+        params["job_loss_multiplier"] = [job_loss_multiplier]
+        return params
+    
+    def simulate_salaries(self, career_info):
+        """
+        (num_simulations x years) matrix of projected salaries, year 1 in column 0.
+        It is a transposed view of a year-major array, so .T gives each year's
+        salaries contiguously.
+        """
+        salaries = simulate_batch(self.rng, self.simulation_params(career_info), self.years,
+                                  self.num_simulations, self.model)
+        return salaries[:, 0, :].T
     
     def run_simulation(self):
-        """Run Monte Carlo simulation for 5-year career projection"""
+        """Run Monte Carlo simulation for a multi-year (5 by default) career projection"""
         career_info = self.career_data.get(self.career_path, self.career_data["Software Engineering"])
+        # Statistics for every year at once
+        stats = projection_stats(self.simulate_salaries(career_info).T)
         
-        base_salary = career_info["base_salary"]
-        growth_rate = career_info["salary_growth_rate"]
-        volatility = career_info["volatility"]
-        
-        yearly_projections = []
-        
-        for year in range(1, 6):  # 5-year projection
-            year_salaries = []
-            
-            for _ in range(self.num_simulations):
-                # Apply random variation based on volatility
-                random_factor = np.random.normal(1.0, volatility)
-                projected_salary = base_salary * ((1 + growth_rate) ** year) * random_factor
-                year_salaries.append(projected_salary)
-            
-            # Calculate statistics
-            salaries_array = np.array(year_salaries)
-            
-            yearly_projections.append({
-                "year": year,
-                "salaryMin": int(np.percentile(salaries_array, 10)),
-                "salaryMax": int(np.percentile(salaries_array, 90)),
-                "salaryAvg": int(np.mean(salaries_array)),
+        yearly_projections = [
+            {
+                "year": year + 1,
+                "salaryMin": int(stats["p10"][year]),
+                "salaryMax": int(stats["p90"][year]),
+                "salaryAvg": int(stats["average"][year]),
                 "jobStability": career_info["job_stability"],
                 "marketDemand": career_info["market_demand"],
-            })
-        
-        # Calculate success rate (percentage of simulations above median)
-        final_year_salaries = [base_salary * ((1 + growth_rate) ** 5) * np.random.normal(1.0, volatility) 
-                                for _ in range(self.num_simulations)]
-        median_salary = np.median(final_year_salaries)
-        success_rate = sum(1 for s in final_year_salaries if s >= median_salary) / self.num_simulations * 100
+            }
+            for year in range(self.years)
+        ]
         
         return {
             "yearlyProjections": yearly_projections,
             "totalSimulations": self.num_simulations,
-            "successRate": round(success_rate, 2),
+            "successRate": round(float(stats["successRate"]), 2),
+            "downsideRate": round(float(stats["downsideRate"]), 2),
+            "model": self.model,
         }
     
     def calculate_risk_analysis(self, simulation_results):
         """Calculate risk vs. reward scores"""
         career_info = self.career_data.get(self.career_path, self.career_data["Software Engineering"])
-        
-        # Risk score based on volatility and job stability
-        risk_score = (career_info["volatility"] * 100) + (100 - career_info["job_stability"])
-        risk_score = min(100, max(0, risk_score))
-        
-        # Reward score based on salary growth and market demand
-        avg_salary_5yr = simulation_results["yearlyProjections"][-1]["salaryAvg"]
-        reward_score = (career_info["salary_growth_rate"] * 500) + (career_info["market_demand"] * 0.5)
-        reward_score = min(100, max(0, reward_score))
-        
-        # Generate recommendation
-        if reward_score > risk_score + 20:
-            recommendation = f"{self.career_path} offers excellent growth potential with manageable risk"
-        elif risk_score > reward_score + 20:
-            recommendation = f"{self.career_path} has high volatility; consider risk mitigation strategies"
-        else:
-            recommendation = f"{self.career_path} presents a balanced risk-reward profile"
-        
-        return {
-            "riskScore": round(risk_score, 2),
-            "rewardScore": round(reward_score, 2),
-            "volatility": career_info["volatility"],
-            "recommendation": recommendation,
-        }
+        return risk_analysis(self.career_path, career_info)
 
-
-def simulate_career_path(career_path, comparison_path=None, user_profile=None):
+def simulate_career_path(career_path, comparison_path=None, user_profile=None, years=None, model=None, seed=None,
+                         num_simulations=CAREER_SIMULATIONS):
     """Main function to run career simulation"""
+    years = years or PROJECTION_YEARS
+    primary_seed, comparison_seed = np.random.SeedSequence(seed).spawn(2)
     
     # Simulate primary career path
-    simulator = CareerSimulator(career_path, user_profile)
+    simulator = CareerSimulator(career_path, user_profile, num_simulations, years=years, model=model,
+                                seed=primary_seed)
     results = simulator.run_simulation()
     risk_analysis = simulator.calculate_risk_analysis(results)
     
@@ -137,7 +355,8 @@ def simulate_career_path(career_path, comparison_path=None, user_profile=None):
     
     # If comparison path provided, simulate it too
     if comparison_path:
-        comp_simulator = CareerSimulator(comparison_path, user_profile)
+        comp_simulator = CareerSimulator(comparison_path, user_profile, num_simulations, years=years, model=model,
+                                         seed=comparison_seed)
         comp_results = comp_simulator.run_simulation()
         comp_risk_analysis = comp_simulator.calculate_risk_analysis(comp_results)
         
@@ -147,3 +366,167 @@ def simulate_career_path(career_path, comparison_path=None, user_profile=None):
         }
     
     return response
+
+
+def _normalize_scenario(index, scenario):
+    scenario = scenario or {}
+    return {
+        "name": str(scenario.get("name") or f"Scenario {index + 1}"),
+        "growth": float(scenario.get("growth") or 0.0),
+        "volatility": float(scenario.get("volatility") or 0.0),
+        "inflation": float(scenario.get("inflation", DEFAULT_INFLATION) or 0.0),
+    }
+
+
+def _sweep_chunk(params, years, num_simulations, model, seed_sequence):
+    """Simulate one chunk of sweep cells and reduce it to statistics (runs in a worker process)"""
+    rng = np.random.default_rng(seed_sequence)
+    return projection_stats(simulate_batch(rng, params, years, num_simulations, model))
+
+
+def simulate_scenarios(career_paths, scenarios=None, user_profile=None, years=None, model=None,
+                       num_simulations=CAREER_SIMULATIONS, seed=None):
+    """
+    Simulate every career path under every scenario and return a comparison
+    matrix (rows are career paths, columns are scenarios).
+
+    All cells share one batched computation: their parameters are stacked
+    into arrays and simulated together, in chunks of at most
+    SWEEP_CHUNK_VALUES salaries. Chunks run on a process pool when
+    SWEEP_WORKERS > 1. Each chunk has its own child of the seed, so a seeded
+    sweep gives the same numbers whether it runs inline or on the pool.
+    """
+    years = resolve_years(years)
+    model = resolve_model(model)
+    scenarios = [_normalize_scenario(i, scenario) for i, scenario in enumerate(scenarios or DEFAULT_SCENARIOS)]
+    # Rankings are keyed by scenario name
+    scenario_names = [scenario["name"] for scenario in scenarios]
+    duplicates = sorted({name for name in scenario_names if scenario_names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Scenario names must be unique: {', '.join(duplicates)}")
+    
+    salary_multiplier, job_loss_multiplier = profile_modifiers(user_profile)
+    if model == MODEL_INDEPENDENT:
+        salary_multiplier, job_loss_multiplier = 1.0, 1.0
+    
+    # One row of parameters per (career path, scenario) cell, career-major
+    cells = []
+    for career_path in career_paths:
+        career_info = career_info_for(career_path)
+        for scenario in scenarios:
+            cells.append(dict(
+                career_info,
+                salary_growth_rate=round(max(career_info["salary_growth_rate"] + scenario["growth"], MIN_GROWTH), 4),
+                volatility=round(max(career_info["volatility"] + scenario["volatility"], MIN_VOLATILITY), 4),
+            ))
+    names = ("base_salary", "salary_growth_rate", "volatility", "job_stability", "market_demand")
+    params = {name: np.array([cell[name] for cell in cells], dtype=float) for name in names}
+    params["salary_multiplier"] = np.full(len(cells), salary_multiplier)
+    params["job_loss_multiplier"] = np.full(len(cells), job_loss_multiplier)
+    
+    per_chunk = max(1, SWEEP_CHUNK_VALUES // (years * num_simulations))
+    bounds = [(start, min(start + per_chunk, len(cells))) for start in range(0, len(cells), per_chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(bounds))
+    jobs = [({name: values[start:end] for name, values in params.items()}, years, num_simulations, model, child)
+            for (start, end), child in zip(bounds, seeds)]
+    
+    chunk_stats = None
+    if SWEEP_WORKERS > 1 and len(jobs) > 1:
+        pool = _get_pool()
+        try:
+            chunk_stats = [future.result() for future in [pool.submit(_sweep_chunk, *job) for job in jobs]]
+        except BrokenProcessPool as e:
+            print(f"Warning: simulation worker pool failed ({e}); simulating inline")
+            _discard_pool(pool)
+    if chunk_stats is None:
+        chunk_stats = [_sweep_chunk(*job) for job in jobs]
+    # Chunks split the cell axis: (years x cells) for per-year stats, (cells,) for rates
+    stats = {key: np.concatenate([chunk[key] for chunk in chunk_stats], axis=-1) for key in chunk_stats[0]}
+    
+    year_numbers = np.arange(1, years + 1)
+    matrix = []
+    for row, career_path in enumerate(career_paths):
+        row_cells = []
+        for column, scenario in enumerate(scenarios):
+            cell = row * len(scenarios) + column
+            deflator = (1 + scenario["inflation"]) ** year_numbers
+            real_average = stats["average"][:, cell] / deflator
+            row_cells.append({
+                "careerPath": career_path,
+                "scenario": scenario["name"],
+                "yearlyProjections": [
+                    {
+                        "year": int(year),
+                        "salaryMin": int(stats["p10"][year - 1, cell]),
+                        "salaryMax": int(stats["p90"][year - 1, cell]),
+                        "salaryAvg": int(stats["average"][year - 1, cell]),
+                        "realSalaryAvg": int(real_average[year - 1]),
+                    }
+                    for year in year_numbers
+                ],
+                "finalSalaryAvg": int(stats["average"][-1, cell]),
+                "realFinalSalaryAvg": int(real_average[-1]),
+                "successRate": round(float(stats["successRate"][cell]), 2),
+                "downsideRate": round(float(stats["downsideRate"][cell]), 2),
+                "riskAnalysis": risk_analysis(career_path, cells[cell]),
+            })
+        matrix.append(row_cells)
+    
+    # Best career path per scenario by inflation-adjusted final salary
+    rankings = {
+        scenario["name"]: [
+            matrix[row][column]["careerPath"]
+            for row in sorted(range(len(career_paths)), key=lambda r: -matrix[r][column]["realFinalSalaryAvg"])
+        ]
+        for column, scenario in enumerate(scenarios)
+    }
+    
+    return {
+        "careerPaths": list(career_paths),
+        "scenarios": scenarios,
+        "matrix": matrix,
+        "rankings": rankings,
+        "totalSimulations": num_simulations,
+        "years": years,
+        "model": model,
+    }
+
+
+def simulation_key(kind, inputs):
+    """Stable key for a simulation request: same kind, inputs and model version -> same key"""
+    raw = json.dumps({"kind": kind, "version": SIMULATION_MODEL_VERSION, "inputs": inputs},
+                     sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def cached_simulation(kind, simulate, **inputs):
+    """
+    Run simulate(**inputs, seed=...) deterministically and cache the result.
+
+    inputs should have defaults already resolved (years, model, simulation
+    count) so equivalent requests share a key. An explicit seed in inputs is
+    part of the key; otherwise the seed is derived from the key itself. With
+    CAREER_DETERMINISTIC off and no seed, results are drawn fresh and not cached.
+    """
+    seed = inputs.pop("seed", None)
+    if seed is None and not CAREER_DETERMINISTIC:
+        return simulate(**inputs)
+    
+    key = simulation_key(kind, dict(inputs, seed=seed))
+    if simulation_cache is not None:
+        cached = simulation_cache.get(key)
+        if cached is not None:
+            return json.loads(cached)
+    
+    result = simulate(**inputs, seed=seed if seed is not None else int(key[:16], 16))
+    if simulation_cache is not None:
+        simulation_cache.set(key, json.dumps(result))
+    return result
+
+
+def get_simulation_stats():
+    return {
+        "cache": simulation_cache.get_stats() if simulation_cache is not None else None,
+        "deterministic": CAREER_DETERMINISTIC,
+        "model_version": SIMULATION_MODEL_VERSION,
+    }
@@ -1,19 +1,29 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import StreamingResponse, JSONResponse
+import asyncio
+import functools
 import json
 import os
-import uuid
-import httpx
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List
 from dotenv import load_dotenv
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from resume_helper import *
 from utils.resume_analyzer import ResumeAnalyzer
 from utils.ai_resume_analyzer import AIResumeAnalyzer
 from utils.resume_builder import ResumeBuilder
-from career_simulator import simulate_career_path
-from burnout_detector import detect_burnout
-from prompt_evaluator import assess_prompt_engineering
+from career_simulator import (simulate_career_path, simulate_scenarios, cached_simulation, get_simulation_stats,
+                              resolve_years, resolve_model, CAREER_SIMULATIONS, DEFAULT_SCENARIOS)
+from burnout_detector import detect_burnout, detect_burnout_incremental, detect_burnout_batch, burnout_trend, TREND_WINDOWS
+from prompt_evaluator import assess_prompt_engineering, assess_prompt_engineering_batch
+from resume_jobs import JobStore, ResumeJobWorkers
+from assessment_outputs import assessment_output, cached_output, get_assessment_output_stats, PendingOutputs
+from ollama_client import query_ollama, stream_ollama, start_client, close_client, ollama_error_message, get_llm_stats, admission
+from admission import OverloadedError, PRIORITY_INTERACTIVE, PRIORITY_STANDARD, PRIORITY_BULK
 import nltk
 import cv2
 import numpy as np
@@ -24,58 +34,49 @@ nltk.download("stopwords")
 # Load environment variables from .env file
 load_dotenv()
 
-# Ollama Configuration - Optimized for RTX 3050 GPU
-OLLAMA_API_URL = os.getenv("OLLAMA_API_URL", "http://localhost:11434/api/generate")
-MODEL_NAME = os.getenv("OLLAMA_MODEL", "llama3.2:3b")  # Faster model for RTX 3050
-
 # GPU Configuration
 os.environ["CUDA_VISIBLE_DEVICES"] = "0"  # Use first GPU
 os.environ["OLLAMA_NUM_GPU"] = "999"      # Offload all layers to GPU
 
-async def query_ollama(prompt: str, stream: bool = False):
-    """
-    Query Ollama with optimized settings for better performance.
-    
-    Args:
-        prompt: The prompt to send to Ollama
-        stream: Whether to stream the response (faster perceived response)
-    
-    Returns:
-        The generated text response
-    """
-    async with httpx.AsyncClient(timeout=120.0) as client:  # Increased timeout to 120s
-        try:
-            response = await client.post(
-                OLLAMA_API_URL,
-                json={
-                    "model": MODEL_NAME,
-                    "prompt": prompt,
-                    "stream": False,  # Set to False for now, can enable streaming later
-                    "options": {
-                        "num_predict": 150,  # Shorter responses for speed and conciseness
-                        "temperature": 0.7,   # Balanced creativity
-                        "top_p": 0.9,
-                        "top_k": 40
-                    }
-                },
-                timeout=120.0  # 2 minutes timeout for complex prompts
-            )
-            response.raise_for_status()
-            result = response.json().get("response", "")
-            print(f"✓ Ollama response generated ({len(result)} chars)")
-            return result
-        except httpx.TimeoutException:
-            print(f"⚠ Ollama Timeout: Request took longer than 120 seconds")
-            return "Response generation timed out. Please try a simpler prompt or check if Ollama is running on GPU."
-        except httpx.ConnectError:
-            print(f"⚠ Ollama Connection Error: Is Ollama running on port 11434?")
-            return "Could not connect to Ollama. Please ensure Ollama is running (ollama serve)."
-        except Exception as e:
-            print(f"❌ Ollama Error: {e}")
-            return f"Error: {str(e)}"
+# PDF/DOCX extraction, OCR and static analysis are blocking; they run here so the
+# event loop keeps serving other requests while a resume is being processed
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "4"))
+analysis_executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="analysis")
+
+# Batch resume scoring limits (per request)
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "500"))
+BATCH_MAX_FILE_BYTES = int(os.getenv("BATCH_MAX_FILE_BYTES", str(10 * 1024 * 1024)))
+DEFAULT_JOB_DESCRIPTION = "python machine learning big data cloud"
+
+# Cohort burnout analysis limit (per request)
+BURNOUT_BATCH_MAX_USERS = int(os.getenv("BURNOUT_BATCH_MAX_USERS", "20000"))
 
+# Prompt assessment batch limit (per request)
+PROMPT_BATCH_MAX_SUBMISSIONS = int(os.getenv("PROMPT_BATCH_MAX_SUBMISSIONS", "5000"))
 
-app = FastAPI()
+# Career scenario sweep limits (per request)
+SWEEP_MAX_CELLS = int(os.getenv("SWEEP_MAX_CELLS", "64"))
+SWEEP_MAX_SIMULATIONS = int(os.getenv("SWEEP_MAX_SIMULATIONS", "100000"))
+
+
+async def run_blocking(fn, *args):
+    """Run a blocking function on the analysis executor"""
+    return await asyncio.get_running_loop().run_in_executor(analysis_executor, fn, *args)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled Ollama client for the lifetime of the app (keep-alive, no per-request handshake)
+    await start_client()
+    job_workers.start()
+    yield
+    await job_workers.stop()
+    await pending_outputs.stop()
+    await close_client()
+    analysis_executor.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Initialize Analyzers
 resume_analyzer = ResumeAnalyzer()
@@ -90,6 +91,16 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+
+@app.exception_handler(OverloadedError)
+async def overloaded_handler(request: Request, exc: OverloadedError):
+    """Fast rejection when the Ollama admission queue is full (429) or the wait timed out (503)"""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"error": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 DATABASE_FILE = "database/embeddings.json"
 
 if not os.path.exists(DATABASE_FILE):
@@ -97,16 +108,63 @@ if not os.path.exists(DATABASE_FILE):
     with open(DATABASE_FILE, 'w') as f:
         json.dump({}, f)
 
+def build_chat_prompt(text: str):
+    return f'''You are a helpful mentor chatbot. Respond to the following in a supportive, educational, and engaging way and give full answer: {text}'''
+
 async def generate_response(text: str):
-    prompt = f'''You are a helpful mentor chatbot. Respond to the following in a supportive, educational, and engaging way and give full answer: {text}'''
-    response_text = await query_ollama(prompt)
+    prompt = build_chat_prompt(text)
+    # Conversations should not be answered from the cache
+    response_text = await query_ollama(prompt, use_cache=False, priority=PRIORITY_INTERACTIVE)
     
     if response_text:
         return response_text
     return "I'm sorry, I couldn't generate a response. Please try again."
 
+async def stream_llm_response(prompt: str, http_request: Request):
+    """
+    Relay Ollama's output to the client as Server-Sent Events.
+
+    Each event is `data: {"token": "..."}`; the stream ends with
+    `data: {"done": true}` or `data: {"error": "..."}`. Generation stops as
+    soon as the client disconnects. The admission slot is taken before the
+    response starts, so an overloaded server answers 429/503 instead of an
+    empty stream.
+    """
+    await admission.acquire(PRIORITY_INTERACTIVE)
+    started = time.monotonic()
+    released = False
+
+    def release():
+        nonlocal released
+        if not released:
+            released = True
+            admission.release(time.monotonic() - started)
+
+    async def events():
+        try:
+            async for chunk in stream_ollama(prompt):
+                if await http_request.is_disconnected():
+                    print("⚠ Client disconnected, stopping Ollama generation")
+                    return
+                yield f"data: {json.dumps({'token': chunk})}\n\n"
+            yield f"data: {json.dumps({'done': True})}\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'error': ollama_error_message(e)})}\n\n"
+        finally:
+            release()
+
+    body = events()
+    # If the client leaves before the stream is ever iterated, free the slot on collection
+    weakref.finalize(body, release)
+    return StreamingResponse(
+        body,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 class ChatRequest(BaseModel):
     text: str
+    stream: bool = False
 
 class SkillRecommendationRequest(BaseModel):
     job_name: str
@@ -114,19 +172,61 @@ class SkillRecommendationRequest(BaseModel):
 class CareerGuidanceRequest(BaseModel):
     skills: list
     interests: list
+    stream: bool = False
 
 class CareerSimulationRequest(BaseModel):
     careerPath: str
     comparisonPath: str = None
     userProfile: dict = None
+    years: int = None  # projection horizon, 5 by default, up to 30
+    model: str = None  # "independent" or "path"; CAREER_MODEL by default
+    seed: int = None  # derived from the request when omitted, so results are repeatable
+
+class SweepScenario(BaseModel):
+    name: str = None  # "Scenario <n>" when omitted
+    growth: float = 0.0  # added to every career's yearly salary growth rate
+    volatility: float = 0.0  # added to every career's volatility
+    inflation: float = Field(None, gt=-1)  # yearly, for real salaries; DEFAULT_INFLATION when omitted
+
+class CareerSweepRequest(BaseModel):
+    careerPaths: List[str]
+    scenarios: List[SweepScenario] = None  # DEFAULT_SCENARIOS when omitted
+    userProfile: dict = None
+    years: int = None
+    model: str = None
+    simulations: int = None
+    seed: int = None
 
 class BurnoutAnalysisRequest(BaseModel):
     activityLog: list
 
+class BurnoutTrendRequest(BaseModel):
+    activityLog: list
+    windows: List[int] = None  # window lengths in days; 7, 14 and 30 by default
+    step: int = 1  # days between points
+
+class BurnoutBatchRequest(BaseModel):
+    users: List[dict]  # [{"userId": ..., "activityLog": [...]}]
+
+class BurnoutEventsRequest(BaseModel):
+    userId: str
+    activities: list = []  # only activities not sent before
+    reset: bool = False  # drop the user's rolling state first
+
 class PromptAssessmentRequest(BaseModel):
     question: str
     userPrompt: str
     assessmentType: str
+    # Score the prompt right away and attach the AI output once it is generated
+    deferOutput: bool = False
+
+class PromptSubmission(BaseModel):
+    question: str
+    userPrompt: str
+    aiOutput: str = ""
+
+class PromptAssessmentBatchRequest(BaseModel):
+    submissions: List[PromptSubmission]
 
 class InterviewQuestionRequest(BaseModel):
     jobRole: str
@@ -199,42 +299,152 @@ class InterviewQuestionRequest(BaseModel):
 #         raise HTTPException(status_code=404, detail="No recognized faces found in the image.")
 
 
+@app.get("/llm_stats")
+async def llm_stats():
+    """Counters for the LLM layer (cache, request coalescing, admission queue depth and wait times)"""
+    return {
+        **get_llm_stats(),
+        "assessment_outputs": {**get_assessment_output_stats(), "deferred": pending_outputs.get_stats()},
+    }
+
+
 @app.post("/score_resume/")
 async def score_resume(
     resume: UploadFile = File(...),
     job_desc: UploadFile = File(None)
 ):
-    resume_path = f"uploads/{str(uuid.uuid4())}_{resume.filename}"
-    os.makedirs(os.path.dirname(resume_path), exist_ok=True)
-    with open(resume_path, 'wb') as f:
-        f.write(await resume.read())
+    # Uploads are processed in memory; nothing is written to uploads/
+    resume_bytes = await resume.read()
     
-    jd_path = None
     if job_desc:
-        jd_path = f"uploads/{str(uuid.uuid4())}_{job_desc.filename}"
-        with open(jd_path, 'wb') as f:
-            f.write(await job_desc.read())
-        jd_text = extract_text_from_path(jd_path)
+        jd_text = await run_blocking(extract_text_from_bytes, await job_desc.read(), job_desc.filename)
     else:
-        jd_text = "python machine learning big data cloud"
+        jd_text = DEFAULT_JOB_DESCRIPTION
     
-    rt = extract_text_from_path(resume_path)
-    jt = process_tokens(jd_text)
-    rk = process_tokens(rt)
-    s = calculate_score(jt, rk)
+    rt = await run_blocking(extract_text_from_bytes, resume_bytes, resume.filename)
+    jt = await run_blocking(process_tokens, jd_text)
+    rk = await run_blocking(process_tokens, rt)
+    # Updates the BM25 corpus statistics in SQLite, so it runs on the executor as well
+    s = await run_blocking(calculate_score, jt, rk)
     
     return {
-        "resume_saved_at": resume_path,
-        "job_desc_saved_at": jd_path,
+        # Uploads are no longer saved; the keys stay for existing clients
+        "resume_saved_at": None,
+        "job_desc_saved_at": None,
         "score": s
     }
 
 
+def _resume_tokens(data, filename):
+    """Extract and tokenize one resume of a batch (runs on the analysis executor)"""
+    return process_tokens(extract_text_from_bytes(data, filename))
+
+
+@app.post("/score_resume/batch")
+async def score_resume_batch(
+    http_request: Request,
+    resumes: List[UploadFile] = File(None),
+    archive: UploadFile = File(None),
+    job_desc: UploadFile = File(None)
+):
+    """
+    Score many resumes against one job description, e.g. a placement drive.
+
+    Send the resumes as repeated "resumes" files and/or one zip "archive"
+    (PDF, DOCX or TXT). The job description is tokenized once and all resumes
+    are scored together with a sparse term matrix. Results stream back as
+    Server-Sent Events: {"progress"} while files are processed, then one
+    {"rank", "filename", "score"} per resume from best to worst, {"filename",
+    "error"} for files that could not be read, and a final {"done": true} summary.
+    """
+    started = time.perf_counter()
+
+    # Reject oversized batches before reading any upload
+    if len(resumes or []) > BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_FILES} resumes per batch")
+    files = []
+    for upload in resumes or []:
+        # One byte past the limit is enough to tell that a file is too large
+        data = await upload.read(BATCH_MAX_FILE_BYTES + 1)
+        files.append((upload.filename, data if len(data) <= BATCH_MAX_FILE_BYTES else None))
+    if archive:
+        try:
+            files += await run_blocking(unpack_resume_archive, await archive.read(), BATCH_MAX_FILES, BATCH_MAX_FILE_BYTES)
+        except (zipfile.BadZipFile, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid archive: {e}")
+    if not files:
+        raise HTTPException(status_code=400, detail="No resumes uploaded")
+    if len(files) > BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_FILES} resumes per batch")
+
+    if job_desc:
+        jd_text = await run_blocking(extract_text_from_bytes, await job_desc.read(), job_desc.filename)
+    else:
+        jd_text = DEFAULT_JOB_DESCRIPTION
+    jt = await run_blocking(process_tokens, jd_text)
+
+    async def events():
+        tokens = [None] * len(files)
+        errors = {i: "File too large" for i, (_, data) in enumerate(files) if data is None}
+        tasks = {
+            asyncio.ensure_future(run_blocking(_resume_tokens, data, filename)): i
+            for i, (filename, data) in enumerate(files) if data is not None
+        }
+
+        # Extract and tokenize on the analysis executor, reporting progress as files finish
+        pending = set(tasks)
+        try:
+            while pending:
+                finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    try:
+                        tokens[tasks[task]] = task.result()
+                    except Exception as e:
+                        errors[tasks[task]] = f"Could not read file: {e}"
+                if await http_request.is_disconnected():
+                    print("⚠ Client disconnected, stopping batch scoring")
+                    return
+                done = len(files) - len(pending)
+                yield f"data: {json.dumps({'progress': {'done': done, 'total': len(files)}})}\n\n"
+        finally:
+            for task in pending:
+                task.cancel()
+
+        # Score every resume at once and rank
+        scored = [i for i in range(len(files)) if tokens[i] is not None]
+        scores = await run_blocking(calculate_scores, jt, [tokens[i] for i in scored])
+        order = np.argsort(-np.asarray(scores, dtype=float), kind="stable")
+        for rank, k in enumerate(order, start=1):
+            result = {"rank": rank, "filename": files[scored[k]][0], "score": scores[k]}
+            yield f"data: {json.dumps(result)}\n\n"
+        for i, error in sorted(errors.items()):
+            yield f"data: {json.dumps({'filename': files[i][0], 'error': error})}\n\n"
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            "done": True,
+            "scored": len(scored),
+            "failed": len(errors),
+            "seconds": round(elapsed, 3),
+            "resumes_per_sec": round(len(scored) / elapsed, 2) if elapsed > 0 else None,
+        }
+        yield f"data: {json.dumps(summary)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.post("/chatbot/")
-async def chatbot(request: ChatRequest):
+async def chatbot(request: ChatRequest, http_request: Request):
     """
     Endpoint for the chatbot to interact with the user. This acts as a mentor or guide.
+    Set "stream": true to receive the answer token by token as Server-Sent Events.
     """
+    if request.stream:
+        return await stream_llm_response(build_chat_prompt(request.text), http_request)
     response_text = await generate_response(request.text)
     return {"response": response_text}
 
@@ -249,32 +459,40 @@ async def recommend_skills(request: SkillRecommendationRequest):
     prompt = f"List the most important skills required for the job of {job_name}. Return the skills in a comma-separated list."
     
     try:
-        response_text = await query_ollama(prompt)
+        response_text = await query_ollama(prompt, priority=PRIORITY_STANDARD)
         if response_text:
             skills = response_text.strip().replace("\n", ", ")
             return {"skills": skills}
         return {"message": "No skills found, please rephrase your request."}
+    except OverloadedError:
+        raise
     except Exception as e:
         return {"message": f"An error occurred: {str(e)}"}
 
 
 @app.post("/career_guidance/")
-async def career_guidance(request: CareerGuidanceRequest):
+async def career_guidance(request: CareerGuidanceRequest, http_request: Request):
     """
     Endpoint for generating a career roadmap based on a list of skills and interests.
     Returns a roadmap in plaintext without markdown.
+    Set "stream": true to receive the roadmap token by token as Server-Sent Events.
     """
     skills = ", ".join(request.skills)
     interests = ", ".join(request.interests)
     
     prompt = f"Given the following skills: {skills} and interests: {interests}, provide a big career roadmap to help the user develop professionally. Make sure to not use markdown formatting."
     
+    if request.stream:
+        return await stream_llm_response(prompt, http_request)
+
     try:
-        roadmap = await query_ollama(prompt)
+        roadmap = await query_ollama(prompt, priority=PRIORITY_INTERACTIVE)
         if roadmap:
              return {"roadmap": roadmap.strip()}
         
         return {"message": "No roadmap found, please rephrase your request."}
+    except OverloadedError:
+        raise
     except Exception as e:
         return {"message": f"An error occurred: {str(e)}"}
 
@@ -284,11 +502,46 @@ async def career_guidance(request: CareerGuidanceRequest):
 @app.post("/simulate_career")
 async def simulate_career(request: CareerSimulationRequest):
     try:
-        result = simulate_career_path(request.careerPath, request.comparisonPath, request.userProfile)
+        # Vectorized but still CPU-bound at large simulation counts; keep it off the event loop
+        result = await run_blocking(functools.partial(
+            cached_simulation, "career", simulate_career_path,
+            career_path=request.careerPath, comparison_path=request.comparisonPath,
+            user_profile=request.userProfile, years=resolve_years(request.years),
+            model=resolve_model(request.model), num_simulations=CAREER_SIMULATIONS, seed=request.seed,
+        ))
         return result
     except Exception as e:
         return {"error": f"Simulation failed: {str(e)}"}
 
+@app.post("/simulate_career/sweep")
+async def simulate_career_sweep(request: CareerSweepRequest):
+    """Every career path under every scenario in one batched simulation, as a comparison matrix"""
+    simulations = request.simulations or CAREER_SIMULATIONS
+    # Only the fields that were sent, so omitted ones get the simulator's defaults
+    scenarios = [scenario.model_dump(exclude_unset=True) for scenario in request.scenarios or []] or DEFAULT_SCENARIOS
+    cells = len(request.careerPaths) * len(scenarios)
+    if not request.careerPaths:
+        raise HTTPException(status_code=400, detail="careerPaths must not be empty")
+    if cells > SWEEP_MAX_CELLS:
+        raise HTTPException(status_code=400,
+                            detail=f"At most {SWEEP_MAX_CELLS} career path x scenario combinations per request")
+    if not 1 <= simulations <= SWEEP_MAX_SIMULATIONS:
+        raise HTTPException(status_code=400, detail=f"simulations must be between 1 and {SWEEP_MAX_SIMULATIONS}")
+    try:
+        return await run_blocking(functools.partial(
+            cached_simulation, "sweep", simulate_scenarios,
+            career_paths=request.careerPaths, scenarios=scenarios,
+            user_profile=request.userProfile, years=resolve_years(request.years),
+            model=resolve_model(request.model), num_simulations=simulations, seed=request.seed,
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/simulation_stats")
+async def simulation_stats():
+    """Counters for the career simulation result cache"""
+    return get_simulation_stats()
+
 @app.post("/detect_burnout")
 async def detect_burnout_endpoint(request: BurnoutAnalysisRequest):
     try:
@@ -297,15 +550,111 @@ async def detect_burnout_endpoint(request: BurnoutAnalysisRequest):
     except Exception as e:
         return {"error": f"Burnout analysis failed: {str(e)}"}
 
+@app.post("/detect_burnout/trend")
+async def detect_burnout_trend(request: BurnoutTrendRequest):
+    """Burnout risk over rolling windows, one point per day (or per `step` days)"""
+    try:
+        return await run_blocking(burnout_trend, request.activityLog, request.windows or TREND_WINDOWS, request.step)
+    except Exception as e:
+        return {"error": f"Burnout analysis failed: {str(e)}"}
+
+@app.post("/detect_burnout/batch")
+async def detect_burnout_batch_endpoint(request: BurnoutBatchRequest):
+    """Burnout analysis for a whole cohort in one columnar pass; results follow the order of users"""
+    if len(request.users) > BURNOUT_BATCH_MAX_USERS:
+        raise HTTPException(status_code=400, detail=f"At most {BURNOUT_BATCH_MAX_USERS} users per request")
+    try:
+        logs = [user.get("activityLog") or [] for user in request.users]
+        results = await run_blocking(detect_burnout_batch, logs)
+    except Exception as e:
+        return {"error": f"Burnout analysis failed: {str(e)}"}
+    return {
+        "results": [dict(result, userId=user.get("userId")) for user, result in zip(request.users, results)],
+        "totalUsers": len(results),
+    }
+
+@app.post("/detect_burnout/events")
+async def detect_burnout_events(request: BurnoutEventsRequest):
+    """Incremental burnout analysis: fold new activities into the user's rolling aggregates"""
+    try:
+        return await run_blocking(detect_burnout_incremental, request.userId, request.activities, request.reset)
+    except Exception as e:
+        return {"error": f"Burnout analysis failed: {str(e)}"}
+
+# Assessments scored before their AI output was generated (deferOutput)
+pending_outputs = PendingOutputs()
+
+
 @app.post("/assess_prompt_engineering")
 async def assess_prompt(request: PromptAssessmentRequest):
+    """
+    Generate the AI output of the student's prompt (cached per model and prompt) and score both.
+
+    With deferOutput the prompt is scored immediately. If its output is not cached yet the
+    response has "outputStatus": "pending" and an outputUrl that returns the complete
+    assessment, rescored with the AI output, once generation finishes.
+    """
+    if request.deferOutput:
+        ai_output = cached_output(request.userPrompt)
+        if ai_output is not None:
+            return {**assess_prompt_engineering(request.question, request.userPrompt, ai_output),
+                    "outputStatus": "ready"}
+        assessment_id = pending_outputs.start(request.question, request.userPrompt)
+        result = assess_prompt_engineering(request.question, request.userPrompt, "")
+        return {
+            **result,
+            "aiOutput": None,
+            "outputStatus": "pending",
+            "assessmentId": assessment_id,
+            "outputUrl": f"/assess_prompt_engineering/outputs/{assessment_id}",
+        }
+
     try:
-        ai_output = await query_ollama(request.userPrompt)
-        result = assess_prompt_engineering(request.question, request.userPrompt, ai_output)
-        return result
+        ai_output = await assessment_output(request.userPrompt)
+    except OverloadedError:
+        raise
+    except Exception as e:
+        # Scored with the error message as the output, as query_ollama() returns it
+        ai_output = ollama_error_message(e)
+    try:
+        return assess_prompt_engineering(request.question, request.userPrompt, ai_output)
     except Exception as e:
         return {"error": f"Assessment failed: {str(e)}"}
 
+@app.get("/assess_prompt_engineering/outputs/{assessment_id}")
+async def get_assessment_output(assessment_id: str):
+    """Complete assessment of a deferOutput submission; 202 while its AI output is still generating"""
+    job = pending_outputs.get(assessment_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Assessment not found or expired")
+    if job["status"] == "pending":
+        return JSONResponse(status_code=202, content={"assessmentId": assessment_id, "outputStatus": "pending"})
+    if job["status"] == "overloaded":
+        # Same 429/503 and Retry-After as an overloaded non-deferred request
+        return JSONResponse(status_code=job["statusCode"], content={
+            "assessmentId": assessment_id, "outputStatus": "overloaded", "error": job["error"]
+        }, headers={"Retry-After": str(job["retryAfter"])})
+    if job["status"] == "failed":
+        return JSONResponse(status_code=500, content={
+            "assessmentId": assessment_id, "outputStatus": "failed", "error": job["error"]
+        })
+    result = assess_prompt_engineering(job["question"], job["userPrompt"], job["aiOutput"])
+    return {**result, "outputStatus": "ready", "assessmentId": assessment_id}
+
+@app.post("/assess_prompt_engineering/batch")
+async def assess_prompt_batch(request: PromptAssessmentBatchRequest):
+    """Score many already-answered submissions (question, prompt, AI output) without calling the model"""
+    if len(request.submissions) > PROMPT_BATCH_MAX_SUBMISSIONS:
+        raise HTTPException(status_code=400,
+                            detail=f"At most {PROMPT_BATCH_MAX_SUBMISSIONS} submissions per request")
+    try:
+        results = await run_blocking(assess_prompt_engineering_batch, [
+            (submission.question, submission.userPrompt, submission.aiOutput) for submission in request.submissions
+        ])
+    except Exception as e:
+        return {"error": f"Assessment failed: {str(e)}"}
+    return {"results": results, "totalSubmissions": len(results)}
+
 @app.post("/generate_assessment")
 async def generate_assessment(request: dict):
     try:
@@ -337,13 +686,93 @@ async def evaluate_interview_response(request: dict):
         question = request.get("question")
         user_response = request.get("response")
         prompt = f"As an interview coach, evaluate: Question: {question}, Response: {user_response}"
-        feedback = await query_ollama(prompt)
+        feedback = await query_ollama(prompt, priority=PRIORITY_STANDARD)
         return {"score": 75, "feedback": feedback}
+    except OverloadedError:
+        raise
     except Exception as e:
         return {"error": f"Evaluation failed: {str(e)}"}
 
 
 
+async def analyze_resume_content(file_content, file_ext, filename, job_role="General", job_requirements="{}", progress=None):
+    """
+    Extract text from a resume and run the static and AI analyses.
+
+    Shared by /analyze-resume and the resume job workers. progress(stage, percent)
+    is called between steps when given.
+    """
+    def report(stage, percent):
+        if progress is not None:
+            progress(stage, percent)
+
+    print(f"Processing Resume: {filename} (Size: {len(file_content)} bytes)")
+    report("extracting", 10)
+
+    text = ""
+    if file_ext == '.pdf':
+        try:
+           # Pass the file content bytes directly
+           text = await run_blocking(ai_analyzer.extract_text_from_pdf, file_content)
+           print(f"PDF extraction successful, text length: {len(text)}")
+        except Exception as extract_err:
+           print(f"PDF Extraction Error: {extract_err}")
+           import traceback
+           traceback.print_exc()
+    elif file_ext == '.docx':
+        try:
+           # Pass the file content bytes directly
+           text = await run_blocking(ai_analyzer.extract_text_from_docx, file_content)
+           print(f"DOCX extraction successful, text length: {len(text)}")
+        except Exception as extract_err:
+            print(f"DOCX Extraction Error: {extract_err}")
+            import traceback
+            traceback.print_exc()
+    
+    if text is None:
+        text = ""
+    
+    cleaned_text = text.strip()
+    print(f"Extracted Text Length: {len(cleaned_text)}")
+    print(f"First 200 chars: {cleaned_text[:200]}")
+    
+    if len(cleaned_text) < 50:
+        return {
+            "success": False,
+            "error": "Could not extract sufficient text. Please ensure the resume is a text-based PDF/DOCX, not an image/scan.",
+            "text": text,
+            "static_analysis": {"ats_score": 0, "suggestions": ["Upload a text-based PDF/DOCX."]},
+            "ai_analysis": {"ats_score": 0, "resume_score": 0}
+        }
+
+
+    # Run Analysis
+    try:
+         requirements_dict = json.loads(job_requirements)
+    except:
+         requirements_dict = {}
+
+    report("static_analysis", 40)
+    static_analysis = await run_blocking(resume_analyzer.analyze_resume, {'raw_text': text}, requirements_dict)
+    
+    # AI Analysis using Gemini (async client, does not block the event loop)
+    report("ai_analysis", 60)
+    print(f"Running AI Analysis with Gemini for role: {job_role}")
+    ai_analysis = await ai_analyzer.analyze_resume_with_gemini_async(text, job_role=job_role)
+    
+    return {
+        "success": True,
+        "text": text,
+        "static_analysis": static_analysis,
+        "ai_analysis": ai_analysis
+    }
+
+
+# Background resume analysis jobs (see resume_jobs.py); workers start with the app
+job_store = JobStore()
+job_workers = ResumeJobWorkers(job_store, analyze_resume_content)
+
+
 @app.post("/analyze-resume")
 async def analyze_resume(
     file: UploadFile = File(...),
@@ -351,88 +780,73 @@ async def analyze_resume(
     job_requirements: str = Form("{}")
 ):
     try:
-        # Save file temporarily
         file_ext = os.path.splitext(file.filename)[1].lower()
         if file_ext not in ['.pdf', '.docx']:
              raise HTTPException(status_code=400, detail="Unsupported file format")
 
-        temp_filename = f"uploads/{uuid.uuid4()}{file_ext}"
-        os.makedirs("uploads", exist_ok=True)
-        
-        # Read file content
+        # Read file content; extraction works on the bytes in memory
         file_content = await file.read()
-        
-        with open(temp_filename, "wb") as buffer:
-            buffer.write(file_content)
-            
-        # Extract Text
-        file_size = os.path.getsize(temp_filename)
-        print(f"Processing Resume: {file.filename} (Size: {file_size} bytes)")
-
-        text = ""
-        if file_ext == '.pdf':
-            try:
-               # Pass the file content bytes directly
-               text = ai_analyzer.extract_text_from_pdf(file_content)
-               print(f"PDF extraction successful, text length: {len(text)}")
-            except Exception as extract_err:
-               print(f"PDF Extraction Error: {extract_err}")
-               import traceback
-               traceback.print_exc()
-        elif file_ext == '.docx':
-            try:
-               # Pass the file content bytes directly
-               text = ai_analyzer.extract_text_from_docx(file_content)
-               print(f"DOCX extraction successful, text length: {len(text)}")
-            except Exception as extract_err:
-                print(f"DOCX Extraction Error: {extract_err}")
-                import traceback
-                traceback.print_exc()
-        
-        if text is None:
-            text = ""
-        
-        cleaned_text = text.strip()
-        print(f"Extracted Text Length: {len(cleaned_text)}")
-        print(f"First 200 chars: {cleaned_text[:200]}")
-        
-        if len(cleaned_text) < 50:
-            return {
-                "success": False,
-                "error": "Could not extract sufficient text. Please ensure the resume is a text-based PDF/DOCX, not an image/scan.",
-                "text": text,
-                "static_analysis": {"ats_score": 0, "suggestions": ["Upload a text-based PDF/DOCX."]},
-                "ai_analysis": {"ats_score": 0, "resume_score": 0}
-            }
 
-
-        # Run Analysis
-        try:
-             requirements_dict = json.loads(job_requirements)
-        except:
-             requirements_dict = {}
-
-        static_analysis = resume_analyzer.analyze_resume({'raw_text': text}, requirements_dict)
-        
-        # AI Analysis using Gemini
-        print(f"Running AI Analysis with Gemini for role: {job_role}")
-        ai_analysis = ai_analyzer.analyze_resume_with_gemini(text, job_role=job_role)
-        
-        # Cleanup
-        if os.path.exists(temp_filename):
-            os.remove(temp_filename)
-        
-        return {
-            "success": True,
-            "text": text,
-            "static_analysis": static_analysis,
-            "ai_analysis": ai_analysis
-        }
+        return await analyze_resume_content(file_content, file_ext, file.filename, job_role, job_requirements)
 
     except Exception as e:
         print(f"Error analyzing resume: {e}")
         return {"error": str(e)}
 
+
+@app.post("/analyze-resume/jobs", status_code=202)
+async def submit_resume_job(
+    file: UploadFile = File(...),
+    job_role: str = Form("General"),
+    job_requirements: str = Form("{}")
+):
+    """
+    Queue a resume analysis and return its job id immediately.
+    Poll /analyze-resume/jobs/{job_id} for progress and fetch the result from
+    /analyze-resume/jobs/{job_id}/result.
+    """
+    file_ext = os.path.splitext(file.filename)[1].lower()
+    if file_ext not in ['.pdf', '.docx']:
+        raise HTTPException(status_code=400, detail="Unsupported file format")
+
+    file_content = await file.read()
+    job_id = await run_blocking(job_store.submit, file_content, file_ext, file.filename, job_role, job_requirements)
+    job_workers.notify()
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/analyze-resume/jobs/{job_id}",
+        "result_url": f"/analyze-resume/jobs/{job_id}/result"
+    }
+
+
+@app.get("/analyze-resume/jobs/{job_id}")
+async def get_resume_job(job_id: str):
+    """Status and progress of a queued resume analysis"""
+    job = await run_blocking(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    job.pop("result")
+    return job
+
+
+@app.get("/analyze-resume/jobs/{job_id}/result")
+async def get_resume_job_result(job_id: str):
+    """Result of a finished resume analysis; 202 with the status while it is still running"""
+    job = await run_blocking(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    if job["status"] == "done":
+        return job["result"]
+    if job["status"] == "failed":
+        return JSONResponse(status_code=500, content={"job_id": job_id, "status": "failed", "error": job["error"]})
+    return JSONResponse(status_code=202, content={
+        "job_id": job_id,
+        "status": job["status"],
+        "stage": job["stage"],
+        "progress": job["progress"]
+    })
+
 @app.post("/generate-resume")
 async def generate_resume(data: dict):
     try:
@@ -0,0 +1,245 @@
+import os
+import json
+import httpx
+from dotenv import load_dotenv
+from llm_cache import LLMResponseCache, make_cache_key
+from single_flight import SingleFlight
+from admission import AdmissionController, OverloadedError, PRIORITY_STANDARD
+
+load_dotenv()
+
+# Ollama Configuration - Optimized for RTX 3050 GPU
+OLLAMA_API_URL = os.getenv("OLLAMA_API_URL", "http://localhost:11434/api/generate")
+MODEL_NAME = os.getenv("OLLAMA_MODEL", "llama3.2:3b")  # Faster model for RTX 3050
+
+# Connection pool limits (one Ollama instance, so keep the pool small)
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "20"))
+OLLAMA_MAX_KEEPALIVE = int(os.getenv("OLLAMA_MAX_KEEPALIVE", "10"))
+OLLAMA_KEEPALIVE_EXPIRY = float(os.getenv("OLLAMA_KEEPALIVE_EXPIRY", "60"))
+
+# Per-phase timeouts in seconds. Generation is slow, connecting is not.
+OLLAMA_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "5"))
+OLLAMA_READ_TIMEOUT = float(os.getenv("OLLAMA_READ_TIMEOUT", "120"))
+OLLAMA_WRITE_TIMEOUT = float(os.getenv("OLLAMA_WRITE_TIMEOUT", "10"))
+OLLAMA_POOL_TIMEOUT = float(os.getenv("OLLAMA_POOL_TIMEOUT", "10"))
+
+DEFAULT_OPTIONS = {
+    "num_predict": 150,  # Shorter responses for speed and conciseness
+    "temperature": 0.7,   # Balanced creativity
+    "top_p": 0.9,
+    "top_k": 40
+}
+
+# Response cache: repeated prompts (same model/prompt/options) skip the model.
+# LLM_CACHE_DB enables the SQLite tier that survives restarts; LLM_CACHE_SIZE=0 disables caching.
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "1024"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "")
+
+_client = None
+response_cache = LLMResponseCache(LLM_CACHE_SIZE, LLM_CACHE_TTL, LLM_CACHE_DB or None) if LLM_CACHE_SIZE > 0 else None
+# Identical prompts that arrive while one is already generating share its result
+inflight = SingleFlight()
+
+# Admission control: a single local GPU serves a few generations at a time; the rest
+# wait in a bounded priority queue and are rejected fast (429/503) once it is full.
+OLLAMA_MAX_CONCURRENT = int(os.getenv("OLLAMA_MAX_CONCURRENT", "2"))
+OLLAMA_MAX_QUEUE = int(os.getenv("OLLAMA_MAX_QUEUE", "32"))
+OLLAMA_QUEUE_TIMEOUT = float(os.getenv("OLLAMA_QUEUE_TIMEOUT", "30"))
+admission = AdmissionController(OLLAMA_MAX_CONCURRENT, OLLAMA_MAX_QUEUE, OLLAMA_QUEUE_TIMEOUT)
+
+
+def _build_client():
+    """Create the pooled client used for every Ollama request"""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=OLLAMA_MAX_CONNECTIONS,
+            max_keepalive_connections=OLLAMA_MAX_KEEPALIVE,
+            keepalive_expiry=OLLAMA_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            connect=OLLAMA_CONNECT_TIMEOUT,
+            read=OLLAMA_READ_TIMEOUT,
+            write=OLLAMA_WRITE_TIMEOUT,
+            pool=OLLAMA_POOL_TIMEOUT,
+        ),
+        headers={"Connection": "keep-alive"},
+    )
+
+
+def get_client():
+    """Return the shared client, creating it if the app has not started it yet"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def start_client():
+    """Open the shared client (called on app startup)"""
+    client = get_client()
+    print(f"✓ Ollama client ready (max {OLLAMA_MAX_CONNECTIONS} connections, keep-alive {OLLAMA_MAX_KEEPALIVE})")
+    return client
+
+
+async def close_client():
+    """Close the shared client and its pooled connections (called on app shutdown)"""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+def set_response_cache(cache):
+    """Swap in a different response cache (any object with get/set/get_stats), or None to disable"""
+    global response_cache
+    response_cache = cache
+
+
+def ollama_error_message(e):
+    """Map an httpx failure to the message shown to the user"""
+    if isinstance(e, httpx.PoolTimeout):
+        print(f"⚠ Ollama Pool Timeout: No free connection after {OLLAMA_POOL_TIMEOUT:g} seconds")
+        return "The AI service is busy right now. Please try again in a moment."
+    if isinstance(e, httpx.TimeoutException):
+        print(f"⚠ Ollama Timeout: Request took longer than {OLLAMA_READ_TIMEOUT:g} seconds")
+        return "Response generation timed out. Please try a simpler prompt or check if Ollama is running on GPU."
+    if isinstance(e, httpx.ConnectError):
+        print(f"⚠ Ollama Connection Error: Is Ollama running on port 11434?")
+        return "Could not connect to Ollama. Please ensure Ollama is running (ollama serve)."
+    print(f"❌ Ollama Error: {e}")
+    return f"Error: {str(e)}"
+
+
+async def stream_ollama(prompt: str, options: dict = None, request: dict = None):
+    """
+    Stream generated text from Ollama chunk by chunk.
+
+    Ollama answers a streaming request with NDJSON, one object per line, each
+    carrying a "response" fragment until "done" is true. Fragments are yielded
+    as soon as they arrive. If the consumer stops iterating (e.g. the HTTP
+    client disconnected), the response is closed, which drops the connection
+    and makes Ollama stop generating. request holds extra /api/generate fields.
+
+    Raises:
+        httpx.HTTPError: if the request fails; use ollama_error_message for a user-facing message
+    """
+    client = get_client()
+    async with client.stream(
+        "POST",
+        OLLAMA_API_URL,
+        json={
+            "model": MODEL_NAME,
+            "prompt": prompt,
+            "stream": True,
+            "options": options or DEFAULT_OPTIONS,
+            **(request or {})
+        }
+    ) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            data = json.loads(line)
+            if data.get("error"):
+                raise httpx.HTTPError(data["error"])
+            chunk = data.get("response", "")
+            if chunk:
+                yield chunk
+            if data.get("done"):
+                break
+
+
+async def _generate(prompt: str, stream: bool, options: dict, priority: int, request: dict = None):
+    """Run one generation against Ollama once admitted; raises on failure"""
+    async with admission.slot(priority):
+        if stream:
+            return "".join([chunk async for chunk in stream_ollama(prompt, options, request)])
+        response = await get_client().post(
+            OLLAMA_API_URL,
+            json={
+                "model": MODEL_NAME,
+                "prompt": prompt,
+                "stream": False,
+                "options": options,
+                **(request or {})
+            }
+        )
+        response.raise_for_status()
+        return response.json().get("response", "")
+
+
+async def generate_ollama(prompt: str, options: dict = None, priority: int = PRIORITY_STANDARD,
+                          stream: bool = False, use_cache: bool = False, request: dict = None):
+    """
+    One generation that raises on failure instead of returning an error message.
+
+    Uncached by default, for callers that keep their own cache of answers. With
+    use_cache=True the answer is served from and stored in the response cache,
+    and identical concurrent prompts share one generation, as in query_ollama.
+    request holds extra /api/generate fields such as "system" or "format".
+
+    Raises:
+        OverloadedError: if the admission queue is full or the wait timed out
+        httpx.HTTPError: if the request fails; use ollama_error_message for a user-facing message
+    """
+    options = options or DEFAULT_OPTIONS
+    cache = response_cache if use_cache else None
+    key = make_cache_key(MODEL_NAME, prompt, options, request)
+
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            print(f"✓ Ollama response served from cache ({len(cached)} chars)")
+            return cached
+
+    async def generate():
+        result = await _generate(prompt, stream, options, priority, request)
+        print(f"✓ Ollama response generated ({len(result)} chars)")
+        # Only successful, non-empty answers are cached; failures raise instead
+        if cache is not None and result:
+            cache.set(key, result)
+        return result
+
+    if use_cache:
+        # Concurrent identical prompts collapse into one upstream call
+        return await inflight.do(key, generate)
+    return await generate()
+
+
+async def query_ollama(prompt: str, stream: bool = False, options: dict = None, use_cache: bool = True,
+                       priority: int = PRIORITY_STANDARD):
+    """
+    Query Ollama with optimized settings for better performance.
+
+    Args:
+        prompt: The prompt to send to Ollama
+        stream: Generate in streaming mode and join the chunks. The read timeout
+            then applies between chunks instead of to the whole completion.
+        options: Generation options (defaults to DEFAULT_OPTIONS)
+        use_cache: Serve and store the answer in the response cache and share
+            in-flight generations with identical concurrent prompts. Pass False
+            for conversational prompts where a fresh answer is expected.
+        priority: Admission priority (admission.PRIORITY_*); lower is served first
+
+    Returns:
+        The generated text response
+
+    Raises:
+        OverloadedError: if the admission queue is full or the wait timed out
+    """
+    try:
+        return await generate_ollama(prompt, options, priority, stream=stream, use_cache=use_cache)
+    except OverloadedError:
+        raise
+    except Exception as e:
+        return ollama_error_message(e)
+
+
+def get_llm_stats():
+    """Counters for the /llm_stats endpoint"""
+    return {
+        "cache": response_cache.get_stats() if response_cache is not None else None,
+        "coalescing": inflight.get_stats(),
+        "admission": admission.get_stats(),
+    }
@@ -1,40 +1,93 @@
+from collections import Counter
+
+from utils.keyword_matcher import KeywordMatcher
+
+
+# Common indicators of poor prompts
+POOR_INDICATORS = [
+    "vague", "unclear", "ambiguous", "generic",
+    "do this", "make it", "fix it", "help me"
+]
+
+# Good prompt indicators
+GOOD_INDICATORS = [
+    "specific", "context", "example", "format",
+    "step-by-step", "detailed", "constraints", "role"
+]
+
+# Work-slop indicators (AI hallucinations/errors)
+SLOP_INDICATORS = [
+    "as an ai", "i cannot", "i don't have access",
+    "i apologize", "certainly", "of course",
+    "factually incorrect", "inconsistent", "contradictory"
+]
+
+# Context and refinement keywords
+CONTEXT_KEYWORDS = ["because", "in order to", "for", "given that", "considering"]
+REFINEMENT_KEYWORDS = ["specifically", "more precisely", "to clarify", "in particular"]
+
+INDICATOR_FAMILIES = {
+    "poor": POOR_INDICATORS,
+    "good": GOOD_INDICATORS,
+    "slop": SLOP_INDICATORS,
+    "context": CONTEXT_KEYWORDS,
+    "refinement": REFINEMENT_KEYWORDS,
+}
+
+# All indicator lists in one matcher, labelled (family, indicator), shared by every
+# evaluator. One labels() call finds the indicators of every family, with one
+# str.find scan per indicator; a compiled alternation per family measured slower.
+_INDICATOR_MATCHER = KeywordMatcher(
+    {(family, indicator): [indicator] for family, indicators in INDICATOR_FAMILIES.items() for indicator in indicators},
+    word_boundary=False,
+)
+
+
 class PromptEvaluator:
     """Evaluate prompt engineering skills and detect AI work-slop"""
     
     def __init__(self):
-        # Common indicators of poor prompts
-        self.poor_indicators = [
-            "vague", "unclear", "ambiguous", "generic",
-            "do this", "make it", "fix it", "help me"
-        ]
-        
-        # Good prompt indicators
-        self.good_indicators = [
-            "specific", "context", "example", "format",
-            "step-by-step", "detailed", "constraints", "role"
-        ]
-        
-        # Work-slop indicators (AI hallucinations/errors)
-        self.slop_indicators = [
-            "as an ai", "i cannot", "i don't have access",
-            "i apologize", "certainly", "of course",
-            "factually incorrect", "inconsistent", "contradictory"
+        self.poor_indicators = POOR_INDICATORS
+        self.good_indicators = GOOD_INDICATORS
+        self.slop_indicators = SLOP_INDICATORS
+        self.context_keywords = CONTEXT_KEYWORDS
+        self.refinement_keywords = REFINEMENT_KEYWORDS
+        self._indicator_matcher = _INDICATOR_MATCHER
+    
+    def _indicator_counts(self, text, lowered=False):
+        """Number of distinct indicators of each family found in the text"""
+        return Counter(family for family, _ in self._indicator_matcher.labels(text, lowered=lowered))
+    
+    def evaluate_batch(self, submissions):
+        """
+        Evaluate many (question, user_prompt, ai_output) triples; returns one
+        evaluate_prompt() result per submission, in order.
+        """
+        return [
+            self.evaluate_prompt(question, user_prompt, ai_output)
+            for question, user_prompt, ai_output in submissions
         ]
     
     def evaluate_prompt(self, question, user_prompt, ai_output):
         """Evaluate the quality of a user's prompt"""
         
+        # Each text is lowercased once and scanned for all indicator families once
+        prompt_lower = user_prompt.lower()
+        prompt_counts = self._indicator_counts(prompt_lower, lowered=True)
+        output_counts = self._indicator_counts(ai_output)
+        question_lower = question.lower()
+        
         # Prompt Clarity Score (0-100)
-        clarity_score = self._score_clarity(user_prompt)
+        clarity_score = self._score_clarity(user_prompt, prompt_counts)
         
         # Context Awareness Score (0-100)
-        context_score = self._score_context(user_prompt, question)
+        context_score = self._score_context(prompt_lower, question_lower, prompt_counts)
         
         # Error Detection Score (0-100) - ability to spot AI errors
-        error_detection_score = self._score_error_detection(ai_output)
+        error_detection_score = self._score_error_detection(ai_output, output_counts)
         
         # Iterative Improvement (0-100) - did they refine their prompt?
-        improvement_score = self._score_improvement(user_prompt)
+        improvement_score = self._score_improvement(user_prompt, prompt_counts)
         
         # Productivity (0-100) - how effective was the prompt?
         productivity_score = (clarity_score + context_score) / 2
@@ -66,21 +119,17 @@ class PromptEvaluator:
             },
         }
     
-    def _score_clarity(self, prompt):
+    def _score_clarity(self, prompt, counts=None):
         """Score prompt clarity based on specificity"""
         score = 50  # Base score
         
-        prompt_lower = prompt.lower()
+        counts = counts if counts is not None else self._indicator_counts(prompt)
         
         # Deduct for poor indicators
-        for indicator in self.poor_indicators:
-            if indicator in prompt_lower:
-                score -= 5
+        score -= counts["poor"] * 5
         
         # Add for good indicators
-        for indicator in self.good_indicators:
-            if indicator in prompt_lower:
-                score += 10
+        score += counts["good"] * 10
         
         # Length bonus (detailed prompts are usually better)
         if len(prompt) > 100:
@@ -92,49 +141,41 @@ class PromptEvaluator:
         
         return min(100, max(0, score))
     
-    def _score_context(self, prompt, question):
-        """Score how well the prompt provides context"""
+    def _score_context(self, prompt_lower, question_lower, counts=None):
+        """Score how well the prompt provides context; both texts are already lowercased"""
         score = 50
         
         # Check if prompt references the question
-        if question.lower() in prompt.lower():
+        if question_lower in prompt_lower:
             score += 20
         
         # Check for context keywords
-        context_keywords = ["because", "in order to", "for", "given that", "considering"]
-        for keyword in context_keywords:
-            if keyword in prompt.lower():
-                score += 10
+        counts = counts if counts is not None else self._indicator_counts(prompt_lower, lowered=True)
+        score += counts["context"] * 10
         
         return min(100, max(0, score))
     
-    def _score_error_detection(self, ai_output):
+    def _score_error_detection(self, ai_output, counts=None):
         """Score ability to detect AI errors (work-slop)"""
         score = 70  # Assume good unless slop detected
         
-        ai_lower = ai_output.lower()
-        
         # Check for work-slop indicators
-        slop_count = 0
-        for indicator in self.slop_indicators:
-            if indicator in ai_lower:
-                slop_count += 1
+        counts = counts if counts is not None else self._indicator_counts(ai_output)
+        slop_count = counts["slop"]
         
         # Deduct for each slop indicator found
         score -= (slop_count * 15)
         
         return min(100, max(0, score))
     
-    def _score_improvement(self, prompt):
+    def _score_improvement(self, prompt, counts=None):
         """Score iterative improvement (simplified version)"""
         # In a real implementation, this would compare multiple prompt versions
         # For now, we'll score based on refinement indicators
         score = 60
         
-        refinement_keywords = ["specifically", "more precisely", "to clarify", "in particular"]
-        for keyword in refinement_keywords:
-            if keyword in prompt.lower():
-                score += 10
+        counts = counts if counts is not None else self._indicator_counts(prompt)
+        score += counts["refinement"] * 10
         
         return min(100, max(0, score))
     
@@ -160,7 +201,15 @@ class PromptEvaluator:
         return " ".join(feedback_parts) if feedback_parts else "Good work overall!"
 
 
+# Shared evaluator; it holds no per-request state
+_evaluator = PromptEvaluator()
+
+
 def assess_prompt_engineering(question, user_prompt, ai_output):
     """Main function to assess prompt engineering skills"""
-    evaluator = PromptEvaluator()
-    return evaluator.evaluate_prompt(question, user_prompt, ai_output)
+    return _evaluator.evaluate_prompt(question, user_prompt, ai_output)
+
+
+def assess_prompt_engineering_batch(submissions):
+    """Assess many (question, user_prompt, ai_output) triples at once"""
+    return _evaluator.evaluate_batch(submissions)
@@ -1,33 +1,233 @@
 import nltk
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
-from nltk.probability import FreqDist
 import string
 import pdfplumber
 import docx
+import hashlib
+import io
+import itertools
 import os
+import sqlite3
+import threading
+import zipfile
+from collections import Counter
+from functools import lru_cache
+import numpy as np
+from scipy.sparse import csr_matrix
 
-def extract_text_from_path(path):
-    ext = os.path.splitext(path)[1].lower()
+RESUME_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Document-frequency statistics of every job description and resume scored so far;
+# RELEVANCE_DB enables the SQLite copy that survives restarts (memory only when empty)
+RELEVANCE_DB = os.getenv("RELEVANCE_DB", "")
+# Past this many documents the statistics are halved (see RelevanceIndex._age)
+RELEVANCE_MAX_DOCUMENTS = int(os.getenv("RELEVANCE_MAX_DOCUMENTS", "50000"))
+
+def _extract_text(source, ext):
+    # source is a path or a file-like object; pdfplumber and python-docx accept both
     if ext == ".pdf":
-        with pdfplumber.open(path) as pdf:
+        with pdfplumber.open(source) as pdf:
             return "\n".join(x.extract_text() for x in pdf.pages if x.extract_text())
     if ext == ".docx":
-        d = docx.Document(path)
+        d = docx.Document(source)
         return "\n".join(p.text for p in d.paragraphs)
+    return None
+
+def extract_text_from_path(path):
+    ext = os.path.splitext(path)[1].lower()
+    text = _extract_text(path, ext)
+    if text is not None:
+        return text
     with open(path, 'r', encoding='utf-8', errors='ignore') as f:
         return f.read()
 
+def extract_text_from_bytes(data, filename):
+    """Same as extract_text_from_path, for an upload held in memory"""
+    ext = os.path.splitext(filename or "")[1].lower()
+    text = _extract_text(io.BytesIO(data), ext)
+    if text is not None:
+        return text
+    return data.decode('utf-8', errors='ignore')
+
+@lru_cache(maxsize=1)
+def _stopwords():
+    return frozenset(stopwords.words("english"))
+
 def process_tokens(txt):
     tk = word_tokenize(txt)
-    tk = [w.lower() for w in tk if w.isalpha()]
-    s = set(stopwords.words("english"))
-    tk = [w for w in tk if w not in s]
-    return tk
+    s = _stopwords()
+    return [w for w in (w.lower() for w in tk if w.isalpha()) if w not in s]
+
+class RelevanceIndex:
+    """
+    Corpus statistics for BM25: how many documents contain each term, the
+    number of documents and their average length.
+
+    Every job description and resume that gets scored is added once (repeats
+    are recognised by a hash of their tokens), so IDF weights sharpen as the
+    corpus grows without ever being recomputed from scratch. Only term counts
+    are kept, never the text. With db_path the statistics persist in SQLite.
+
+    Once more than max_documents have been added, the oldest half of the
+    documents is forgotten and every document frequency is halved, so memory
+    and the doc_freq table stay bounded while IDF ratios are kept; terms
+    seen in a single document since the last halving are dropped.
+    """
+
+    def __init__(self, db_path=None, max_documents=RELEVANCE_MAX_DOCUMENTS):
+        self.max_documents = max_documents
+        self._df = Counter()
+        self._seen = {}  # document key -> length, oldest first
+        self.doc_count = 0
+        self.total_length = 0
+        self._lock = threading.Lock()
+        self._db = None
+
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS doc_freq (term TEXT PRIMARY KEY, df INTEGER NOT NULL)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS documents (key TEXT PRIMARY KEY, length INTEGER NOT NULL)")
+            self._db.commit()
+            self._df.update(dict(self._db.execute("SELECT term, df FROM doc_freq")))
+            for key, length in self._db.execute("SELECT key, length FROM documents ORDER BY rowid"):
+                self._seen[key] = length
+                self.doc_count += 1
+                self.total_length += length
+
+    def add_documents(self, token_lists):
+        """Add documents (token lists) not seen before; returns how many were new"""
+        added = []
+        with self._lock:
+            for tokens in token_lists:
+                key = hashlib.sha1("\0".join(tokens).encode("utf-8")).hexdigest()
+                if key in self._seen:
+                    continue
+                self._seen[key] = len(tokens)
+                terms = set(tokens)
+                self._df.update(terms)
+                self.doc_count += 1
+                self.total_length += len(tokens)
+                added.append((key, len(tokens), terms))
+
+            if added and self._db is not None:
+                self._db.executemany(
+                    "INSERT INTO doc_freq (term, df) VALUES (?, 1) ON CONFLICT(term) DO UPDATE SET df = df + 1",
+                    [(term,) for _, _, terms in added for term in terms],
+                )
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO documents (key, length) VALUES (?, ?)",
+                    [(key, length) for key, length, _ in added],
+                )
+            if self.doc_count > self.max_documents:
+                self._age()
+            if added and self._db is not None:
+                self._db.commit()
+        return len(added)
+
+    def _age(self):
+        """Forget the oldest half of the documents and halve every document frequency (lock held)"""
+        forget = len(self._seen) - len(self._seen) // 2
+        for key in list(itertools.islice(self._seen, forget)):
+            del self._seen[key]
+        self.doc_count = len(self._seen)
+        self.total_length = sum(self._seen.values())
+        self._df = Counter({term: df // 2 for term, df in self._df.items() if df >= 2})
+        if self._db is not None:
+            self._db.execute("UPDATE doc_freq SET df = df / 2")
+            self._db.execute("DELETE FROM doc_freq WHERE df = 0")
+            self._db.execute(
+                "DELETE FROM documents WHERE rowid IN (SELECT rowid FROM documents ORDER BY rowid LIMIT ?)", (forget,)
+            )
+
+    def idf(self, terms):
+        """BM25 IDF of each term (always positive; equal for all terms while the corpus is empty)"""
+        with self._lock:
+            n = self.doc_count
+            df = np.array([self._df.get(term, 0) for term in terms], dtype=np.float64)
+        return np.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def average_length(self):
+        return self.total_length / self.doc_count if self.doc_count else 0.0
+
+    def get_stats(self):
+        return {"documents": self.doc_count, "max_documents": self.max_documents, "terms": len(self._df),
+                "average_length": round(self.average_length(), 1), "persistent": self._db is not None}
+
+relevance_index = RelevanceIndex(RELEVANCE_DB or None)
+
+def unpack_resume_archive(data, max_files, max_file_bytes):
+    """
+    (filename, bytes) for each resume in a zip archive, skipping folders, macOS
+    metadata and unsupported types. Members over max_file_bytes are returned as
+    (filename, None) so the caller can report them; raises ValueError if the
+    archive holds more than max_files resumes.
+    """
+    files = []
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        for info in archive.infolist():
+            name = info.filename
+            base = os.path.basename(name)
+            if info.is_dir() or name.startswith("__MACOSX/") or base.startswith("."):
+                continue
+            if os.path.splitext(base)[1].lower() not in RESUME_EXTENSIONS:
+                continue
+            if len(files) >= max_files:
+                raise ValueError(f"Archive contains more than {max_files} resumes")
+            if info.file_size > max_file_bytes:
+                files.append((name, None))
+                continue
+            files.append((name, archive.read(info)))
+    return files
+
+def term_matrix(token_lists, vocabulary):
+    """Sparse (documents x vocabulary) matrix of how often each document uses each term"""
+    index = {term: i for i, term in enumerate(vocabulary)}
+    rows, cols, counts = [], [], []
+    for row, tokens in enumerate(token_lists):
+        tf = Counter(index[w] for w in tokens if w in index)
+        rows.extend([row] * len(tf))
+        cols.extend(tf.keys())
+        counts.extend(tf.values())
+    return csr_matrix(
+        (np.asarray(counts, dtype=np.float64), (rows, cols)),
+        shape=(len(token_lists), len(vocabulary)),
+    )
+
+def calculate_scores(job_tokens, resume_token_lists, index=None):
+    """
+    BM25 relevance of each resume to the job description, as 0-100.
+
+    The job description's terms are the query, weighted by how often it uses
+    them and by their IDF in the corpus; each resume's term counts saturate
+    (BM25_K1) and are normalized by its length (BM25_B). 100 means the resume
+    covers every job description term at least as well as an average-length
+    resume that mentions each one once. All resumes are scored together with
+    one sparse matrix-vector product, and all documents are added to the index.
+    """
+    index = index if index is not None else relevance_index
+    if not job_tokens or not resume_token_lists:
+        return [0] * len(resume_token_lists)
+    index.add_documents([job_tokens, *resume_token_lists])
+
+    qtf = Counter(job_tokens)
+    vocabulary = list(qtf)
+    weights = np.array([qtf[w] for w in vocabulary], dtype=np.float64) * index.idf(vocabulary)
+
+    tf = term_matrix(resume_token_lists, vocabulary)
+    lengths = np.array([len(tokens) for tokens in resume_token_lists], dtype=np.float64)
+    avgdl = index.average_length() or lengths.mean() or 1.0
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avgdl)
+    rows = np.repeat(np.arange(len(resume_token_lists)), np.diff(tf.indptr))
+    tf.data = tf.data * (BM25_K1 + 1) / (tf.data + norm[rows])
+
+    raw = tf @ weights
+    ideal = float(weights.sum())
+    return [round(min(100.0, float(x) * 100 / ideal), 2) for x in raw]
 
 def calculate_score(job_tokens, resume_tokens):
-    freq = FreqDist(job_tokens)
-    ln = len(job_tokens)
-    unique_resume_tokens = list(set(resume_tokens))
-    sc = sum(freq[w] for w in unique_resume_tokens)
-    return round(sc * 100 / ln, 2) if ln else 0
\ No newline at end of file
+    return calculate_scores(job_tokens, [resume_tokens])[0]
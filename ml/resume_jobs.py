@@ -0,0 +1,275 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Finished jobs (and their results) are kept this long, then deleted
+RESUME_JOB_TTL = float(os.getenv("RESUME_JOB_TTL", "3600"))
+RESUME_JOB_DB = os.getenv("RESUME_JOB_DB", "database/resume_jobs.sqlite3")
+# In-process workers started with the API. Set to 0 and run `python resume_jobs.py`
+# to scale workers separately from API processes (they share RESUME_JOB_DB).
+RESUME_JOB_WORKERS = int(os.getenv("RESUME_JOB_WORKERS", "2"))
+RESUME_JOB_POLL_INTERVAL = float(os.getenv("RESUME_JOB_POLL_INTERVAL", "0.5"))
+# A running job belongs to its worker while the lease is renewed (every third of it);
+# a job whose lease ran out (the worker died) goes back to the queue
+RESUME_JOB_LEASE_SECONDS = float(os.getenv("RESUME_JOB_LEASE_SECONDS", "60"))
+
+
+class JobStore:
+    """
+    SQLite-backed store for resume analysis jobs.
+
+    A job moves queued -> running -> done | failed. The uploaded file is kept
+    in the row until a worker finishes with it; results expire RESUME_JOB_TTL
+    seconds after the job finishes. Several processes may share one database
+    file: claim_next() hands each queued job to exactly one worker, which holds
+    a lease on it and renews it while the job runs.
+
+    Calls block on SQLite (up to its 30s busy timeout when another process
+    holds the write lock), so async code runs them off the event loop.
+    """
+
+    def __init__(self, db_path=RESUME_JOB_DB, ttl_seconds=RESUME_JOB_TTL):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS resume_jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, stage TEXT, progress INTEGER NOT NULL DEFAULT 0, "
+            "filename TEXT, file_ext TEXT, file_content BLOB, job_role TEXT, job_requirements TEXT, "
+            "result TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL, expires_at REAL, "
+            "lease_expires_at REAL)"
+        )
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(resume_jobs)")}
+        if "lease_expires_at" not in columns:
+            self._db.execute("ALTER TABLE resume_jobs ADD COLUMN lease_expires_at REAL")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_resume_jobs_status ON resume_jobs (status, created_at)")
+
+    def submit(self, file_content, file_ext, filename, job_role="General", job_requirements="{}"):
+        """Queue a new job and return its id"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO resume_jobs (id, status, stage, progress, filename, file_ext, file_content, "
+                "job_role, job_requirements, created_at, updated_at) VALUES (?, 'queued', 'queued', 0, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, filename, file_ext, file_content, job_role, job_requirements, now, now),
+            )
+        return job_id
+
+    def claim_next(self, lease_seconds=RESUME_JOB_LEASE_SECONDS):
+        """Atomically move the oldest queued job to running, leased for lease_seconds, and return it, or None"""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT * FROM resume_jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE resume_jobs SET status = 'running', stage = 'starting', progress = 5, updated_at = ?, "
+                        "lease_expires_at = ? WHERE id = ?",
+                        (time.time(), time.time() + lease_seconds, row["id"]),
+                    )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return dict(row) if row is not None else None
+
+    def update_progress(self, job_id, stage, progress):
+        with self._lock:
+            self._db.execute(
+                "UPDATE resume_jobs SET stage = ?, progress = ?, updated_at = ? WHERE id = ?",
+                (stage, progress, time.time(), job_id),
+            )
+
+    def renew_lease(self, job_id, lease_seconds=RESUME_JOB_LEASE_SECONDS):
+        """Extend the lease of a running job; returns False if the job is no longer running"""
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE resume_jobs SET lease_expires_at = ? WHERE id = ? AND status = 'running'",
+                (time.time() + lease_seconds, job_id),
+            )
+        return cursor.rowcount > 0
+
+    def finish(self, job_id, result=None, error=None):
+        """Record the outcome, drop the uploaded file and start the TTL clock"""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE resume_jobs SET status = ?, stage = ?, progress = 100, result = ?, error = ?, "
+                "file_content = NULL, updated_at = ?, expires_at = ?, lease_expires_at = NULL WHERE id = ?",
+                (
+                    "failed" if error else "done",
+                    "failed" if error else "done",
+                    json.dumps(result) if result is not None else None,
+                    error,
+                    now,
+                    now + self.ttl_seconds,
+                    job_id,
+                ),
+            )
+
+    def get(self, job_id):
+        """Return the job's status fields (and result once done), or None if unknown/expired"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, status, stage, progress, filename, job_role, result, error, created_at, updated_at, expires_at "
+                "FROM resume_jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None or (row["expires_at"] is not None and row["expires_at"] < time.time()):
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def requeue_expired(self, lease_seconds=RESUME_JOB_LEASE_SECONDS):
+        """Put running jobs whose lease ran out (their worker stopped renewing it) back in the queue"""
+        now = time.time()
+        with self._lock:
+            # Jobs claimed before leases existed count as leased from their last update
+            cursor = self._db.execute(
+                "UPDATE resume_jobs SET status = 'queued', stage = 'queued', progress = 0, updated_at = ?, "
+                "lease_expires_at = NULL WHERE status = 'running' AND file_content IS NOT NULL "
+                "AND COALESCE(lease_expires_at, updated_at + ?) < ?",
+                (now, lease_seconds, now),
+            )
+        return cursor.rowcount
+
+    def cleanup(self):
+        """Delete finished jobs whose TTL has passed; returns how many were removed"""
+        with self._lock:
+            cursor = self._db.execute(
+                "DELETE FROM resume_jobs WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),)
+            )
+        return cursor.rowcount
+
+    def get_stats(self):
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM resume_jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self):
+        self._db.close()
+
+
+class ResumeJobWorkers:
+    """
+    Pool of asyncio workers that claim jobs from a JobStore and run them.
+
+    analyze is the analysis coroutine function, called as
+    analyze(file_content, file_ext, filename, job_role, job_requirements, progress)
+    where progress(stage, percent) reports intermediate steps.
+
+    Store calls run on one background thread, in the order they were made,
+    so SQLite lock waits never block the event loop. While a job runs, its
+    lease is renewed every third of lease_seconds.
+    """
+
+    def __init__(self, store, analyze, num_workers=RESUME_JOB_WORKERS,
+                 poll_interval=RESUME_JOB_POLL_INTERVAL, cleanup_interval=60.0,
+                 lease_seconds=RESUME_JOB_LEASE_SECONDS):
+        self.store = store
+        self.analyze = analyze
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval
+        self.cleanup_interval = cleanup_interval
+        self.lease_seconds = lease_seconds
+        self._tasks = []
+        self._wakeup = asyncio.Event()
+        self._store_executor = None
+
+    def _store_call(self, fn, *args):
+        """Run a blocking JobStore method on the store thread; returns an awaitable"""
+        return asyncio.get_running_loop().run_in_executor(self._store_executor, fn, *args)
+
+    def start(self):
+        self._store_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="resume-jobs")
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.num_workers)]
+        if self.num_workers:
+            self._tasks.append(asyncio.create_task(self._janitor()))
+            print(f"✓ Resume job workers started ({self.num_workers})")
+
+    def notify(self):
+        """Wake idle workers right away after a submit instead of waiting for the next poll"""
+        self._wakeup.set()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._store_executor.shutdown(wait=False)
+
+    async def _worker(self, index):
+        while True:
+            job = await self._store_call(self.store.claim_next, self.lease_seconds)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def _run(self, job):
+        job_id = job["id"]
+
+        def progress(stage, percent):
+            # Queued behind earlier store calls, so updates land in order without waiting here
+            self._store_call(self.store.update_progress, job_id, stage, percent)
+
+        print(f"Resume job {job_id}: started ({job['filename']})")
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            result = await self.analyze(
+                job["file_content"], job["file_ext"], job["filename"],
+                job["job_role"], job["job_requirements"], progress,
+            )
+            await self._store_call(self.store.finish, job_id, result, None)
+            print(f"✓ Resume job {job_id}: done")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ Resume job {job_id} failed: {e}")
+            await self._store_call(self.store.finish, job_id, None, str(e))
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job_id):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await self._store_call(self.store.renew_lease, job_id, self.lease_seconds):
+                return
+
+    async def _janitor(self):
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            removed = await self._store_call(self.store.cleanup)
+            requeued = await self._store_call(self.store.requeue_expired, self.lease_seconds)
+            if removed or requeued:
+                print(f"Resume jobs: removed {removed} expired, requeued {requeued} with an expired lease")
+
+
+async def _run_standalone():
+    # Imported here so the API process does not import itself
+    from main import analyze_resume_content
+
+    workers = ResumeJobWorkers(JobStore(), analyze_resume_content, num_workers=max(1, RESUME_JOB_WORKERS))
+    workers.start()
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(_run_standalone())
@@ -0,0 +1,47 @@
+import asyncio
+
+
+class SingleFlight:
+    """
+    Collapse identical concurrent async calls into one.
+
+    The first caller for a key starts the work as its own task; callers that
+    arrive while it is running await the same task instead of starting another.
+    The key is released as soon as the task finishes, so a failure is delivered
+    to the callers that were waiting on it but never to later callers, which
+    start a fresh attempt. Cancelling one waiter (e.g. a disconnected client)
+    does not cancel the shared work for the others.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self.stats = {
+            "calls": 0,
+            "executions": 0,
+            "deduplicated": 0,
+            "failures": 0,
+        }
+
+    async def do(self, key, fn):
+        """Return the result of fn() (a coroutine function), sharing it with concurrent callers of key"""
+        self.stats["calls"] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats["executions"] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._release(key, t))
+        else:
+            self.stats["deduplicated"] += 1
+        return await asyncio.shield(task)
+
+    def _release(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self.stats["failures"] += 1
+
+    def get_stats(self):
+        return {**self.stats, "in_flight": len(self._inflight)}
@@ -0,0 +1,32 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.keyword_matcher import KeywordMatcher, skill_matcher
+
+
+def test_node_js_is_not_javascript():
+    text = "Built REST services in Node.js and Express"
+    assert skill_matcher(("JavaScript",)).labels(text) == set()
+    assert skill_matcher(("Node.js", "JavaScript")).labels(text) == {"Node.js"}
+
+
+def test_ui_is_not_ui_ux():
+    assert skill_matcher(("UI/UX",)).labels("Rebuilt the admin UI in React") == set()
+    assert skill_matcher(("UI/UX",)).labels("Led UI/UX research for the app") == {"UI/UX"}
+    assert skill_matcher(("UI/UX",)).labels("Owned the user experience of checkout") == {"UI/UX"}
+
+
+def test_platforms_do_not_count_as_tools():
+    assert skill_matcher(("Git",)).labels("Open source work on GitHub") == set()
+
+
+def test_word_boundaries():
+    matcher = KeywordMatcher(["c", "java", ".net"])
+    assert matcher.labels("C++, C# and JavaScript") == set()
+    assert matcher.labels("Wrote C and Java on ASP.NET") == {"c", "java", ".net"}
+
+
+def test_no_boundaries_without_word_boundary():
+    assert KeywordMatcher(["for"], word_boundary=False).labels("Therefore") == {"for"}
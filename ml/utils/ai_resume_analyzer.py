@@ -7,12 +7,16 @@ from google.genai import types
 import pdfplumber
 from pdf2image import convert_from_path
 import pytesseract
-import tempfile
 import requests
 import json
 import math
 import re
+from .extraction_cache import ExtractionCache
+from . import pdf_pages
 
+# A full JSON analysis is far longer than ollama_client's short default (num_predict 150);
+# -1 lets the model finish it
+OLLAMA_ANALYSIS_OPTIONS = {"num_predict": -1}
 
 class AIResumeAnalyzer:
     def __init__(self):
@@ -23,6 +27,9 @@ class AIResumeAnalyzer:
         self.ollama_base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
         self.model_name = os.getenv("OLLAMA_MODEL", "llama3.2:3b")
         
+        # Extracted text keyed by file content hash (EXTRACTION_CACHE_SIZE / EXTRACTION_CACHE_DB)
+        self.extraction_cache = ExtractionCache.from_env()
+        
         # Gemini Configuration (new SDK)
         self.gemini_api_key = os.getenv("GEMINI_API_KEY", "")
         try:
@@ -31,93 +38,6 @@ class AIResumeAnalyzer:
              print(f"Failed to configure Gemini: {e}")
              self.gemini_client = None
     
-    def analyze_resume_with_ollama(self, resume_text, job_description=None, job_role=None):
-        """Analyze resume using Local Ollama (Llama 3.1)"""
-        if not resume_text:
-            return {"error": "Resume text is required for analysis."}
-        
-        try:
-            # Construct the prompt
-            system_prompt = "You are an expert resume analyst. Provide professional, detailed feedback."
-            
-            user_prompt = f"""
-            Please analyze the following resume and provide a structured response.
-            
-            RESUME CONTENT:
-            {resume_text}
-            
-            """
-            
-            if job_role:
-                user_prompt += f"\nTARGET ROLE: {job_role}\n"
-            
-            if job_description:
-                user_prompt += f"\nJOB DESCRIPTION:\n{job_description}\n"
-                
-            user_prompt += """
-            
-            Please provide your analysis in the following JSON format:
-            {
-                "resume_score": <number 0-100>,
-                "ats_score": <number 0-100>,
-                "summary": "<executive summary of the resume>",
-                "strengths": ["<strength 1>", "<strength 2>", ...],
-                "weaknesses": ["<weakness 1>", "<weakness 2>", ...],
-                "missing_skills": ["<skill 1>", "<skill 2>", ...],
-                "experience_analysis": "<detailed analysis of experience>",
-                "education_analysis": "<analysis of education>",
-                "formatting_analysis": "<analysis of formatting/ATS compatibility>",
-                "recommendations": ["<recommendation 1>", "<recommendation 2>", ...]
-            }
-            
-            Ensure the response is VALID JSON only. Do not include markdown formatting or explanations outside the JSON.
-            """
-            
-            payload = {
-                "model": self.model_name,
-                "prompt": user_prompt,
-                "system": system_prompt,
-                "stream": False,
-                "format": "json" # Llama 3 supports json mode
-            }
-            
-            response = requests.post(f"{self.ollama_base_url}/api/generate", json=payload)
-            response.raise_for_status()
-            
-            result = response.json()
-            analysis_text = result.get("response", "")
-            
-            # Parse the JSON response from the LLM
-            try:
-                analysis_data = json.loads(analysis_text)
-                
-                # Normalize keys just in case
-                resume_score = analysis_data.get("resume_score", 0)
-                ats_score = analysis_data.get("ats_score", 0)
-                
-                # Format the full text analysis for the frontend/PDF report
-                formatted_analysis = self._format_json_analysis_to_text(analysis_data)
-                
-                return {
-                    "analysis": formatted_analysis,
-                    "resume_score": resume_score,
-                    "ats_score": ats_score,
-                    "raw_json": analysis_data,
-                    "model_used": self.model_name
-                }
-                
-            except json.JSONDecodeError:
-                # Fallback if valid JSON wasn't returned
-                return {
-                    "analysis": analysis_text,
-                    "resume_score": 0, # Could use regex to extract if needed
-                    "ats_score": 0,
-                    "model_used": self.model_name
-                }
-
-        except Exception as e:
-            return {"error": f"Ollama Analysis failed: {str(e)}"}
-
     def _format_json_analysis_to_text(self, data):
         """Helper to convert JSON analysis back to the readable format expected by the frontend"""
         text = ""
@@ -150,172 +70,185 @@ class AIResumeAnalyzer:
         
         return text
     
+    def _read_upload_bytes(self, upload):
+        """Return the raw bytes of an upload given as bytes, a buffer or a file object"""
+        if isinstance(upload, (bytes, bytearray)):
+            return bytes(upload)
+        if hasattr(upload, 'getbuffer'):
+            return bytes(upload.getbuffer())
+        if hasattr(upload, 'read'):
+            data = upload.read()
+            upload.seek(0)  # Reset file pointer
+            return data
+        return upload
+
+    def _cached_extract(self, data, kind, extract):
+        """Run extract(data) -> (text, method) unless the same file bytes were extracted before"""
+        if self.extraction_cache is None:
+            return extract(data)[0]
+
+        key = self.extraction_cache.make_key(data, kind)
+        cached = self.extraction_cache.get(key)
+        if cached is not None:
+            text, method = cached
+            print(f"Info: Reusing cached {kind.upper()} text (extracted with {method})")
+            return text
+
+        text, method = extract(data)
+        # Failed extractions are not cached so a retry can succeed (e.g. after installing Poppler)
+        if text and text.strip():
+            self.extraction_cache.set(key, text, method)
+        return text
+
     def extract_text_from_pdf(self, pdf_file):
-        """Extract text from PDF using pdfplumber and OCR if needed"""
-        text = ""
-        
-        # Save the uploaded file to a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            if hasattr(pdf_file, 'getbuffer'):
-                temp_file.write(pdf_file.getbuffer())
-            elif hasattr(pdf_file, 'read'):
-                temp_file.write(pdf_file.read())
-                pdf_file.seek(0)  # Reset file pointer
-            else:
-                # If it's already bytes
-                temp_file.write(pdf_file)
-            temp_path = temp_file.name
+        """Extract text from PDF using pdfplumber and OCR if needed (cached by file content hash)"""
+        return self._cached_extract(self._read_upload_bytes(pdf_file), "pdf", self._extract_pdf_text)
+
+    def extract_text_from_docx(self, docx_file):
+        """Extract text from DOCX file (cached by file content hash)"""
+        return self._cached_extract(self._read_upload_bytes(docx_file), "docx", self._extract_docx_text)
+
+    def _extract_pdf_text(self, pdf_file):
+        """Extract text from PDF using pdfplumber, running OCR only on pages that need it; returns (text, method)"""
+        data = self._read_upload_bytes(pdf_file)
         
-        try:
-            # Try direct text extraction with pdfplumber
+        # Work on the bytes in memory; only very large files are spooled to a temp file
+        with pdf_pages.spooled_source(data) as source:
             try:
-                with pdfplumber.open(temp_path) as pdf:
-                    for page in pdf.pages:
-                        try:
-                            # Suppress specific warnings about PDFColorSpace conversion
-                            import warnings
-                            with warnings.catch_warnings():
-                                warnings.filterwarnings("ignore", message=".*PDFColorSpace.*")
-                                warnings.filterwarnings("ignore", message=".*Cannot convert.*")
-                                page_text = page.extract_text()
-                                if page_text:
-                                    text += page_text + "\n"
-                        except Exception as e:
-                            # Don't show these specific errors to the user
-                            if "PDFColorSpace" not in str(e) and "Cannot convert" not in str(e):
-                                print(f"Warning: Error extracting text from page with pdfplumber: {e}")
-            except Exception as e:
-                print(f"Warning: pdfplumber extraction failed: {e}")
-                import traceback
-                traceback.print_exc()
+                # Pages to process (capped at PDF_MAX_PAGES), fanned out over the PDF process pool
+                try:
+                    pages = pdf_pages.limited_pages(source)
+                except Exception as e:
+                    print(f"Warning: Could not read PDF page count: {e}")
+                    pages = []
 
-            # If pdfplumber extraction worked, return the text
-            if text.strip():
+                # Extract the text layer with pdfplumber and triage each page for OCR
+                infos = None
+                method = "pdfplumber"
                 try:
-                    os.unlink(temp_path)  # Clean up the temp file
-                except:
-                    pass
-                return text.strip()
-            
-            # Try PyPDF2 as a fallback
-            print("Info: Trying PyPDF2 extraction method...")
-            try:
-                import pypdf
-                pdf_text = ""
-                with open(temp_path, 'rb') as file:
-                    pdf_reader = pypdf.PdfReader(file)
-                    for page in pdf_reader.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            pdf_text += page_text + "\n"
-                
-                if pdf_text.strip():
+                    infos = pdf_pages.map_pages(pdf_pages.triage_pages, source, pages)
+                except Exception as e:
+                    print(f"Warning: pdfplumber extraction failed: {e}")
+                    import traceback
+                    traceback.print_exc()
+
+                # Try PyPDF2 as a fallback when pdfplumber found no text at all
+                if not infos or not any(info["chars"] for info in infos):
+                    print("Info: Trying PyPDF2 extraction method...")
                     try:
-                        os.unlink(temp_path)  # Clean up the temp file
-                    except:
-                        pass
-                    return pdf_text.strip()
-            except Exception as e:
-                print(f"Warning: PyPDF2 extraction failed: {e}")
-            
-            # If we got here, both extraction methods failed
-            print("Warning: Standard text extraction methods failed. Your PDF might be image-based or scanned.")
-            
-            # Try OCR as a last resort
-            try:
-                # Check if we can import the required OCR libraries
-                import pytesseract
-                from pdf2image import convert_from_path
-                
-                print("Info: Attempting OCR for image-based PDF. This may take a moment...")
-                
-                # Check if poppler is installed
-                poppler_path = None
-                if os.name == 'nt':  # Windows
-                    # Try to find poppler in common locations
-                    possible_paths = [
-                        r'C:\poppler\Library\bin',
-                        r'C:\Program Files\poppler\bin',
-                        r'C:\Program Files (x86)\poppler\bin',
-                        r'C:\poppler\bin'
+                        page_texts = pdf_pages.map_pages(pdf_pages.pypdf_pages, source, pages)
+                        if any(page_text.strip() for page_text in page_texts):
+                            infos = infos or [
+                                {"page": number, "text_failed": True, "image_coverage": None, "dpi": pdf_pages.PDF_OCR_DPI}
+                                for number in pages
+                            ]
+                            for info, page_text in zip(infos, page_texts):
+                                info["text"] = page_text
+                                info["chars"] = sum(1 for c in page_text if not c.isspace())
+                            method = "pypdf"
+                    except Exception as e:
+                        print(f"Warning: PyPDF2 extraction failed: {e}")
+
+                if not infos:
+                    infos = [
+                        {"page": number, "text": "", "chars": 0, "text_failed": True, "image_coverage": None,
+                         "dpi": pdf_pages.PDF_OCR_DPI}
+                        for number in pages
                     ]
-                    for path in possible_paths:
-                        if os.path.exists(path):
-                            poppler_path = path
-                            print(f"Info: Found Poppler at: {path}")
-                            break
-                    
-                    if not poppler_path:
-                        print("Warning: Poppler not found in common locations. Using default path: C:\\poppler\\Library\\bin")
-                        poppler_path = r'C:\poppler\Library\bin'
+
+                # Only image pages with (almost) no text layer, pages whose text layer could not be
+                # read, and mostly scanned pages are OCR'd
+                ocr_targets = [info for info in infos if pdf_pages.needs_ocr(info)]
+                if not ocr_targets:
+                    return self._join_page_texts(infos), method
+
+                if len(ocr_targets) == len(infos) and not any(info["chars"] for info in infos):
+                    print("Warning: Standard text extraction methods failed. Your PDF might be image-based or scanned.")
+                else:
+                    print(f"Info: {len(ocr_targets)} of {len(infos)} pages look scanned or image-only; running OCR on those pages")
                 
-                # Try to convert PDF to images
                 try:
-                    if poppler_path and os.name == 'nt':
-                        images = convert_from_path(temp_path, poppler_path=poppler_path)
-                    else:
-                        images = convert_from_path(temp_path)
+                    # Check if we can import the required OCR libraries
+                    import pytesseract
+                    import pdf2image
                     
-                    # Process each image with OCR
-                    ocr_text = ""
-                    for i, image in enumerate(images):
-                        print(f"Info: Processing page {i+1} with OCR...")
-                        page_text = pytesseract.image_to_string(image)
-                        ocr_text += page_text + "\n"
+                    print("Info: Attempting OCR for image-based pages. This may take a moment...")
                     
-                    if ocr_text.strip():
-                        try:
-                            os.unlink(temp_path)
-                        except:
-                            pass
-                        return ocr_text.strip()
-                    else:
-                        print("Error: OCR extraction yielded no text. Please check if the PDF contains actual text content.")
+                    # Check if poppler is installed
+                    poppler_path = None
+                    if os.name == 'nt':  # Windows
+                        # Try to find poppler in common locations
+                        possible_paths = [
+                            r'C:\poppler\Library\bin',
+                            r'C:\Program Files\poppler\bin',
+                            r'C:\Program Files (x86)\poppler\bin',
+                            r'C:\poppler\bin'
+                        ]
+                        for path in possible_paths:
+                            if os.path.exists(path):
+                                poppler_path = path
+                                print(f"Info: Found Poppler at: {path}")
+                                break
+                        
+                        if not poppler_path:
+                            print("Warning: Poppler not found in common locations. Using default path: C:\\poppler\\Library\\bin")
+                            poppler_path = r'C:\poppler\Library\bin'
+                    
+                    # Try to convert PDF pages to images
+                    try:
+                        # Rasterize and OCR the selected pages in parallel, each at its own DPI
+                        target_pages = [info["page"] for info in ocr_targets]
+                        dpis = {info["page"]: info["dpi"] for info in ocr_targets}
+                        results = pdf_pages.map_pages(pdf_pages.ocr_pages, source, target_pages, poppler_path, dpis)
+
+                        ocr_used = 0
+                        for info, (ocr_text, seconds) in zip(ocr_targets, results):
+                            info["ocr_seconds"] = round(seconds, 3)
+                            # Keep the text layer if OCR did not recover more
+                            if len(ocr_text.strip()) > len(info["text"].strip()):
+                                info["text"] = ocr_text
+                                ocr_used += 1
+                        total = sum(info["ocr_seconds"] for info in ocr_targets)
+                        print(f"Info: OCR of {len(ocr_targets)} page(s) took {total:.2f}s")
+
+                        if ocr_used:
+                            method = "ocr" if ocr_used == len(infos) else f"{method}+ocr"
+                        elif not any(info["chars"] for info in infos):
+                            print("Error: OCR extraction yielded no text. Please check if the PDF contains actual text content.")
+                    except Exception as e:
+                        print(f"Error: PDF to image conversion failed: {e}")
+                        print("Info: If you're on Windows, make sure Poppler is installed and in your PATH.")
+                        print("Info: Download Poppler from: https://github.com/oschwartz10612/poppler-windows/releases/")
+                except ImportError as e:
+                    print(f"Error: OCR libraries not available: {e}")
+                    print("Info: Please install the required OCR libraries: pip install pytesseract pdf2image")
                 except Exception as e:
-                    print(f"Error: PDF to image conversion failed: {e}")
-                    print("Info: If you're on Windows, make sure Poppler is installed and in your PATH.")
-                    print("Info: Download Poppler from: https://github.com/oschwartz10612/poppler-windows/releases/")
-            except ImportError as e:
-                print(f"Error: OCR libraries not available: {e}")
-                print("Info: Please install the required OCR libraries: pip install pytesseract pdf2image")
+                    print(f"Error: OCR processing failed: {e}")
+
+                # Whatever text was recovered, from the text layer and/or OCR
+                text = self._join_page_texts(infos)
+                if text:
+                    return text, method
+            
             except Exception as e:
-                print(f"Error: OCR processing failed: {e}")
-        
-        except Exception as e:
-            print(f"Error: PDF processing failed: {e}")
-        
-        # Clean up the temp file
-        try:
-            os.unlink(temp_path)
-        except:
-            pass
+                print(f"Error: PDF processing failed: {e}")
         
         # If all extraction methods failed, return an empty string
         print("Error: All text extraction methods failed. Please try a different PDF or manually extract the text.")
-        return ""
-    
+        return "", "none"
+
+    def _join_page_texts(self, infos):
+        return "".join(info["text"] + "\n" for info in infos if info["text"].strip()).strip()
     
-    def extract_text_from_docx(self, docx_file):
-        """Extract text from DOCX file"""
+    def _extract_docx_text(self, docx_file):
+        """Extract text from DOCX file; returns (text, method)"""
         from docx import Document
         import io
         
-        # Save the uploaded file to a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as temp_file:
-            # Handle different input types
-            if isinstance(docx_file, bytes):
-                temp_file.write(docx_file)
-            elif hasattr(docx_file, 'getbuffer'):
-                temp_file.write(docx_file.getbuffer())
-            elif hasattr(docx_file, 'read'):
-                temp_file.write(docx_file.read())
-            else:
-                temp_file.write(docx_file)
-            temp_path = temp_file.name
-        
         text = ""
         try:
-            doc = Document(temp_path)
+            # python-docx reads straight from an in-memory buffer, no temp file needed
+            doc = Document(io.BytesIO(self._read_upload_bytes(docx_file)))
             for para in doc.paragraphs:
                 text += para.text + "\n"
             
@@ -329,14 +262,8 @@ class AIResumeAnalyzer:
             print(f"Error extracting text from DOCX: {e}")
             import traceback
             traceback.print_exc()
-        
-        # Clean up the temp file
-        try:
-            os.unlink(temp_path)
-        except:
-            pass
             
-        return text
+        return text, "python-docx"
     
     
     def analyze_resume_with_ollama(self, resume_text, job_description=None, job_role=None):
@@ -345,84 +272,10 @@ class AIResumeAnalyzer:
             return {"error": "Resume text is required for analysis."}
         
         try:
-            # Construct the prompt
-            system_prompt = "You are an expert resume analyst. Provide professional, detailed feedback."
-            
-            user_prompt = f"""
-            Please analyze the following resume and provide a structured response.
-            
-            RESUME CONTENT:
-            {resume_text}
-            
-            """
-            
-            if job_role:
-                user_prompt += f"\nTARGET ROLE: {job_role}\n"
-            
-            if job_description:
-                user_prompt += f"\nJOB DESCRIPTION:\n{job_description}\n"
-                
-            user_prompt += """
-            
-            Please provide your analysis in the following JSON format:
-            {
-                "resume_score": <number 0-100>,
-                "ats_score": <number 0-100>,
-                "summary": "<executive summary of the resume>",
-                "strengths": ["<strength 1>", "<strength 2>", ...],
-                "weaknesses": ["<weakness 1>", "<weakness 2>", ...],
-                "missing_skills": ["<skill 1>", "<skill 2>", ...],
-                "experience_analysis": "<detailed analysis of experience>",
-                "education_analysis": "<analysis of education>",
-                "formatting_analysis": "<analysis of formatting/ATS compatibility>",
-                "recommendations": ["<recommendation 1>", "<recommendation 2>", ...]
-            }
-            
-            Ensure the response is VALID JSON only. Do not include markdown formatting or explanations outside the JSON.
-            """
-            
-            payload = {
-                "model": self.model_name,
-                "prompt": user_prompt,
-                "system": system_prompt,
-                "stream": False,
-                "format": "json" # Llama 3 supports json mode
-            }
-            
+            payload = self._ollama_payload(resume_text, job_description, job_role)
             response = requests.post(f"{self.ollama_base_url}/api/generate", json=payload)
             response.raise_for_status()
-            
-            result = response.json()
-            analysis_text = result.get("response", "")
-            
-            # Parse the JSON response from the LLM
-            try:
-                analysis_data = json.loads(analysis_text)
-                
-                # Normalize keys just in case
-                resume_score = analysis_data.get("resume_score", 0)
-                ats_score = analysis_data.get("ats_score", 0)
-                
-                # Format the full text analysis for the frontend/PDF report
-                formatted_analysis = self._format_json_analysis_to_text(analysis_data)
-                
-                return {
-                    "analysis": formatted_analysis,
-                    "resume_score": resume_score,
-                    "ats_score": ats_score,
-                    "raw_json": analysis_data,
-                    "model_used": self.model_name
-                }
-                
-            except json.JSONDecodeError:
-                # Fallback if valid JSON wasn't returned
-                return {
-                    "analysis": analysis_text,
-                    "resume_score": 0,
-                    "ats_score": 0,
-                    "model_used": self.model_name
-                }
-
+            return self._parse_analysis_response(response.json().get("response", ""), self.model_name)
         except Exception as e:
             return {"error": f"Ollama Analysis failed: {str(e)}"}
 
@@ -432,24 +285,31 @@ class AIResumeAnalyzer:
             return {"error": "Resume text is required for analysis."}
             
         try:
-            # Construct the prompt
-            system_prompt = "You are an expert resume analyst. Provide professional, detailed feedback."
-            
-            user_prompt = f"""
+            response = self.gemini_client.models.generate_content(
+                model='gemini-2.0-flash',
+                contents=self._build_analysis_prompt(resume_text, job_description, job_role),
+            )
+            return self._parse_analysis_response(response.text, "gemini-2.0-flash")
+        except Exception as e:
+            return {"error": f"Gemini Analysis failed: {str(e)}"}
+
+    def _build_analysis_prompt(self, resume_text, job_description=None, job_role=None):
+        """Build the JSON-mode analysis prompt shared by the Ollama and Gemini analyzers"""
+        user_prompt = f"""
             Please analyze the following resume and provide a structured response.
             
             RESUME CONTENT:
             {resume_text}
             
             """
+        
+        if job_role:
+            user_prompt += f"\nTARGET ROLE: {job_role}\n"
+        
+        if job_description:
+            user_prompt += f"\nJOB DESCRIPTION:\n{job_description}\n"
             
-            if job_role:
-                user_prompt += f"\nTARGET ROLE: {job_role}\n"
-            
-            if job_description:
-                user_prompt += f"\nJOB DESCRIPTION:\n{job_description}\n"
-                
-            user_prompt += """
+        user_prompt += """
             
             Please provide your analysis in the following JSON format:
             {
@@ -467,52 +327,87 @@ class AIResumeAnalyzer:
             
             Ensure the response is VALID JSON only. Do not include markdown formatting like ```json or explanations outside the JSON.
             """
-            
-            response = self.gemini_client.models.generate_content(
-                model='gemini-2.0-flash',
-                contents=user_prompt,
+        return user_prompt
+
+    def _parse_analysis_response(self, analysis_text, model_used):
+        """Turn the model's JSON answer into the analysis dict returned to the frontend"""
+        # Remove markdown if present (Gemini sometimes adds ```json)
+        analysis_text = (analysis_text or "").strip()
+        if analysis_text.startswith("```json"):
+            analysis_text = analysis_text[7:]
+        if analysis_text.startswith("```"):
+            analysis_text = analysis_text[3:]
+        if analysis_text.endswith("```"):
+            analysis_text = analysis_text[:-3]
+        analysis_text = analysis_text.strip()
+
+        try:
+            analysis_data = json.loads(analysis_text)
+            return {
+                "analysis": self._format_json_analysis_to_text(analysis_data),
+                "resume_score": analysis_data.get("resume_score", 0),
+                "ats_score": analysis_data.get("ats_score", 0),
+                "raw_json": analysis_data,
+                "model_used": model_used
+            }
+        except json.JSONDecodeError:
+            # Fallback if valid JSON wasn't returned
+            return {
+                "analysis": analysis_text,
+                "resume_score": 0,
+                "ats_score": 0,
+                "model_used": model_used
+            }
+
+    def _ollama_payload(self, resume_text, job_description=None, job_role=None):
+        return {
+            "model": self.model_name,
+            "prompt": self._build_analysis_prompt(resume_text, job_description, job_role),
+            "system": "You are an expert resume analyst. Provide professional, detailed feedback.",
+            "stream": False,
+            "format": "json", # Llama 3 supports json mode
+            "options": OLLAMA_ANALYSIS_OPTIONS
+        }
+
+    async def analyze_resume_with_ollama_async(self, resume_text, job_description=None, job_role=None):
+        """
+        Async version of analyze_resume_with_ollama; does not block the event loop.
+
+        Goes through the API's ollama_client, so it waits in the admission queue at
+        bulk priority and shares the pooled connections, the response cache and
+        in-flight generations with the other Ollama calls.
+
+        Raises:
+            OverloadedError: if the admission queue is full or the wait timed out
+        """
+        if not resume_text:
+            return {"error": "Resume text is required for analysis."}
+
+        from admission import OverloadedError, PRIORITY_BULK
+        from ollama_client import generate_ollama
+        payload = self._ollama_payload(resume_text, job_description, job_role)
+        try:
+            analysis_text = await generate_ollama(
+                payload["prompt"], payload["options"], PRIORITY_BULK, use_cache=True,
+                request={"system": payload["system"], "format": payload["format"]},
             )
-            
-            analysis_text = response.text
-            
-            # Remove markdown if present (Gemini sometimes adds ```json)
-            if analysis_text.startswith("```json"):
-                analysis_text = analysis_text[7:]
-            if analysis_text.startswith("```"):
-                analysis_text = analysis_text[3:]
-            if analysis_text.endswith("```"):
-                analysis_text = analysis_text[:-3]
-            
-            analysis_text = analysis_text.strip()
+            return self._parse_analysis_response(analysis_text, self.model_name)
+        except OverloadedError:
+            raise
+        except Exception as e:
+            return {"error": f"Ollama Analysis failed: {str(e)}"}
 
-            # Parse the JSON response
-            try:
-                analysis_data = json.loads(analysis_text)
-                
-                # Normalize keys just in case
-                resume_score = analysis_data.get("resume_score", 0)
-                ats_score = analysis_data.get("ats_score", 0)
-                
-                # Format the full text analysis for the frontend/PDF report
-                formatted_analysis = self._format_json_analysis_to_text(analysis_data)
-                
-                return {
-                    "analysis": formatted_analysis,
-                    "resume_score": resume_score,
-                    "ats_score": ats_score,
-                    "raw_json": analysis_data,
-                    "model_used": "gemini-2.0-flash"
-                }
-                
-            except json.JSONDecodeError:
-                # Fallback if valid JSON wasn't returned
-                return {
-                    "analysis": analysis_text,
-                    "resume_score": 0,
-                    "ats_score": 0,
-                    "model_used": "gemini-2.0-flash"
-                }
+    async def analyze_resume_with_gemini_async(self, resume_text, job_description=None, job_role=None):
+        """Async version of analyze_resume_with_gemini using the SDK's aio client"""
+        if not resume_text:
+            return {"error": "Resume text is required for analysis."}
 
+        try:
+            response = await self.gemini_client.aio.models.generate_content(
+                model='gemini-2.0-flash',
+                contents=self._build_analysis_prompt(resume_text, job_description, job_role),
+            )
+            return self._parse_analysis_response(response.text, "gemini-2.0-flash")
         except Exception as e:
             return {"error": f"Gemini Analysis failed: {str(e)}"}
 
@@ -0,0 +1,119 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class ExtractionCache:
+    """
+    Cache of text extracted from uploaded documents, keyed by a SHA-256 of the file bytes.
+
+    Re-uploads of the same resume skip pdfplumber/pypdf/OCR entirely. Each entry
+    records which extraction method produced the text. A small in-memory LRU sits
+    in front of an optional SQLite table; both are bounded to max_entries, evicting
+    the least recently used documents. Memory hits record the time of use and
+    write it to the table before the table evicts, so hot entries stay on disk.
+    """
+
+    def __init__(self, max_entries=256, db_path=None):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._entries = OrderedDict()  # key -> (text, method)
+        self._used = {}  # key -> last memory hit not yet written to the table
+        self._lock = threading.Lock()
+        self._db = None
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS extraction_cache ("
+                "key TEXT PRIMARY KEY, text TEXT NOT NULL, method TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build the cache from EXTRACTION_CACHE_SIZE (0 disables it) and EXTRACTION_CACHE_DB.
+
+        The SQLite tier holds the full text of uploaded documents, so it is only
+        enabled when EXTRACTION_CACHE_DB is set; by default the cache is memory only.
+        """
+        size = int(os.getenv("EXTRACTION_CACHE_SIZE", "256"))
+        if size <= 0:
+            return None
+        db_path = os.getenv("EXTRACTION_CACHE_DB", "")
+        return cls(max_entries=size, db_path=db_path or None)
+
+    @staticmethod
+    def make_key(data, kind):
+        return f"{kind}:{hashlib.sha256(data).hexdigest()}"
+
+    def get(self, key):
+        """Return (text, method) for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if self._db is not None:
+                    self._used[key] = time.time()
+                self.stats["hits"] += 1
+                return entry
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT text, method FROM extraction_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    self._db.execute("UPDATE extraction_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+                    self._put_memory(key, (row[0], row[1]))
+                    self.stats["hits"] += 1
+                    return row[0], row[1]
+
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, key, text, method):
+        now = time.time()
+        with self._lock:
+            self._put_memory(key, (text, method))
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO extraction_cache (key, text, method, created_at, last_used) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, text, method, now, now),
+                )
+                count = self._db.execute("SELECT COUNT(*) FROM extraction_cache").fetchone()[0]
+                if count > self.max_entries:
+                    self._db.executemany(
+                        "UPDATE extraction_cache SET last_used = ? WHERE key = ?",
+                        [(used, used_key) for used_key, used in self._used.items()],
+                    )
+                    self._used.clear()
+                    overflow = count - self.max_entries
+                    self._db.execute(
+                        "DELETE FROM extraction_cache WHERE key IN "
+                        "(SELECT key FROM extraction_cache ORDER BY last_used LIMIT ?)",
+                        (overflow,),
+                    )
+                    self.stats["evictions"] += overflow
+                self._db.commit()
+            self.stats["stores"] += 1
+
+    def _put_memory(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            if self._db is None:
+                self.stats["evictions"] += 1
+
+    def get_stats(self):
+        return {**self.stats, "size": len(self._entries), "max_entries": self.max_entries,
+                "persistent": self._db is not None}
@@ -0,0 +1,152 @@
+"""
+Keyword matching for skill lists and other small keyword vocabularies.
+
+A KeywordMatcher is built once from a set of terms and finds every
+occurrence of all of them in a lowercased copy of the text. Each term is
+located with its own str.find scan, so the work grows with the text length
+times the number of terms; there is no single-pass automaton. Matching is
+case-insensitive and, by default, respects word boundaries ("java" does not
+match inside "javascript", "c" does not match inside "c++" or "c#", "js"
+does not match inside "node.js"). Several terms can report the same label,
+which is how skill aliases work ("node", "nodejs" and "node.js" all report
+"Node.js").
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+# start/end index the lowercased text, which lines up with the original for ASCII text
+KeywordMatch = namedtuple('KeywordMatch', ['label', 'term', 'start', 'end'])
+
+# Alternative spellings of common skills, keyed by lowercased canonical name. Only
+# spellings that mean the whole skill: no short forms such as "js" or "ui" that
+# also occur as ordinary words, and no related tools ("github" is not "git").
+SKILL_ALIASES = {
+    'node.js': ['node', 'nodejs', 'node js'],
+    'node': ['node.js', 'nodejs'],
+    'javascript': ['ecmascript'],
+    'react': ['react.js', 'reactjs'],
+    'react native': ['react-native'],
+    'vue.js': ['vue', 'vuejs'],
+    'vue': ['vue.js', 'vuejs'],
+    'angular': ['angularjs', 'angular.js'],
+    'express': ['express.js', 'expressjs'],
+    'next.js': ['nextjs'],
+    'python': ['python3'],
+    'c++': ['cpp'],
+    'c#': ['csharp', 'c sharp'],
+    '.net': ['dotnet', 'asp.net'],
+    'sql': ['mysql', 'postgresql', 'sqlite', 't-sql', 'pl/sql'],
+    'postgresql': ['postgres'],
+    'mongodb': ['mongo'],
+    'kubernetes': ['k8s'],
+    'aws': ['amazon web services'],
+    'gcp': ['google cloud', 'google cloud platform'],
+    'azure': ['microsoft azure'],
+    'ci/cd': ['cicd', 'continuous integration'],
+    'natural language processing': ['nlp'],
+    'ui/ux': ['user experience', 'user interface'],
+    'apis': ['rest api', 'restful apis'],
+    'excel': ['ms excel', 'microsoft excel'],
+    'scikit-learn': ['sklearn'],
+}
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == '_'
+
+
+def _joins_previous(ch):
+    """Whether a match starting after ch would continue a longer word ("js" in "node.js")"""
+    return _is_word_char(ch) or ch == '.'
+
+
+def _continues_word(ch):
+    """Whether ch after a match makes it part of a longer word ("c" in "c++" or "c#")"""
+    return _is_word_char(ch) or ch in '+#'
+
+
+class KeywordMatcher:
+    """
+    Case-insensitive matcher over a fixed set of terms.
+
+    terms is an iterable of strings (each term is its own label) or a mapping
+    of label -> list of terms. With word_boundary=True a match must not be
+    preceded by a letter, digit, underscore or '.', nor followed by a letter,
+    digit, underscore, '+' or '#', except at a term edge that is itself
+    punctuation (so "c++" and ".net" still match).
+    """
+
+    def __init__(self, terms, word_boundary=True):
+        self.word_boundary = word_boundary
+        if isinstance(terms, dict):
+            pairs = [(term, label) for label, label_terms in terms.items() for term in label_terms]
+        else:
+            pairs = [(term, term) for term in terms]
+
+        seen = set()
+        terms_lower = []
+        for term, label in pairs:
+            term_lower = term.lower().strip()
+            if not term_lower or (term_lower, label) in seen:
+                continue
+            seen.add((term_lower, label))
+            terms_lower.append((
+                term_lower, label, term,
+                word_boundary and _is_word_char(term_lower[0]),
+                word_boundary and _is_word_char(term_lower[-1]),
+            ))
+        self._terms = terms_lower
+        self.size = len(seen)
+
+    def _find(self, text, first_only=False):
+        """Matches in the lowercased text; with first_only, stop at each label's first match"""
+        found = []
+        labels = set()
+        for term_lower, label, term, left_edge, right_edge in self._terms:
+            if first_only and label in labels:
+                continue
+            length = len(term_lower)
+            start = text.find(term_lower)
+            while start != -1:
+                end = start + length
+                if not (left_edge and start > 0 and _joins_previous(text[start - 1])) and \
+                        not (right_edge and end < len(text) and _continues_word(text[end])):
+                    found.append(KeywordMatch(label, term, start, end))
+                    if first_only:
+                        labels.add(label)
+                        break
+                start = text.find(term_lower, start + 1)
+        return found
+
+    def finditer(self, text):
+        """Yield a KeywordMatch for every occurrence of every term, in order of where it ends"""
+        found = self._find(text.lower())
+        found.sort(key=lambda match: (match.end, match.start))
+        yield from found
+
+    def find_all(self, text):
+        """All matches in the text, with offsets"""
+        return list(self.finditer(text))
+
+    def labels(self, text, lowered=False):
+        """Set of labels with at least one match in the text; pass lowered=True if it is already lowercase"""
+        # Only the first occurrence of each label is needed
+        return {match.label for match in self._find(text if lowered else text.lower(), first_only=True)}
+
+
+def skill_terms(skill):
+    """The skill itself plus its known aliases"""
+    return [skill] + SKILL_ALIASES.get(skill.lower().strip(), [])
+
+
+@lru_cache(maxsize=256)
+def skill_matcher(skills):
+    """Word-boundary matcher reporting each skill (with aliases) under its own name; skills is a tuple"""
+    return KeywordMatcher({skill: skill_terms(skill) for skill in skills})
+
+
+def precompile_role_skills(job_roles):
+    """Build the skill matcher of every role in a {category: {role: {'required_skills': [...]}}} table"""
+    for roles in job_roles.values():
+        for role in roles.values():
+            skill_matcher(tuple(role.get('required_skills', [])))
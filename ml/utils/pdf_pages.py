@@ -0,0 +1,256 @@
+"""
+Page-level PDF text extraction and OCR fanned out over a process pool.
+
+A document's pages are split into contiguous chunks, one per worker; each
+worker opens the PDF itself and returns its chunk's text, and the chunks are
+joined back in page order. Short documents are handled inline because
+starting work in another process costs more than extracting a page or two.
+
+Pages are also triaged individually: only pages that carry little text or are
+mostly covered by images (scans) are rasterized for OCR, each at a DPI matched
+to its embedded image resolution.
+
+`source` is either a file path or the PDF bytes.
+"""
+import io
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import warnings
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "30"))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "3"))
+# PDFs larger than this are written to one temp file that the workers open by path,
+# instead of copying the bytes to every worker
+PDF_SPOOL_BYTES = int(os.getenv("PDF_SPOOL_BYTES", str(8 * 1024 * 1024)))
+# A page is OCR'd when it has fewer than PDF_OCR_MIN_CHARS extracted characters and either
+# contains images or its text layer could not be read, or when images cover at least
+# PDF_OCR_IMAGE_COVERAGE of it and it has fewer than PDF_OCR_SCAN_CHARS (a scanned page with
+# a typed header or footer). Short or blank pages of a text-only PDF are never OCR'd.
+PDF_OCR_MIN_CHARS = int(os.getenv("PDF_OCR_MIN_CHARS", "40"))
+PDF_OCR_IMAGE_COVERAGE = float(os.getenv("PDF_OCR_IMAGE_COVERAGE", "0.6"))
+PDF_OCR_SCAN_CHARS = int(os.getenv("PDF_OCR_SCAN_CHARS", "300"))
+# OCR resolution follows the page's scan resolution, clamped to this range and to a pixel budget
+PDF_OCR_DPI = int(os.getenv("PDF_OCR_DPI", "200"))
+PDF_OCR_MIN_DPI = int(os.getenv("PDF_OCR_MIN_DPI", "150"))
+PDF_OCR_MAX_DPI = int(os.getenv("PDF_OCR_MAX_DPI", "300"))
+PDF_OCR_MAX_PIXELS = int(os.getenv("PDF_OCR_MAX_PIXELS", str(12_000_000)))
+
+_pool = None
+# Extractions run on several executor threads; only one of them may create the pool
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            return _pool
+        # The pool is first needed on a request thread of a multithreaded server; forking
+        # there can deadlock on locks held by other threads, so workers start from a
+        # clean forkserver process (spawn where forkserver is unavailable, e.g. Windows)
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context(method))
+        return _pool
+
+
+def _discard_pool(pool):
+    """Shut down a broken pool; the next _get_pool() starts a fresh one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _open_source(source):
+    return io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+
+
+@contextmanager
+def spooled_source(data):
+    """Yield the PDF bytes as-is, or the path of a temp copy when they exceed PDF_SPOOL_BYTES"""
+    if len(data) <= PDF_SPOOL_BYTES:
+        yield data
+        return
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
+        temp_file.write(data)
+        temp_path = temp_file.name
+    try:
+        yield temp_path
+    finally:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+
+
+def page_count(source):
+    """Number of pages in the PDF (pypdf, falling back to pdfplumber for files pypdf rejects)"""
+    try:
+        import pypdf
+        return len(pypdf.PdfReader(_open_source(source)).pages)
+    except Exception:
+        import pdfplumber
+        with pdfplumber.open(_open_source(source)) as pdf:
+            return len(pdf.pages)
+
+
+def pypdf_pages(source, pages):
+    """Text of the given 0-based pages using pypdf"""
+    import pypdf
+    reader = pypdf.PdfReader(_open_source(source))
+    return [reader.pages[number].extract_text() or "" for number in pages]
+
+
+def _image_coverage(page):
+    """Fraction of the page area covered by embedded images (overlaps counted once per image, capped at 1)"""
+    page_area = float(page.width * page.height) or 1.0
+    covered = 0.0
+    for image in page.images:
+        width = max(0.0, min(image["x1"], page.width) - max(image["x0"], 0))
+        height = max(0.0, min(image["bottom"], page.height) - max(image["top"], 0))
+        covered += width * height
+    return min(1.0, covered / page_area)
+
+
+def _scan_dpi(page):
+    """Native resolution of the page's largest embedded image, or None if it has none"""
+    best_area, dpi = 0.0, None
+    for image in page.images:
+        width_pt = image["x1"] - image["x0"]
+        srcsize = image.get("srcsize") or (0, 0)
+        if width_pt <= 0 or not srcsize[0]:
+            continue
+        area = width_pt * (image["bottom"] - image["top"])
+        if area > best_area:
+            best_area, dpi = area, srcsize[0] / (width_pt / 72.0)
+    return dpi
+
+
+def ocr_dpi(width_pt, height_pt, scan_dpi=None):
+    """DPI to rasterize a page at: its scan resolution (or PDF_OCR_DPI) within the configured bounds"""
+    dpi = scan_dpi or PDF_OCR_DPI
+    dpi = min(max(dpi, PDF_OCR_MIN_DPI), PDF_OCR_MAX_DPI)
+    page_inches = (width_pt / 72.0) * (height_pt / 72.0)
+    if page_inches > 0:
+        dpi = min(dpi, (PDF_OCR_MAX_PIXELS / page_inches) ** 0.5)
+    return int(dpi)
+
+
+def triage_pages(source, pages):
+    """
+    pdfplumber text of the given 0-based pages plus what is needed to decide
+    whether each one needs OCR: one dict per page with text, chars
+    (non-whitespace characters), text_failed (extraction raised),
+    image_coverage (None if it could not be measured) and the dpi to OCR it at.
+    """
+    import pdfplumber
+    results = []
+    with pdfplumber.open(_open_source(source)) as pdf:
+        for number in pages:
+            page = pdf.pages[number]
+            text = ""
+            text_failed = False
+            try:
+                # Suppress specific warnings about PDFColorSpace conversion
+                with warnings.catch_warnings():
+                    warnings.filterwarnings("ignore", message=".*PDFColorSpace.*")
+                    warnings.filterwarnings("ignore", message=".*Cannot convert.*")
+                    text = page.extract_text() or ""
+            except Exception as e:
+                text_failed = True
+                # Don't show these specific errors to the user
+                if "PDFColorSpace" not in str(e) and "Cannot convert" not in str(e):
+                    print(f"Warning: Error extracting text from page with pdfplumber: {e}")
+            try:
+                coverage, scan_dpi = _image_coverage(page), _scan_dpi(page)
+            except Exception:
+                coverage, scan_dpi = None, None
+            results.append({
+                "page": number,
+                "text": text,
+                "chars": sum(1 for c in text if not c.isspace()),
+                "text_failed": text_failed,
+                "image_coverage": round(coverage, 3) if coverage is not None else None,
+                "dpi": ocr_dpi(float(page.width), float(page.height), scan_dpi),
+            })
+    return results
+
+
+def needs_ocr(info):
+    """Whether a triage_pages() entry should be OCR'd instead of trusting its text layer"""
+    coverage = info["image_coverage"]
+    if info["chars"] < PDF_OCR_MIN_CHARS:
+        # Without images there is nothing to recognize unless the text layer itself was unreadable
+        return coverage is None or coverage > 0 or info.get("text_failed", False)
+    return coverage is not None and coverage >= PDF_OCR_IMAGE_COVERAGE and info["chars"] < PDF_OCR_SCAN_CHARS
+
+
+def ocr_pages(source, pages, poppler_path=None, dpi=PDF_OCR_DPI):
+    """
+    Rasterize and OCR the given 0-based pages, one page image at a time.
+    dpi is a single value or a {page: dpi} mapping. Returns (text, seconds)
+    per page.
+    """
+    import pytesseract
+    from pdf2image import convert_from_bytes, convert_from_path
+
+    convert = convert_from_bytes if isinstance(source, (bytes, bytearray)) else convert_from_path
+    kwargs = {}
+    if poppler_path:
+        kwargs["poppler_path"] = poppler_path
+
+    results = []
+    for number in pages:
+        page_dpi = dpi.get(number, PDF_OCR_DPI) if isinstance(dpi, dict) else dpi
+        started = time.perf_counter()
+        images = convert(source, dpi=page_dpi, first_page=number + 1, last_page=number + 1, **kwargs)
+        text = "\n".join(pytesseract.image_to_string(image) for image in images)
+        elapsed = time.perf_counter() - started
+        print(f"Info: OCR page {number + 1} at {page_dpi} dpi took {elapsed:.2f}s")
+        results.append((text, elapsed))
+    return results
+
+
+def _chunks(pages, count):
+    size = -(-len(pages) // count)  # ceiling division
+    return [pages[i:i + size] for i in range(0, len(pages), size)]
+
+
+def map_pages(extract, source, pages, *args):
+    """
+    Run extract(source, chunk, *args) over contiguous page chunks and return
+    the per-page results in page order. Falls back to a single inline call for
+    short documents, PDF_WORKERS=1, or if the pool is unavailable.
+    """
+    pages = list(pages)
+    if len(pages) < PDF_PARALLEL_MIN_PAGES or PDF_WORKERS <= 1:
+        return extract(source, pages, *args)
+
+    pool = _get_pool()
+    try:
+        futures = [pool.submit(extract, source, chunk, *args) for chunk in _chunks(pages, PDF_WORKERS)]
+        texts = []
+        for future in futures:
+            texts.extend(future.result())
+        return texts
+    except BrokenProcessPool as e:
+        print(f"Warning: PDF worker pool failed ({e}); extracting inline")
+        _discard_pool(pool)
+        return extract(source, pages, *args)
+
+
+def limited_pages(source):
+    """0-based page numbers to process, capped at PDF_MAX_PAGES"""
+    total = page_count(source)
+    if total > PDF_MAX_PAGES:
+        print(f"Warning: PDF has {total} pages; only the first {PDF_MAX_PAGES} are processed")
+    return list(range(min(total, PDF_MAX_PAGES)))
@@ -1,4 +1,79 @@
+import bisect
+import itertools
 import re
+from collections import namedtuple
+
+from .keyword_matcher import KeywordMatcher, skill_matcher
+
+# Header keywords for each resume section. A line mentioning one of them starts
+# (or continues) that section; a line that is exactly one of them is a bare header.
+SECTION_KEYWORDS = {
+    'education': [
+        'education', 'academic', 'qualification', 'degree', 'university', 'college',
+        'school', 'institute', 'certification', 'diploma', 'bachelor', 'master',
+        'phd', 'b.tech', 'm.tech', 'b.e', 'm.e', 'b.sc', 'm.sc','bca', 'mca', 'b.com',
+        'm.com', 'b.cs-it', 'imca', 'bba', 'mba', 'honors', 'scholarship'
+    ],
+    'experience': [
+        'experience', 'employment', 'work history', 'professional experience',
+        'work experience', 'career history', 'professional background',
+        'employment history', 'job history', 'positions held', 'experience',
+        'job title', 'job responsibilities', 'job description', 'job summary'
+    ],
+    'projects': [
+        'projects', 'personal projects', 'academic projects', 'key projects',
+        'major projects', 'professional projects', 'project experience',
+        'relevant projects', 'featured projects','latest projects',
+        'top projects'
+    ],
+    'skills': [
+        'skills', 'technical skills', 'competencies', 'expertise',
+        'core competencies', 'professional skills', 'key skills',
+        'technical expertise', 'proficiencies', 'qualifications',
+        'top skills', 'key skill', 'major skill', 'personal skill',
+        'soft skills', 'soft skill', 'soft skillset'
+    ],
+    'summary': [
+        'summary', 'professional summary', 'career summary', 'objective',
+        'career objective', 'professional objective', 'about me', 'profile',
+        'professional profile', 'career profile', 'overview', 'skill summary'
+    ],
+}
+
+_SECTION_HEADERS = {section: frozenset(k.lower() for k in keywords) for section, keywords in SECTION_KEYWORDS.items()}
+_NO_SECTIONS = frozenset()
+# Label for the resume document-type keywords, which end whatever section is open
+_RESUME = 'resume'
+
+
+def _header_index(resume_keywords):
+    """Map every section/resume keyword (lowercased) to the labels it stands for"""
+    labels = {}
+    for section, keywords in SECTION_KEYWORDS.items():
+        for keyword in keywords:
+            labels.setdefault(keyword.lower(), set()).add(section)
+    for keyword in resume_keywords:
+        labels.setdefault(keyword.lower(), set()).add(_RESUME)
+    return {keyword: frozenset(keyword_labels) for keyword, keyword_labels in labels.items()}
+
+
+# Keywords that show each essential section is present (scored by check_resume_sections)
+ESSENTIAL_SECTIONS = {
+    'contact': ['email', 'phone', 'address', 'linkedin'],
+    'education': ['education', 'university', 'college', 'degree', 'academic'],
+    'experience': ['experience', 'work', 'employment', 'job', 'internship'],
+    'skills': ['skills', 'technologies', 'tools', 'proficiencies', 'expertise']
+}
+# Plain substring matching, as before ("work" also counts in "working")
+_ESSENTIAL_SECTIONS_MATCHER = KeywordMatcher(
+    {(section, keyword): [keyword] for section, keywords in ESSENTIAL_SECTIONS.items() for keyword in keywords},
+    word_boundary=False,
+)
+
+# One resume line after segmentation: its stripped text, the sections whose keywords it
+# mentions, the sections it is a bare header for, and whether it mentions any resume keyword
+SegmentedLine = namedtuple('SegmentedLine', ['text', 'mentions', 'headers', 'resume_keyword'])
+
 
 class ResumeAnalyzer:
     def __init__(self):
@@ -21,16 +96,22 @@ class ResumeAnalyzer:
                 'date of issue', 'identification'
             ]
         }
+        self._header_index = _header_index(self.document_types['resume'])
+        self._document_type_matcher = KeywordMatcher(
+            {(doc_type, keyword): [keyword] for doc_type, keywords in self.document_types.items() for keyword in keywords},
+            word_boundary=False,
+        )
         
     def detect_document_type(self, text):
-        text = text.lower()
+        found = self._document_type_matcher.labels(text)
+        word_count = len(text.split())
         scores = {}
         
         # Calculate score for each document type
         for doc_type, keywords in self.document_types.items():
-            matches = sum(1 for keyword in keywords if keyword in text)
+            matches = sum(1 for keyword in keywords if (doc_type, keyword) in found)
             density = matches / len(keywords)
-            frequency = matches / (len(text.split()) + 1)  # Add 1 to avoid division by zero
+            frequency = matches / (word_count + 1)  # Add 1 to avoid division by zero
             scores[doc_type] = (density * 0.7) + (frequency * 0.3)
         
         # Get the highest scoring document type
@@ -40,20 +121,11 @@ class ResumeAnalyzer:
         return best_match[0] if best_match[1] > 0.15 else 'unknown'
         
     def calculate_keyword_match(self, resume_text, required_skills):
-        resume_text = resume_text.lower()
-        found_skills = []
-        missing_skills = []
-        
-        for skill in required_skills:
-            skill_lower = skill.lower()
-            # Check for exact match
-            if skill_lower in resume_text:
-                found_skills.append(skill)
-            # Check for partial matches (e.g., "Python" in "Python programming")
-            elif any(skill_lower in phrase for phrase in resume_text.split('.')):
-                found_skills.append(skill)
-            else:
-                missing_skills.append(skill)
+        # All skills are matched on one lowercased copy of the resume; whole words only, with common aliases
+        # (e.g. "NodeJS" counts for "Node.js", but "JavaScript" does not count for "Java")
+        found = skill_matcher(tuple(required_skills)).labels(resume_text)
+        found_skills = [skill for skill in required_skills if skill in found]
+        missing_skills = [skill for skill in required_skills if skill not in found]
                 
         match_score = (len(found_skills) / len(required_skills)) * 100 if required_skills else 0
         
@@ -64,18 +136,12 @@ class ResumeAnalyzer:
         }
         
     def check_resume_sections(self, text):
-        text = text.lower()
-        essential_sections = {
-            'contact': ['email', 'phone', 'address', 'linkedin'],
-            'education': ['education', 'university', 'college', 'degree', 'academic'],
-            'experience': ['experience', 'work', 'employment', 'job', 'internship'],
-            'skills': ['skills', 'technologies', 'tools', 'proficiencies', 'expertise']
-        }
+        found = _ESSENTIAL_SECTIONS_MATCHER.labels(text)
         
         section_scores = {}
-        for section, keywords in essential_sections.items():
-            found = sum(1 for keyword in keywords if keyword in text)
-            section_scores[section] = min(25, (found / len(keywords)) * 25)
+        for section, keywords in ESSENTIAL_SECTIONS.items():
+            found_count = sum(1 for keyword in keywords if (section, keyword) in found)
+            section_scores[section] = min(25, (found_count / len(keywords)) * 25)
             
         return sum(section_scores.values())
         
@@ -182,264 +248,137 @@ class ResumeAnalyzer:
             'portfolio': ''  # Can be enhanced later
         }
 
-    def extract_education(self, text):
-        """Extract education information from resume text"""
-        education = []
+    def segment_lines(self, text):
+        """
+        Label every line of the resume once: which sections' keywords it mentions,
+        which section it is a bare header for, and whether it mentions any resume
+        keyword (the end of a section). The section extractors all read this.
+        """
         lines = text.split('\n')
-        education_keywords = [
-            'education', 'academic', 'qualification', 'degree', 'university', 'college',
-            'school', 'institute', 'certification', 'diploma', 'bachelor', 'master',
-            'phd', 'b.tech', 'm.tech', 'b.e', 'm.e', 'b.sc', 'm.sc','bca', 'mca', 'b.com',
-            'm.com', 'b.cs-it', 'imca', 'bba', 'mba', 'honors', 'scholarship'
-        ]
-        in_education_section = False
-        current_entry = []
+        # Lowercase once and search the whole text for each keyword, mapping hits back
+        # to line numbers, instead of testing every keyword against every line
+        lower_text = text.lower()
+        lower_lines = lower_text.split('\n')
+        starts = list(itertools.accumulate((len(line) + 1 for line in lower_lines[:-1]), initial=0))
+
+        found = {}  # line number -> labels
+        for keyword, labels in self._header_index.items():
+            position = lower_text.find(keyword)
+            while position != -1:
+                number = bisect.bisect_right(starts, position) - 1
+                found.setdefault(number, set()).update(labels)
+                # One hit per line is enough; continue from the next line
+                if number + 1 == len(starts):
+                    break
+                position = lower_text.find(keyword, starts[number + 1])
 
-        for line in lines:
+        segments = []
+        for number, line in enumerate(lines):
             line = line.strip()
-            # Check for section header
-            if any(keyword.lower() in line.lower() for keyword in education_keywords):
-                if not any(keyword.lower() == line.lower() for keyword in education_keywords):
-                    # This line contains education info, not just a header
-                    current_entry.append(line)
-                in_education_section = True
+            labels = found.get(number)
+            if not labels:
+                segments.append(SegmentedLine(line, _NO_SECTIONS, _NO_SECTIONS, False))
                 continue
-            
-            if in_education_section:
-                # Check if we've hit another section
-                if line and any(keyword.lower() in line.lower() for keyword in self.document_types['resume']):
-                    if not any(edu_key.lower() in line.lower() for edu_key in education_keywords):
-                        in_education_section = False
-                        if current_entry:
-                            education.append(' '.join(current_entry))
-                            current_entry = []
-                        continue
-                
-                if line:
-                    current_entry.append(line)
-                elif current_entry:  # Empty line and we have content
-                    education.append(' '.join(current_entry))
-                    current_entry = []
-        
-        if current_entry:
-            education.append(' '.join(current_entry))
-        
-        return education
+            lower = lower_lines[number].strip()
+            mentions = frozenset(labels - {_RESUME})
+            segments.append(SegmentedLine(
+                text=line,
+                mentions=mentions,
+                headers=frozenset(s for s in mentions if lower in _SECTION_HEADERS[s]),
+                resume_keyword=_RESUME in labels,
+            ))
+        return segments
 
-    def extract_experience(self, text):
-        """Extract work experience information from resume text"""
-        experience = []
-        lines = text.split('\n')
-        experience_keywords = [
-            'experience', 'employment', 'work history', 'professional experience',
-            'work experience', 'career history', 'professional background',
-            'employment history', 'job history', 'positions held', 'experience',
-            'job title', 'job responsibilities', 'job description', 'job summary'
-        ]
-        in_experience_section = False
+    def _section_entries(self, segments, section):
+        """Group the lines of a section into entries (lists of lines split on blank lines)"""
+        entries = []
+        in_section = False
         current_entry = []
 
-        for line in lines:
-            line = line.strip()
+        for line in segments:
             # Check for section header
-            if any(keyword.lower() in line.lower() for keyword in experience_keywords):
-                if not any(keyword.lower() == line.lower() for keyword in experience_keywords):
-                    # This line contains experience info, not just a header
-                    current_entry.append(line)
-                in_experience_section = True
+            if section in line.mentions:
+                if section not in line.headers:
+                    # This line contains section content, not just a header
+                    current_entry.append(line.text)
+                in_section = True
                 continue
-            
-            if in_experience_section:
+
+            if in_section:
                 # Check if we've hit another section
-                if line and any(keyword.lower() in line.lower() for keyword in self.document_types['resume']):
-                    if not any(exp_key.lower() in line.lower() for exp_key in experience_keywords):
-                        in_experience_section = False
-                        if current_entry:
-                            experience.append(' '.join(current_entry))
-                            current_entry = []
-                        continue
-                
-                if line:
-                    current_entry.append(line)
+                if line.resume_keyword:
+                    in_section = False
+                    if current_entry:
+                        entries.append(current_entry)
+                        current_entry = []
+                    continue
+
+                if line.text:
+                    current_entry.append(line.text)
                 elif current_entry:  # Empty line and we have content
-                    experience.append(' '.join(current_entry))
+                    entries.append(current_entry)
                     current_entry = []
-        
+
         if current_entry:
-            experience.append(' '.join(current_entry))
-        
-        return experience
+            entries.append(current_entry)
 
-    def extract_projects(self, text):
-        """Extract project information from resume text"""
-        projects = []
-        lines = text.split('\n')
-        project_keywords = [
-            'projects', 'personal projects', 'academic projects', 'key projects',
-            'major projects', 'professional projects', 'project experience',
-            'relevant projects', 'featured projects','latest projects',
-            'top projects'
-        ]
-        in_project_section = False
-        current_entry = []
+        return entries
 
-        for line in lines:
-            line = line.strip()
-            # Check for section header
-            if any(keyword.lower() in line.lower() for keyword in project_keywords):
-                if not any(keyword.lower() == line.lower() for keyword in project_keywords):
-                    # This line contains project info, not just a header
-                    current_entry.append(line)
-                in_project_section = True
-                continue
-            
-            if in_project_section:
-                # Check if we've hit another section
-                if line and any(keyword.lower() in line.lower() for keyword in self.document_types['resume']):
-                    if not any(proj_key.lower() in line.lower() for proj_key in project_keywords):
-                        in_project_section = False
-                        if current_entry:
-                            projects.append(' '.join(current_entry))
-                            current_entry = []
-                        continue
-                
-                if line:
-                    current_entry.append(line)
-                elif current_entry:  # Empty line and we have content
-                    projects.append(' '.join(current_entry))
-                    current_entry = []
-        
-        if current_entry:
-            projects.append(' '.join(current_entry))
-        
-        return projects
+    def extract_education(self, text, segments=None):
+        """Extract education information from resume text"""
+        segments = segments if segments is not None else self.segment_lines(text)
+        return [' '.join(entry) for entry in self._section_entries(segments, 'education')]
+
+    def extract_experience(self, text, segments=None):
+        """Extract work experience information from resume text"""
+        segments = segments if segments is not None else self.segment_lines(text)
+        return [' '.join(entry) for entry in self._section_entries(segments, 'experience')]
 
-    def extract_skills(self, text):
+    def extract_projects(self, text, segments=None):
+        """Extract project information from resume text"""
+        segments = segments if segments is not None else self.segment_lines(text)
+        return [' '.join(entry) for entry in self._section_entries(segments, 'projects')]
+
+    def extract_skills(self, text, segments=None):
         """Extract skills from resume text"""
+        segments = segments if segments is not None else self.segment_lines(text)
         skills = set()  # Use set to avoid duplicates
-        lines = text.split('\n')
-        skills_keywords = [
-            'skills', 'technical skills', 'competencies', 'expertise',
-            'core competencies', 'professional skills', 'key skills',
-            'technical expertise', 'proficiencies', 'qualifications',
-            'top skills', 'key skill', 'major skill', 'personal skill',
-            'soft skills', 'soft skill', 'soft skillset'
-        ]
-        in_skills_section = False
-        current_entry = []
 
         # Common skill separators
         separators = [',', '•', '|', '/', '\\', '·', '>', '-', '–', '―']
 
-        for line in lines:
-            line = line.strip()
-            # Check for section header
-            if any(keyword.lower() in line.lower() for keyword in skills_keywords):
-                if not any(keyword.lower() == line.lower() for keyword in skills_keywords):
-                    # This line contains skills, not just a header
-                    current_entry.append(line)
-                in_skills_section = True
-                continue
-            
-            if in_skills_section:
-                # Check if we've hit another section
-                if line and any(keyword.lower() in line.lower() for keyword in self.document_types['resume']):
-                    if not any(skill_key.lower() in line.lower() for skill_key in skills_keywords):
-                        in_skills_section = False
-                        if current_entry:
-                            # Process the current entry
-                            text_to_process = ' '.join(current_entry)
-                            # Split by common separators
-                            for separator in separators:
-                                if separator in text_to_process:
-                                    skills.update(skill.strip() for skill in text_to_process.split(separator) if skill.strip())
-                            current_entry = []
-                        continue
-                
-                if line:
-                    current_entry.append(line)
-                elif current_entry:  # Empty line and we have content
-                    # Process the current entry
-                    text_to_process = ' '.join(current_entry)
-                    # Split by common separators
-                    for separator in separators:
-                        if separator in text_to_process:
-                            skills.update(skill.strip() for skill in text_to_process.split(separator) if skill.strip())
-                    current_entry = []
-        
-        if current_entry:
-            # Process any remaining skills
-            text_to_process = ' '.join(current_entry)
+        for entry in self._section_entries(segments, 'skills'):
+            text_to_process = ' '.join(entry)
+            # Split by common separators
             for separator in separators:
                 if separator in text_to_process:
                     skills.update(skill.strip() for skill in text_to_process.split(separator) if skill.strip())
-        
+
         return list(skills)
 
-    def extract_summary(self, text):
+    def extract_summary(self, text, segments=None):
         """Extract summary/objective from resume text"""
+        segments = segments if segments is not None else self.segment_lines(text)
         summary = []
-        lines = text.split('\n')
-        summary_keywords = [
-            'summary', 'professional summary', 'career summary', 'objective',
-            'career objective', 'professional objective', 'about me', 'profile',
-            'professional profile', 'career profile', 'overview', 'skill summary'
-        ]
-        in_summary_section = False
-        current_entry = []
-
-        # Try to find summary at the beginning of the resume
-        start_index = 0
-        while start_index < min(10, len(lines)) and not lines[start_index].strip():
-            start_index += 1
 
         # Check first few non-empty lines for potential summary
         first_lines = []
-        lines_checked = 0
-        for line in lines[start_index:]:
-            if line.strip():
-                first_lines.append(line.strip())
-                lines_checked += 1
-                if lines_checked >= 5:  # Check first 5 non-empty lines
+        for line in segments:
+            if line.text:
+                first_lines.append(line)
+                if len(first_lines) >= 5:  # Check first 5 non-empty lines
                     break
 
         # If first few lines look like a summary (no special formatting, no contact info)
-        if first_lines and not any(keyword in first_lines[0].lower() for keyword in summary_keywords):
-            potential_summary = ' '.join(first_lines)
+        if first_lines and 'summary' not in first_lines[0].mentions:
+            potential_summary = ' '.join(line.text for line in first_lines)
             if len(potential_summary.split()) > 10:  # More than 10 words
                 if not re.search(r'\b(?:email|phone|address|tel|mobile|linkedin)\b', potential_summary.lower()):
                     summary.append(potential_summary)
 
         # Look for explicitly marked summary section
-        for line in lines:
-            line = line.strip()
-            # Check for section header
-            if any(keyword.lower() in line.lower() for keyword in summary_keywords):
-                if not any(keyword.lower() == line.lower() for keyword in summary_keywords):
-                    # This line contains summary info, not just a header
-                    current_entry.append(line)
-                in_summary_section = True
-                continue
-            
-            if in_summary_section:
-                # Check if we've hit another section
-                if line and any(keyword.lower() in line.lower() for keyword in self.document_types['resume']):
-                    if not any(sum_key.lower() in line.lower() for sum_key in summary_keywords):
-                        in_summary_section = False
-                        if current_entry:
-                            summary.append(' '.join(current_entry))
-                            current_entry = []
-                        continue
-                
-                if line:
-                    current_entry.append(line)
-                elif current_entry:  # Empty line and we have content
-                    summary.append(' '.join(current_entry))
-                    current_entry = []
-        
-        if current_entry:
-            summary.append(' '.join(current_entry))
-        
+        summary.extend(' '.join(entry) for entry in self._section_entries(segments, 'summary'))
+
         return ' '.join(summary) if summary else ''
 
     def analyze_resume(self, resume_data, job_requirements):
@@ -468,12 +407,13 @@ class ResumeAnalyzer:
             required_skills = job_requirements.get('required_skills', [])
             keyword_match = self.calculate_keyword_match(text, required_skills)
             
-            # Extract all resume sections
-            education = self.extract_education(text)
-            experience = self.extract_experience(text)
-            projects = self.extract_projects(text)
-            skills = list(self.extract_skills(text))  # Convert skills set to list
-            summary = self.extract_summary(text)
+            # Extract all resume sections from a single segmentation of the lines
+            segments = self.segment_lines(text)
+            education = self.extract_education(text, segments)
+            experience = self.extract_experience(text, segments)
+            projects = self.extract_projects(text, segments)
+            skills = list(self.extract_skills(text, segments))  # Convert skills set to list
+            summary = self.extract_summary(text, segments)
             
             # Check resume sections
             section_score = self.check_resume_sections(text)